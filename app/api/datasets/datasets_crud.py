@@ -1,22 +1,30 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 import datetime
 import uuid
 
+from app.core.pagination import PageParams, apply_keyset, like_pattern
 from app.db.deps import get_db
 from app.api.datasets.datasets_model import Dataset
+from app.api.users.users_model import User, DatasetBookmark
 import app.api.datasets.datasets_dto as dto
 
-def create_dataset(item: dto.DatasetCreateDTO, user_id: str, file_type: str, db: Session):
+async def create_dataset(item: dto.DatasetCreateDTO, user_id: str, file_type: str, db: AsyncSession, sha256: str = None, dataset_id: str = None):
     dataset = Dataset(
         name=item.name,
         made_by_user=user_id,
         description=item.description,
         file_type=file_type,
+        sha256=sha256,
         created_at=datetime.datetime.now().isoformat()
     )
+    if dataset_id:
+        # 파일을 먼저 저장한 경우 그 파일 이름의 ID를 사용
+        dataset.id = dataset_id
     db.add(dataset)
-    db.commit()
-    db.refresh(dataset)
+    await db.commit()
+    await db.refresh(dataset)
     return dto.DatasetResponseDTO(
         id=dataset.id,
         name=dataset.name,
@@ -25,14 +33,59 @@ def create_dataset(item: dto.DatasetCreateDTO, user_id: str, file_type: str, db:
         file_type=dataset.file_type,
         created_at=dataset.created_at)
 
-def get_dataset_by_id(dataset_id: str, db: Session) -> Dataset:
+async def get_dataset_by_id(dataset_id: str, db: AsyncSession) -> Dataset:
     """
     데이터셋 ID로 데이터셋을 조회합니다.
     """
-    return db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    result = await db.execute(select(Dataset).where(Dataset.id == dataset_id))
+    return result.scalars().first()
 
-def get_dataset_list(db: Session):
+async def get_dataset_with_username(dataset_id: str, db: AsyncSession) -> Optional[Tuple[Dataset, Optional[str]]]:
     """
-    데이터셋 목록을 조회합니다.
+    데이터셋과 만든 사용자의 이름을 한 번의 쿼리로 조회합니다.
     """
-    return db.query(Dataset).all()
\ No newline at end of file
+    result = await db.execute(
+        select(Dataset, User.username)
+        .outerjoin(User, User.cuid == Dataset.made_by_user)
+        .where(Dataset.id == dataset_id)
+    )
+    return result.first()
+
+async def get_dataset_list(
+    db: AsyncSession,
+    page: PageParams,
+    made_by_user: Optional[str] = None,
+    file_type: Optional[str] = None,
+    name: Optional[str] = None,
+) -> List[Tuple[Dataset, Optional[str]]]:
+    """
+    데이터셋 목록 한 페이지(limit + 1개까지)를 만든 사용자의 이름과 함께 한 번의 쿼리로 조회합니다.
+    """
+    stmt = select(Dataset, User.username).outerjoin(User, User.cuid == Dataset.made_by_user)
+    if made_by_user:
+        stmt = stmt.where(Dataset.made_by_user == made_by_user)
+    if file_type:
+        stmt = stmt.where(Dataset.file_type == file_type)
+    if name:
+        stmt = stmt.where(Dataset.name.like(like_pattern(name), escape="\\"))
+    
+    result = await db.execute(apply_keyset(stmt, Dataset.created_at, Dataset.id, page))
+    return result.all()
+
+async def get_popular_datasets(limit: int, db: AsyncSession) -> List[Tuple[Dataset, Optional[str], int]]:
+    """
+    북마크가 많은 순으로 데이터셋을 만든 사용자의 이름, 북마크 수와 함께 조회합니다.
+    """
+    counts = (
+        select(DatasetBookmark.dataset_id, func.count().label("bookmark_count"))
+        .group_by(DatasetBookmark.dataset_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(Dataset, User.username, counts.c.bookmark_count)
+        .join(counts, counts.c.dataset_id == Dataset.id)
+        .outerjoin(User, User.cuid == Dataset.made_by_user)
+        .order_by(counts.c.bookmark_count.desc(), Dataset.created_at.desc(), Dataset.id.desc())
+        .limit(limit)
+    )
+    return result.all()
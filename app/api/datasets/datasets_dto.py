@@ -14,6 +14,18 @@ class DatasetResponseDTO(BaseModel):
     file_type: str = Field(example="pdf")  # e.g., 'pdf', 'txt'
     created_at: str = Field(example="2025-07-18T21:59:31.467627")  # ISO format string for created_at
     
+    @classmethod
+    def from_model(cls, dataset, username: str | None) -> "DatasetResponseDTO":
+        return cls(
+            id=dataset.id,
+            name=dataset.name,
+            made_by_user=dataset.made_by_user,
+            username=username or "Unknown",
+            description=dataset.description,
+            file_type=dataset.file_type,
+            created_at=dataset.created_at
+        )
+    
     @computed_field
     @property
     def filename(self) -> str:
@@ -25,3 +37,6 @@ class DatasetResponseDTO(BaseModel):
     def download_url(self) -> str:
         """파일 다운로드 URL"""
         return f"/api/datasets/{self.id}/download"
+
+class PopularDatasetDTO(DatasetResponseDTO):
+    bookmark_count: int = Field(0, example=12)
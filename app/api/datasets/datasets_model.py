@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String
 from sqlalchemy.dialects.sqlite import TEXT
 import uuid
 from app.db.sqlite.base import Base
@@ -11,4 +11,12 @@ class Dataset(Base):
     made_by_user = Column(String, nullable=False)  # User CUID
     description = Column(String, nullable=True)
     file_type = Column(String, nullable=False)  # e.g., 'pdf', 'txt' 
-    created_at = Column(String, nullable=False)  # Store as ISO format string
\ No newline at end of file
+    sha256 = Column(String, nullable=True)  # 업로드 시 계산한 파일 해시
+    created_at = Column(String, nullable=False)  # Store as ISO format string
+
+    # 목록 키셋 페이지네이션용 (created_at, id) 정렬 인덱스
+    __table_args__ = (
+        Index("ix_datasets_created_at_id", "created_at", "id"),
+        Index("ix_datasets_made_by_user_created_at_id", "made_by_user", "created_at", "id"),
+        Index("ix_datasets_file_type_created_at_id", "file_type", "created_at", "id"),
+    )
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, File, UploadFile, Form, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 import uuid
 from pathlib import Path
@@ -7,8 +7,11 @@ from pathlib import Path
 from app.core.config import settings
 from app.db.deps import get_db
 from app.core.auth import get_current_user
+from app.core.multipart import receive_multipart
+from app.core.pagination import PageParams, page_params, paginate
 from app.api.datasets import datasets_crud
-from app.api.datasets.datasets_dto import DatasetCreateDTO, DatasetResponseDTO
+from app.api.datasets.datasets_dto import DatasetCreateDTO, DatasetResponseDTO, PopularDatasetDTO
+from app.api.users.users_dto import BookmarksDTO
 from app.api.datasets.datasets_model import Dataset
 from app.api.users import users_crud
 
@@ -17,143 +20,174 @@ router = APIRouter()
 # 허용된 파일 확장자
 ALLOWED_EXTENSIONS = {".pdf", ".txt"}
 
+MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB
+
+# /create는 본문을 직접 파싱하므로 문서에 보일 요청 형식을 따로 적어 둠
+CREATE_DATASET_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["name", "description", "file"],
+            "properties": {
+                "name": {"type": "string"},
+                "description": {"type": "string"},
+                "file": {"type": "string", "format": "binary"},
+            },
+        }}},
+    }
+}
+
+
+def check_extension(filename: str):
+    # 파일 확장자 검증
+    if Path(filename).suffix.lower() not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"지원되지 않는 파일 형식입니다. 허용된 형식: {', '.join(ALLOWED_EXTENSIONS)}"
+        )
+
 
 @router.get("/list", tags=["datasets"], response_model=list[DatasetResponseDTO])
-async def list_datasets(db: Session = Depends(get_db)):
+async def list_datasets(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    made_by_user: str | None = Query(None, description="만든 사용자 CUID"),
+    file_type: str | None = Query(None, description="파일 형식 (e.g. pdf, txt)"),
+    q: str | None = Query(None, max_length=100, description="이름 검색어 (부분 일치)"),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    데이터셋 목록을 조회합니다.
+    데이터셋 목록을 created_at 순으로 한 페이지씩 조회합니다.
+    다음 페이지가 있으면 응답의 X-Next-Cursor 헤더 값을 cursor로 넘기면 됩니다.
     """
-    datasets_list = datasets_crud.get_dataset_list(db)
+    # username은 users 테이블과 조인해서 함께 조회
+    datasets_list = await datasets_crud.get_dataset_list(
+        db, page, made_by_user=made_by_user, file_type=file_type, name=q
+    )
     
-    # 각 데이터셋에 대해 username 조회해서 추가
-    result = []
-    for dataset in datasets_list:
-        user = users_crud.get_user_by_id(dataset.made_by_user, db)
-        username = user.username if user else "Unknown"
-        
-        result.append(DatasetResponseDTO(
-            id=dataset.id,
-            name=dataset.name,
-            made_by_user=dataset.made_by_user,
-            username=username,
-            description=dataset.description,
-            file_type=dataset.file_type,
-            created_at=dataset.created_at
-        ))
+    return [
+        DatasetResponseDTO.from_model(dataset, username)
+        for dataset, username in paginate(datasets_list, page, response)
+    ]
+
+@router.get("/popular", tags=["datasets"], response_model=list[PopularDatasetDTO])
+async def list_popular_datasets(
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    북마크가 많은 순으로 데이터셋을 조회합니다.
+    """
+    rows = await datasets_crud.get_popular_datasets(limit, db)
     
-    return result
+    popular = []
+    for dataset, username, bookmark_count in rows:
+        item = PopularDatasetDTO.from_model(dataset, username)
+        item.bookmark_count = bookmark_count
+        popular.append(item)
+    return popular
 
 @router.get("/{dataset_id}", tags=["datasets"], response_model=DatasetResponseDTO)
-async def get_dataset(dataset_id: str, db: Session = Depends(get_db)):
-    dataset = datasets_crud.get_dataset_by_id(dataset_id, db)
-    if not dataset:
+async def get_dataset(dataset_id: str, db: AsyncSession = Depends(get_db)):
+    row = await datasets_crud.get_dataset_with_username(dataset_id, db)
+    if not row:
         raise HTTPException(status_code=404, detail="데이터셋을 찾을 수 없습니다.")
     
-    # username 조회
-    user = users_crud.get_user_by_id(dataset.made_by_user, db)
-    username = user.username if user else "Unknown"
-    
-    return DatasetResponseDTO(
-        id=dataset.id,
-        name=dataset.name,
-        made_by_user=dataset.made_by_user,
-        username=username,
-        description=dataset.description,
-        file_type=dataset.file_type,
-        created_at=dataset.created_at
-    )
+    dataset, username = row
+    return DatasetResponseDTO.from_model(dataset, username)
 
 
+@router.get("/{dataset_id}/bookmarks", tags=["datasets"], response_model=BookmarksDTO)
+async def get_dataset_bookmarks(
+    dataset_id: str,
+    limit: int = Query(50, ge=1, le=200, description="함께 반환할 최근 북마크 사용자 수 (데이터셋을 만든 사용자만)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    데이터셋의 북마크 수를 조회합니다.
+    데이터셋을 만든 사용자에게는 최근 북마크한 사용자들도 함께 반환합니다.
+    """
+    dataset = await datasets_crud.get_dataset_by_id(dataset_id, db)
+    if not dataset:
+        raise HTTPException(status_code=404, detail="데이터셋을 찾을 수 없습니다.")
+    
+    # 누가 북마크했는지는 만든 사용자에게만 보여주고, 다른 사용자에게는 수만 반환
+    if dataset.made_by_user != current_user['sub']:
+        limit = 0
+    return await users_crud.get_dataset_bookmarks(dataset_id, limit, db)
+
 
-@router.post("/create", tags=["datasets"], response_model=DatasetResponseDTO)
+@router.post("/create", tags=["datasets"], response_model=DatasetResponseDTO, openapi_extra=CREATE_DATASET_OPENAPI)
 async def create_dataset(
-    name: str = Form(...),
-    description: str = Form(...),
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    파일을 업로드하고 데이터셋을 생성합니다.
+    파일을 업로드하고 데이터셋을 생성합니다. (multipart/form-data: name, description, file)
     """
-    # 파일 확장자 검증
-    file_extension = Path(file.filename).suffix.lower()
-    if file_extension not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"지원되지 않는 파일 형식입니다. 허용된 형식: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-    
-    MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB
-    file_content = await file.read()
-    if len(file_content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail="파일 크기가 너무 큽니다. 최대 500MB까지 허용됩니다."
-        )
-    
-    # 고유한 파일 이름 생성
-    dataset_id = str(uuid.uuid4())
-    file_name = f"{dataset_id}{file_extension}"
-    
-    file_path = Path(settings.datasets_path) / file_name
+    datasets_path = Path(settings.datasets_path)
+    temp_path = datasets_path / f".{uuid.uuid4()}.upload"
     
     try:
-        # 파일 저장
-        with open(file_path, "wb") as f:
-            f.write(file_content)
-        
-        # 데이터베이스에 데이터셋 정보 저장
-        dataset_data = DatasetCreateDTO(name=name, description=description)
-        dataset = datasets_crud.create_dataset(
-            item=dataset_data,
-            user_id=current_user["sub"],
-            file_type=file_extension[1:],  # . 제거
-            db=db
+        # 본문을 받는 대로 임시 파일에 쓰면서 크기 제한과 SHA-256 계산 (한도를 넘으면 바로 중단)
+        fields, upload = await receive_multipart(
+            request, "file", temp_path, MAX_FILE_SIZE, check_filename=check_extension
         )
+        missing = [field for field in ("name", "description") if field not in fields]
+        if upload is None:
+            missing.append("file")
+        if missing:
+            raise HTTPException(status_code=422, detail=f"필수 폼 필드가 없습니다: {', '.join(missing)}")
+        file_extension = Path(upload.filename).suffix.lower()
         
-        # 파일 이름을 dataset ID로 변경
-        new_file_name = f"{dataset.id}{file_extension}"
-        new_file_path = Path(settings.datasets_path) / new_file_name
-        file_path.rename(new_file_path)
-        
-        # 사용자의 created_dataset_ids에 추가
-        users_crud.add_created_dataset(current_user["sub"], dataset.id, db)
+        # 임시 파일을 dataset ID 이름으로 원자적으로 이동한 뒤 DB에 기록 (실패하면 파일 삭제)
+        dataset_id = str(uuid.uuid4())
+        file_path = datasets_path / f"{dataset_id}{file_extension}"
+        os.replace(temp_path, file_path)
+        try:
+            dataset = await datasets_crud.create_dataset(
+                item=DatasetCreateDTO(name=fields["name"], description=fields["description"]),
+                user_id=current_user["sub"],
+                file_type=file_extension[1:],  # . 제거
+                db=db,
+                sha256=upload.sha256,
+                dataset_id=dataset_id
+            )
+        except BaseException:
+            file_path.unlink(missing_ok=True)
+            raise
         
         # username 조회
-        user = users_crud.get_user_by_id(dataset.made_by_user, db)
-        username = user.username if user else "Unknown"
+        user = await users_crud.get_user_by_id(dataset.made_by_user, db)
         
-        return DatasetResponseDTO(
-            id=dataset.id,
-            name=dataset.name,
-            made_by_user=dataset.made_by_user,
-            username=username,
-            description=dataset.description,
-            file_type=dataset.file_type,
-            created_at=dataset.created_at
-        )
+        return DatasetResponseDTO.from_model(dataset, user.username if user else None)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        # 파일 저장 실패 시 파일 삭제
-        if file_path.exists():
-            file_path.unlink()
         raise HTTPException(
             status_code=500,
             detail=f"파일 저장 중 오류가 발생했습니다: {str(e)}"
         )
+    finally:
+        # 저장 실패 시 임시 파일 삭제 (성공 시에는 이미 이동됨)
+        if temp_path.exists():
+            temp_path.unlink()
 
 
 @router.get("/{dataset_id}/download", tags=["datasets"])
 async def download_dataset_file(
     dataset_id: str,
-    db: Session = Depends(get_db)):
+    db: AsyncSession = Depends(get_db)):
     """
     데이터셋 파일을 다운로드합니다.
     """
     from fastapi.responses import FileResponse
     
-    dataset = datasets_crud.get_dataset_by_id(dataset_id, db)
+    dataset = await datasets_crud.get_dataset_by_id(dataset_id, db)
 
     if not dataset:
         raise HTTPException(status_code=404, detail="데이터셋을 찾을 수 없습니다.")
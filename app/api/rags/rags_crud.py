@@ -1,15 +1,17 @@
-from sqlalchemy import Column, String
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 import datetime
 import uuid
 import json
 
-from app.api.rags.rags_model import RagModel
+from app.core.pagination import PageParams, apply_keyset, like_pattern
+from app.api.rags.rags_model import RagModel, RagBuildJob
+from app.api.users.users_model import User, RagBookmark
 import app.api.rags.rags_dto as dto
-import app.api.users.users_crud as users_crud
 
 
-def create_rag(item: dto.RagCreateDTO, user_id: str, db: Session):
+async def create_rag(item: dto.RagCreateDTO, user_id: str, db: AsyncSession):
     rag_id = str(uuid.uuid4())
     
     # RAG DB 모델
@@ -23,22 +25,113 @@ def create_rag(item: dto.RagCreateDTO, user_id: str, db: Session):
 
         dataset_ids=json.dumps(item.dataset_ids),  # JSON 문자열로 변환
         llm_model=item.llm_model,
-        chunk_size=item.chunk_size
+        chunk_size=item.chunk_size,
+        chunk_overlap=item.chunk_overlap if item.chunk_overlap is not None else item.chunk_size // 5,
+        chunk_unit=item.chunk_unit,
+        vector_backend=item.vector_backend
     )
     
     db.add(db_rag)
-    db.commit()
-    db.refresh(db_rag)
-    
-    users_crud.add_created_rag(user_id, rag_id, db)
+    await db.commit()
+    await db.refresh(db_rag)
     
     return db_rag
 
-def get_rag_by_id(rag_id: str, db: Session) -> RagModel:
+async def get_rag_by_id(rag_id: str, db: AsyncSession) -> RagModel:
     """
     RAG ID로 RAG를 조회합니다.
     """
-    return db.query(RagModel).filter(RagModel.id == rag_id).first()
+    result = await db.execute(select(RagModel).where(RagModel.id == rag_id))
+    return result.scalars().first()
+
+async def get_rag_with_username(rag_id: str, db: AsyncSession) -> Optional[Tuple[RagModel, Optional[str]]]:
+    """
+    RAG와 만든 사용자의 이름을 한 번의 쿼리로 조회합니다.
+    """
+    result = await db.execute(
+        select(RagModel, User.username)
+        .outerjoin(User, User.cuid == RagModel.made_by_user)
+        .where(RagModel.id == rag_id)
+    )
+    return result.first()
+
+async def get_rags_list(
+    db: AsyncSession,
+    page: PageParams,
+    made_by_user: Optional[str] = None,
+    name: Optional[str] = None,
+) -> List[Tuple[RagModel, Optional[str]]]:
+    """
+    RAG 목록 한 페이지(limit + 1개까지)를 만든 사용자의 이름과 함께 한 번의 쿼리로 조회합니다.
+    """
+    stmt = select(RagModel, User.username).outerjoin(User, User.cuid == RagModel.made_by_user)
+    if made_by_user:
+        stmt = stmt.where(RagModel.made_by_user == made_by_user)
+    if name:
+        stmt = stmt.where(RagModel.name.like(like_pattern(name), escape="\\"))
+    
+    result = await db.execute(apply_keyset(stmt, RagModel.created_at, RagModel.id, page))
+    return result.all()
+
+async def get_popular_rags(limit: int, db: AsyncSession) -> List[Tuple[RagModel, Optional[str], int]]:
+    """
+    북마크가 많은 순으로 RAG를 만든 사용자의 이름, 북마크 수와 함께 조회합니다.
+    """
+    counts = (
+        select(RagBookmark.rag_id, func.count().label("bookmark_count"))
+        .group_by(RagBookmark.rag_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(RagModel, User.username, counts.c.bookmark_count)
+        .join(counts, counts.c.rag_id == RagModel.id)
+        .outerjoin(User, User.cuid == RagModel.made_by_user)
+        .order_by(counts.c.bookmark_count.desc(), RagModel.created_at.desc(), RagModel.id.desc())
+        .limit(limit)
+    )
+    return result.all()
 
-def get_rags_list(db: Session):
-    return db.query(RagModel).all()
\ No newline at end of file
+
+async def create_build_job(rag_id: str, db: AsyncSession, owner: Optional[str] = None) -> RagBuildJob:
+    """
+    대기 상태의 RAG 빌드 작업을 생성합니다. owner는 작업을 실행할 프로세스입니다.
+    """
+    now = datetime.datetime.now().isoformat()
+    job = RagBuildJob(
+        rag_id=rag_id,
+        status="queued",
+        created_at=now,
+        owner=owner,
+        heartbeat_at=now
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+async def get_build_job(job_id: str, db: AsyncSession) -> RagBuildJob:
+    """
+    빌드 작업 ID로 빌드 작업을 조회합니다.
+    """
+    result = await db.execute(select(RagBuildJob).where(RagBuildJob.id == job_id))
+    return result.scalars().first()
+
+async def get_active_build_job(rag_id: str, db: AsyncSession) -> RagBuildJob:
+    """
+    RAG의 대기 중이거나 실행 중인 빌드 작업을 조회합니다.
+    """
+    result = await db.execute(select(RagBuildJob).where(
+        RagBuildJob.rag_id == rag_id,
+        RagBuildJob.status.in_(("queued", "running"))
+    ))
+    return result.scalars().first()
+
+async def get_last_build_finished_at(rag_id: str, db: AsyncSession):
+    """
+    RAG의 마지막으로 성공한 빌드 작업의 완료 시각을 조회합니다.
+    """
+    result = await db.execute(select(func.max(RagBuildJob.finished_at)).where(
+        RagBuildJob.rag_id == rag_id,
+        RagBuildJob.status == "done"
+    ))
+    return result.scalar()
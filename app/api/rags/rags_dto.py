@@ -1,18 +1,28 @@
-from xml.dom.minidom import Document
-from chromadb import URI, Embeddings, IDs, Include
-import numpy as np
 from pydantic import BaseModel, validator, Field
-from typing import Optional, List, Union
+from typing import Optional, List, Literal
 from datetime import datetime
 import json
 
+from app.db.vector_store import VectorBackend
+from app.services.rags.retrieval import SearchFilter
+
 class RagCreateDTO(BaseModel):
     name: str
     description: Optional[str] = None
     dataset_ids: List[str]
-    chunk_size: int
+    chunk_size: int = Field(gt=0)
+    chunk_overlap: Optional[int] = Field(default=None, ge=0)  # 생략하면 chunk_size의 20%
+    chunk_unit: Literal["char", "token"] = "char"  # token이면 tiktoken 토큰 수 기준
+    vector_backend: VectorBackend = "chroma"  # numpy면 mmap한 행렬로 정확한 top-k 검색 (작은/중간 규모 RAG용)
     llm_model: str # OpenAI 모델 이름
 
+    @validator('chunk_overlap')
+    def check_chunk_overlap(cls, v, values):
+        chunk_size = values.get('chunk_size')
+        if v is not None and chunk_size is not None and v >= chunk_size:
+            raise ValueError('chunk_overlap은 chunk_size보다 작아야 합니다.')
+        return v
+
 class RagResponseDTO(BaseModel):
     id: str
     name: str
@@ -24,6 +34,26 @@ class RagResponseDTO(BaseModel):
     dataset_ids: List[str]
     llm_model: str
     chunk_size: int
+    chunk_overlap: int
+    chunk_unit: str
+    vector_backend: str = "chroma"
+
+    @classmethod
+    def from_model(cls, rag, username: Optional[str]) -> "RagResponseDTO":
+        return cls(
+            id=rag.id,
+            name=rag.name,
+            description=rag.description,
+            made_by_user=rag.made_by_user,
+            username=username or "Unknown",
+            created_at=rag.created_at,
+            dataset_ids=rag.dataset_ids,
+            llm_model=rag.llm_model,
+            chunk_size=rag.chunk_size,
+            chunk_overlap=rag.chunk_overlap,
+            chunk_unit=rag.chunk_unit,
+            vector_backend=rag.vector_backend
+        )
 
     @validator('dataset_ids', pre=True)
     def parse_dataset_ids(cls, v):
@@ -41,11 +71,30 @@ class RagResponseDTO(BaseModel):
         from_attributes = True
 
 
+class PopularRagDTO(RagResponseDTO):
+    bookmark_count: int = Field(0, example=12)
+
 
-class RagDocumentSearchDTO(BaseModel):
+
+class RagSearchFilterDTO(BaseModel):
     rag_id: str
+    top_k: int = Field(5, ge=1, le=100)
+    # vector: 임베딩 검색, lexical: BM25 검색 (임베딩 요청 없음), hybrid: 두 결과를 RRF로 합침
+    mode: Literal["vector", "lexical", "hybrid"] = "vector"
+    # 검색 단계에서 거르는 필터 (지정한 것끼리는 AND)
+    dataset_ids: Optional[List[str]] = Field(None, min_length=1, example=["90c76ad8-e7b2-4d8b-8651-64801fbd9939"])
+    page_from: Optional[int] = Field(None, ge=0, example=1)  # 이 페이지 이후에 끝나는 청크
+    page_to: Optional[int] = Field(None, ge=0, example=10)  # 이 페이지 이전에 시작하는 청크
+
+    def search_filter(self) -> SearchFilter:
+        return SearchFilter(self.dataset_ids, self.page_from, self.page_to)
+
+class RagDocumentSearchDTO(RagSearchFilterDTO):
     query: str
-    top_k: int = 5
+
+class RagBatchSearchDTO(RagSearchFilterDTO):
+    # 임베딩 요청 한 번과 Chroma 조회 한 번으로 처리 (필터와 top_k는 모든 질의에 공통)
+    queries: List[str] = Field(min_length=1, max_length=64, example=["환불 규정", "배송 기간"])
 
 class RagQuestionDTO(BaseModel):
     rag_id: str
@@ -56,10 +105,33 @@ class RagQuestionResponseDTO(BaseModel):
     answer: str = Field(
         example="질문에 대한 RAG를 사용한 답변")
     
-class RagBuildResponseDTO(BaseModel):
-    message: str = Field(
-        example="RAG 벡터 데이터베이스가 성공적으로 구축되었습니다."
-    )
+class RagBuildJobDTO(BaseModel):
+    job_id: str = Field(example="0f7c2a9e-1d8b-4f3a-9c59-6a3e2b7d1c40")
+    rag_id: str = Field(example="38cd5a6e-bbff-4631-a7a2-11ba811b81f2")
+    status: str = Field(example="running")  # queued, running, done, failed
+    chunks_total: int = Field(example=1200)  # 빌드가 끝난 뒤 확정됨
+    chunks_embedded: int = Field(example=512)
+    elapsed_seconds: Optional[float] = Field(None, example=12.5)
+    error: Optional[str] = Field(None, example=None)
+    created_at: datetime
+
+    @classmethod
+    def from_job(cls, job) -> "RagBuildJobDTO":
+        elapsed = None
+        if job.started_at:
+            started = datetime.fromisoformat(job.started_at)
+            finished = datetime.fromisoformat(job.finished_at) if job.finished_at else datetime.now()
+            elapsed = (finished - started).total_seconds()
+        return cls(
+            job_id=job.id,
+            rag_id=job.rag_id,
+            status=job.status,
+            chunks_total=job.chunks_total,
+            chunks_embedded=job.chunks_embedded,
+            elapsed_seconds=elapsed,
+            error=job.error,
+            created_at=datetime.fromisoformat(job.created_at)
+        )
 
     
 class RagDocumentSearchResponseDTO(BaseModel):
@@ -94,7 +166,19 @@ class RagDocumentSearchResponseDTO(BaseModel):
     metadatas: Optional[List[List[Optional[dict]]]] = Field(
         None,
         example=[
-            [None, None, None, None, None]
+            [
+                {
+                    "dataset_id": "90c76ad8-e7b2-4d8b-8651-64801fbd9939",
+                    "chunk_index": 5,
+                    "page": 2,
+                    "last_page": 2,
+                    "char_start": 4000,
+                    "char_end": 5000,
+                    "chunk_params": "char:1000:200:v2",
+                    "embedding_model": "text-embedding-3-small",
+                    "embedding_dimensions": 1536
+                }
+            ]
         ]
     )
     distances: Optional[List[List[float]]] = Field(
@@ -108,4 +192,38 @@ class RagDocumentSearchResponseDTO(BaseModel):
                 1.61759352684021
             ]
         ]
-    )
\ No newline at end of file
+    )
+    # lexical 모드는 BM25 점수, hybrid 모드는 RRF 점수 (높을수록 관련도가 높음, distances는 없음)
+    scores: Optional[List[List[float]]] = Field(None, example=None)
+
+
+class EmbeddingCacheStatsDTO(BaseModel):
+    enabled: bool = Field(example=True)
+    hits: int = Field(0, example=1520)
+    misses: int = Field(0, example=80)
+    hit_rate: float = Field(0.0, example=0.95)
+    entries: int = Field(0, example=12000)
+    size_bytes: int = Field(0, example=73728000)
+    max_bytes: int = Field(0, example=1073741824)
+
+
+class CacheStatsDTO(BaseModel):
+    hits: int = Field(example=830)
+    misses: int = Field(example=170)
+    hit_rate: float = Field(example=0.83)
+    evictions: int = Field(example=0)
+    size: int = Field(example=170)
+    maxsize: int = Field(example=10000)
+
+
+class AnswerCacheStatsDTO(BaseModel):
+    enabled: bool = Field(example=True)
+    hits: int = Field(0, example=420)
+    misses: int = Field(0, example=580)
+    hit_rate: float = Field(0.0, example=0.42)
+    evictions: int = Field(0, example=0)  # RAG당 크기 제한으로 제거된 항목 수
+    rag_evictions: int = Field(0, example=0)  # RAG 수 제한으로 제거된 RAG 수
+    expirations: int = Field(0, example=35)
+    invalidations: int = Field(0, example=120)  # 재빌드로 무효가 된 항목 수
+    rags: int = Field(0, example=12)
+    threshold: float = Field(0.0, example=0.95)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, Index, String, Integer, text
+import uuid
 
 from app.db.sqlite.base import Base
 
@@ -15,4 +16,56 @@ class RagModel(Base):
     dataset_ids = Column(String, nullable=False, default="[]")  # JSON string of dataset IDs
     llm_model = Column(String, nullable=False)  # OpenAI model name
     chunk_size = Column(Integer, nullable=False)  # Chunk size for text processing
-    
\ No newline at end of file
+    chunk_overlap = Column(Integer, nullable=False, default=200)  # 이웃한 청크끼리 겹치는 크기
+    chunk_unit = Column(String, nullable=False, default="char")  # 'char' 또는 'token' (tiktoken)
+    vector_backend = Column(String, nullable=False, default="chroma")  # 'chroma' 또는 'numpy' (app.db.vector_store)
+
+    # 목록 키셋 페이지네이션용 (created_at, id) 정렬 인덱스
+    __table_args__ = (
+        Index("ix_rags_created_at_id", "created_at", "id"),
+        Index("ix_rags_made_by_user_created_at_id", "made_by_user", "created_at", "id"),
+    )
+
+
+class RagBuildJob(Base):
+    __tablename__ = "rag_build_jobs"
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    rag_id = Column(String, nullable=False, index=True)
+
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    chunks_total = Column(Integer, nullable=False, default=0)
+    chunks_embedded = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+
+    created_at = Column(String, nullable=False)  # Store as ISO format string
+    started_at = Column(String, nullable=True)
+    finished_at = Column(String, nullable=True)
+
+    # 작업을 맡은 프로세스(build_jobs.WORKER_ID)와 그 프로세스가 마지막으로 살아 있음을 기록한 시각
+    owner = Column(String, nullable=True)
+    heartbeat_at = Column(String, nullable=True)
+
+    # RAG마다 대기/실행 중인 작업은 하나만 (동시에 빌드를 요청해도 한 컬렉션에 두 빌드가 쓰지 않도록)
+    __table_args__ = (
+        Index(
+            "ux_rag_build_jobs_active_rag_id", "rag_id", unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+
+class RagDatasetBuild(Base):
+    __tablename__ = "rag_dataset_builds"
+
+    # RAG 컬렉션에 마지막으로 반영된 데이터셋의 상태 (증분 빌드용)
+    rag_id = Column(String, primary_key=True)
+    dataset_id = Column(String, primary_key=True)
+
+    content_hash = Column(String, nullable=False)  # 데이터셋 파일의 SHA-256
+    chunk_params = Column(String, nullable=False)  # 청크 분할 설정 (e.g. 'char:1000:200:v2', 'token:256:32:cl100k_base:v2')
+    chunk_count = Column(Integer, nullable=False)
+    # 청크를 임베딩한 모델과 벡터 차원 (바뀌면 컬렉션 전체를 다시 임베딩, 0007 이전 기록은 NULL)
+    embedding_model = Column(String, nullable=True)
+    embedding_dimensions = Column(Integer, nullable=True)
+    built_at = Column(String, nullable=False)  # Store as ISO format string
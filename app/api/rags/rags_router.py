@@ -1,162 +1,369 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Optional
+import anyio
+import json
 
 
-from app.db.deps import get_db
+from app.db.deps import get_db, get_chroma_client
+from app.db.chroma.client import ChromaDBClient
+from app.db.vector_store import get_vector_store
 from app.core.auth import get_current_user
+from app.core.providers import get_provider
+from app.core.pagination import PageParams, page_params, paginate
 import app.api.rags.rags_crud as crud
 import app.api.rags.rags_dto as dto
 from app.api.users import users_crud
+from app.api.users.users_dto import BookmarksDTO
 
-from app.services.rags.build_db import build_db
-from app.db.chroma.client import chroma_client
+from app.services.rags.build_jobs import enqueue_build
+from app.services.rags.embedding_cache import get_embedding_cache
+from app.services.rags.retrieval import LexicalIndexMissingError, search_documents
 
 router = APIRouter()
 
 
+def _get_answer_cache():
+    # 답변 캐시는 numpy를 쓰므로 처음 사용할 때 불러옴
+    from app.services.rags.answer_cache import get_answer_cache
+    return get_answer_cache()
+
+
 @router.post("/create", tags=["rags"], response_model=dto.RagResponseDTO)
 async def create_rag(
     item: dto.RagCreateDTO,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    rag = crud.create_rag(item, current_user['sub'], db)
+    rag = await crud.create_rag(item, current_user['sub'], db)
     
     # username 조회
-    user = users_crud.get_user_by_id(rag.made_by_user, db)
-    username = user.username if user else "Unknown"
-    
-    return dto.RagResponseDTO(
-        id=rag.id,
-        name=rag.name,
-        description=rag.description,
-        made_by_user=rag.made_by_user,
-        username=username,
-        created_at=rag.created_at,
-        dataset_ids=rag.dataset_ids,
-        llm_model=rag.llm_model,
-        chunk_size=rag.chunk_size
-    )
+    user = await users_crud.get_user_by_id(rag.made_by_user, db)
+    
+    return dto.RagResponseDTO.from_model(rag, user.username if user else None)
 
 @router.get("/list", tags=["rags"], response_model=List[dto.RagResponseDTO])
-async def list_rags(db: Session = Depends(get_db)):
-    rags = crud.get_rags_list(db)
-    
-    # 각 RAG에 대해 username 조회해서 추가
-    result = []
-    for rag in rags:
-        user = users_crud.get_user_by_id(rag.made_by_user, db)
-        username = user.username if user else "Unknown"
-        
-        result.append(dto.RagResponseDTO(
-            id=rag.id,
-            name=rag.name,
-            description=rag.description,
-            made_by_user=rag.made_by_user,
-            username=username,
-            created_at=rag.created_at,
-            dataset_ids=rag.dataset_ids,
-            llm_model=rag.llm_model,
-            chunk_size=rag.chunk_size
-        ))
-    
-    return result
+async def list_rags(
+    response: Response,
+    page: PageParams = Depends(page_params),
+    made_by_user: Optional[str] = Query(None, description="만든 사용자 CUID"),
+    q: Optional[str] = Query(None, max_length=100, description="이름 검색어 (부분 일치)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    RAG 목록을 created_at 순으로 한 페이지씩 조회합니다.
+    다음 페이지가 있으면 응답의 X-Next-Cursor 헤더 값을 cursor로 넘기면 됩니다.
+    """
+    # username은 users 테이블과 조인해서 함께 조회
+    rags = await crud.get_rags_list(db, page, made_by_user=made_by_user, name=q)
+    
+    return [dto.RagResponseDTO.from_model(rag, username) for rag, username in paginate(rags, page, response)]
+
+@router.get("/embedding_cache/stats", tags=["rags"], response_model=dto.EmbeddingCacheStatsDTO)
+async def get_embedding_cache_stats():
+    """
+    빌드용 임베딩 캐시의 적중/미스 횟수와 크기를 조회합니다.
+    """
+    cache = get_embedding_cache()
+    if not cache:
+        return dto.EmbeddingCacheStatsDTO(enabled=False)
+    
+    return dto.EmbeddingCacheStatsDTO(enabled=True, **cache.stats())
+
+@router.get("/query_embedding_cache/stats", tags=["rags"], response_model=dto.CacheStatsDTO)
+async def get_query_embedding_cache_stats(chroma_client: ChromaDBClient = Depends(get_chroma_client)):
+    """
+    검색/질문용 쿼리 임베딩 캐시의 적중률을 조회합니다.
+    """
+    return chroma_client.query_embedding_cache.stats()
+
+@router.get("/answer_cache/stats", tags=["rags"], response_model=dto.AnswerCacheStatsDTO)
+async def get_answer_cache_stats():
+    """
+    질문 답변 시맨틱 캐시의 적중률을 조회합니다.
+    """
+    cache = _get_answer_cache()
+    if not cache:
+        return dto.AnswerCacheStatsDTO(enabled=False)
+    
+    return dto.AnswerCacheStatsDTO(enabled=True, **cache.stats())
+
+@router.get("/popular", tags=["rags"], response_model=List[dto.PopularRagDTO])
+async def list_popular_rags(
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    북마크가 많은 순으로 RAG를 조회합니다.
+    """
+    rows = await crud.get_popular_rags(limit, db)
+    
+    popular = []
+    for rag, username, bookmark_count in rows:
+        item = dto.PopularRagDTO.from_model(rag, username)
+        item.bookmark_count = bookmark_count
+        popular.append(item)
+    return popular
 
 @router.get("/{rag_id}", tags=["rags"], response_model=dto.RagResponseDTO)
-async def get_rag(rag_id: str, db: Session = Depends(get_db)):
-    rag = crud.get_rag_by_id(rag_id, db)
-    if not rag:
+async def get_rag(rag_id: str, db: AsyncSession = Depends(get_db)):
+    row = await crud.get_rag_with_username(rag_id, db)
+    if not row:
         raise HTTPException(status_code=404, detail="RAG를 찾을 수 없습니다.")
     
-    # username 조회
-    user = users_crud.get_user_by_id(rag.made_by_user, db)
-    username = user.username if user else "Unknown"
-    
-    return dto.RagResponseDTO(
-        id=rag.id,
-        name=rag.name,
-        description=rag.description,
-        made_by_user=rag.made_by_user,
-        username=username,
-        created_at=rag.created_at,
-        dataset_ids=rag.dataset_ids,
-        llm_model=rag.llm_model,
-        chunk_size=rag.chunk_size
-    )
+    rag, username = row
+    return dto.RagResponseDTO.from_model(rag, username)
 
+@router.get("/{rag_id}/bookmarks", tags=["rags"], response_model=BookmarksDTO)
+async def get_rag_bookmarks(
+    rag_id: str,
+    limit: int = Query(50, ge=1, le=200, description="함께 반환할 최근 북마크 사용자 수 (RAG를 만든 사용자만)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    RAG의 북마크 수를 조회합니다.
+    RAG를 만든 사용자에게는 최근 북마크한 사용자들도 함께 반환합니다.
+    """
+    rag = await crud.get_rag_by_id(rag_id, db)
+    if not rag:
+        raise HTTPException(status_code=404, detail="RAG를 찾을 수 없습니다.")
+    
+    # 누가 북마크했는지는 만든 사용자에게만 보여주고, 다른 사용자에게는 수만 반환
+    if rag.made_by_user != current_user['sub']:
+        limit = 0
+    return await users_crud.get_rag_bookmarks(rag_id, limit, db)
 
 
-@router.post("/{rag_id}/build", tags=["rags"], response_model=dto.RagBuildResponseDTO)
+@router.post("/{rag_id}/build", tags=["rags"], response_model=dto.RagBuildJobDTO, status_code=status.HTTP_202_ACCEPTED)
 async def build_rag_db(
     rag_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    rag = crud.get_rag_by_id(rag_id, db)
+    """
+    RAG 벡터 데이터베이스 구축 작업을 큐에 넣고 작업 ID를 바로 반환합니다.
+    """
+    rag = await crud.get_rag_by_id(rag_id, db)
     if not rag:
         raise HTTPException(status_code=404, detail="RAG를 찾을 수 없습니다.")
     
     if rag.made_by_user != current_user['sub']:
         raise HTTPException(status_code=403, detail="권한이 없습니다.")
     
-    build_result = build_db(rag_id, db)
+    job = await enqueue_build(rag_id, db)
     
-    if not build_result:
-        raise HTTPException(status_code=500, detail="벡터 데이터베이스 구축에 실패했습니다.")
+    return dto.RagBuildJobDTO.from_job(job)
+
+@router.get("/{rag_id}/build/{job_id}", tags=["rags"], response_model=dto.RagBuildJobDTO)
+async def get_rag_build_status(
+    rag_id: str,
+    job_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    RAG 빌드 작업의 상태와 진행률을 조회합니다.
+    """
+    job = await crud.get_build_job(job_id, db)
+    if not job or job.rag_id != rag_id:
+        raise HTTPException(status_code=404, detail="빌드 작업을 찾을 수 없습니다.")
     
-    return {"message": "RAG 벡터 데이터베이스가 성공적으로 구축되었습니다."}
+    return dto.RagBuildJobDTO.from_job(job)
 
 @router.post("/document_search", tags=["rags"], response_model=dto.RagDocumentSearchResponseDTO)
 async def search_rag_documents(
     item: dto.RagDocumentSearchDTO,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    chroma_client: ChromaDBClient = Depends(get_chroma_client),
     current_user: dict = Depends(get_current_user)
 ):
-    rag = crud.get_rag_by_id(item.rag_id, db)
+    rag = await crud.get_rag_by_id(item.rag_id, db)
     
     if not rag:
         raise HTTPException(status_code=404, detail="RAG를 찾을 수 없습니다.")
     
+    # 외부 호출 동안 DB 연결을 붙잡지 않도록 세션을 반환
+    await db.close()
     
-    return chroma_client.search_by_embedding(chroma_client.get_chroma_collection_name(rag_id=item.rag_id),chroma_client._get_embedding(item.query))
+    return await _search_documents(chroma_client, rag, item, [item.query])
 
 
-@router.get("/{rag_id}/question/{question}", tags=["rags"], response_model=dto.RagQuestionResponseDTO)
-async def rag_question_answer(
-    rag_id: str,
-    question: str,
-    db: Session = Depends(get_db)):
+@router.post("/batch_search", tags=["rags"], response_model=dto.RagDocumentSearchResponseDTO)
+async def batch_search_rag_documents(
+    item: dto.RagBatchSearchDTO,
+    db: AsyncSession = Depends(get_db),
+    chroma_client: ChromaDBClient = Depends(get_chroma_client),
+    current_user: dict = Depends(get_current_user)
+):
     """
-    RAG를 사용하여 질문에 대한 답변을 생성합니다.
+    여러 질의를 한 번에 검색합니다.
+    결과의 각 필드는 queries와 같은 순서로 질의마다 하나의 목록을 가집니다.
     """
-    rag = crud.get_rag_by_id(rag_id, db)
+    rag = await crud.get_rag_by_id(item.rag_id, db)
     
     if not rag:
         raise HTTPException(status_code=404, detail="RAG를 찾을 수 없습니다.")
     
-    # RAG 벡터 데이터베이스에서 문서 검색
-    search_results = chroma_client.search_by_embedding(
-        chroma_client.get_chroma_collection_name(rag_id=rag_id),
-        chroma_client._get_embedding(question)
+    # 외부 호출 동안 DB 연결을 붙잡지 않도록 세션을 반환
+    await db.close()
+    
+    return await _search_documents(chroma_client, rag, item, item.queries)
+
+
+async def _search_documents(chroma_client: ChromaDBClient, rag, item: dto.RagSearchFilterDTO, queries: List[str]) -> dict:
+    # 데이터셋/페이지 필터는 검색 단계에서 적용해 필터를 통과한 청크 중에서 top_k개를 받음
+    try:
+        return await search_documents(
+            chroma_client, item.rag_id, queries, item.top_k, item.mode, item.search_filter(), rag.vector_backend
+        )
+    except LexicalIndexMissingError:
+        raise HTTPException(status_code=409, detail="검색 색인이 없습니다. RAG를 다시 빌드해 주세요.")
+
+async def _search_question_documents(chroma_client: ChromaDBClient, rag, question_embedding: list) -> dict:
+    # RAG 벡터 저장소에서 질문과 관련된 문서 검색
+    search_results = await get_vector_store(rag.vector_backend).search_by_embedding_async(
+        chroma_client.get_chroma_collection_name(rag_id=rag.id),
+        question_embedding
     )
     
     if not search_results or not search_results['documents']:
         raise HTTPException(status_code=404, detail="관련 문서를 찾을 수 없습니다.")
     
+    return search_results
+
+def _question_messages(question: str, search_results: dict) -> List[Dict[str, str]]:
     # 검색 결과를 평탄화하여 문자열로 변환
     documents = []
     for doc_list in search_results['documents']:
         documents.extend(doc_list)
     
-    # OpenAI API를 사용하여 답변 생성
-    response = chroma_client.openai_client.chat.completions.create(
-        model=rag.llm_model,
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": question},
-            {"role": "assistant", "content": "\n".join(documents)}
-        ]
-    )
+    return [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": "\n".join(documents)}
+    ]
+
+def _chunk_ids(search_results: dict) -> List[str]:
+    return [id for ids in search_results['ids'] for id in ids]
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.get("/{rag_id}/question/{question}", tags=["rags"], response_model=dto.RagQuestionResponseDTO)
+async def rag_question_answer(
+    rag_id: str,
+    question: str,
+    db: AsyncSession = Depends(get_db),
+    chroma_client: ChromaDBClient = Depends(get_chroma_client)):
+    """
+    RAG를 사용하여 질문에 대한 답변을 생성합니다.
+    """
+    rag = await crud.get_rag_by_id(rag_id, db)
+    
+    if not rag:
+        raise HTTPException(status_code=404, detail="RAG를 찾을 수 없습니다.")
+    
+    # 캐시 항목이 마지막 빌드 이후의 것인지 확인하기 위한 빌드 시각
+    build_stamp = await crud.get_last_build_finished_at(rag_id, db)
+    
+    # 외부 호출 동안 DB 연결을 붙잡지 않도록 세션을 반환
+    await db.close()
+    
+    question_embedding = await chroma_client.get_embedding_async(question)
     
-    return {"answer": response.choices[0].message.content}
\ No newline at end of file
+    # 비슷한 질문에 대한 답변이 캐시되어 있으면 검색과 답변 생성을 건너뜀
+    answer_cache = _get_answer_cache()
+    if answer_cache:
+        cached = answer_cache.get(rag_id, build_stamp, question_embedding)
+        if cached:
+            return {"answer": cached.answer}
+    
+    search_results = await _search_question_documents(chroma_client, rag, question_embedding)
+    
+    # 설정된 제공자(OpenAI 또는 로컬)로 답변 생성
+    answer = await get_provider().chat(rag.llm_model, _question_messages(question, search_results))
+    
+    if answer_cache and answer:
+        answer_cache.set(rag_id, build_stamp, question, question_embedding, _chunk_ids(search_results), answer)
+    
+    return {"answer": answer}
+
+@router.get("/{rag_id}/question/{question}/stream", tags=["rags"])
+async def rag_question_answer_stream(
+    rag_id: str,
+    question: str,
+    db: AsyncSession = Depends(get_db),
+    chroma_client: ChromaDBClient = Depends(get_chroma_client)):
+    """
+    RAG를 사용한 답변을 Server-Sent Events로 스트리밍합니다.
+    
+    - `retrieval`: 검색된 청크 ID (`{"ids": [...]}`), 답변 생성 전에 바로 전송
+    - `token`: 모델이 생성한 답변 조각 (`{"content": "..."}`)
+    - `done`: 답변 완료 (`{"finish_reason": "stop"}`)
+    - `error`: 답변 생성 중 오류 (`{"detail": "..."}`)
+    
+    클라이언트 연결이 끊기면 모델 스트림도 닫아 생성을 중단합니다.
+    캐시된 답변이 있으면 `token` 하나로 보내고 `done`의 finish_reason은 `cached`입니다.
+    """
+    rag = await crud.get_rag_by_id(rag_id, db)
+    
+    if not rag:
+        raise HTTPException(status_code=404, detail="RAG를 찾을 수 없습니다.")
+    
+    build_stamp = await crud.get_last_build_finished_at(rag_id, db)
+    
+    # 외부 호출 동안 DB 연결을 붙잡지 않도록 세션을 반환
+    await db.close()
+    
+    question_embedding = await chroma_client.get_embedding_async(question)
+    
+    answer_cache = _get_answer_cache()
+    cached = answer_cache.get(rag_id, build_stamp, question_embedding) if answer_cache else None
+    if cached:
+        async def cached_events():
+            yield _sse_event("retrieval", {"ids": cached.chunk_ids})
+            yield _sse_event("token", {"content": cached.answer})
+            yield _sse_event("done", {"finish_reason": "cached"})
+        
+        return StreamingResponse(
+            cached_events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    search_results = await _search_question_documents(chroma_client, rag, question_embedding)
+    messages = _question_messages(question, search_results)
+    
+    async def events():
+        chunk_ids = _chunk_ids(search_results)
+        yield _sse_event("retrieval", {"ids": chunk_ids})
+        
+        stream = get_provider().chat_stream(rag.llm_model, messages)
+        try:
+            finish_reason = None
+            parts = []
+            async for content, chunk_finish_reason in stream:
+                if content:
+                    parts.append(content)
+                    yield _sse_event("token", {"content": content})
+                if chunk_finish_reason:
+                    finish_reason = chunk_finish_reason
+            
+            # 끝까지 생성된 답변만 캐시
+            if answer_cache and finish_reason == "stop" and parts:
+                answer_cache.set(rag_id, build_stamp, question, question_embedding, chunk_ids, "".join(parts))
+            yield _sse_event("done", {"finish_reason": finish_reason})
+        except Exception as e:
+            yield _sse_event("error", {"detail": str(e)})
+        finally:
+            # 클라이언트가 끊겨 취소된 경우에도 업스트림 연결을 닫아 생성을 중단
+            with anyio.CancelScope(shield=True):
+                await stream.aclose()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,35 +1,42 @@
-from sqlalchemy.orm import Session
-import json
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+import datetime
 
 from app.db.deps import get_db
-from app.core.password import hash_password
-from app.api.users.users_model import User
+from app.core.password import hash_password_async
+from app.api.users.users_model import User, RagBookmark, DatasetBookmark
+from app.api.datasets.datasets_model import Dataset
+from app.api.rags.rags_model import RagModel
 import app.api.users.users_dto as dto
 
-def get_user_by_email(email: str, db: Session):
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(email: str, db: AsyncSession):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def get_user_by_id(user_id: str, db: Session) -> User:
-    return db.query(User).filter(User.cuid == user_id).first()
+async def get_user_by_id(user_id: str, db: AsyncSession) -> User:
+    result = await db.execute(select(User).where(User.cuid == user_id))
+    return result.scalars().first()
 
-def register_user(item: dto.UserCreateDTO, db: Session):
+async def register_user(item: dto.UserCreateDTO, db: AsyncSession):
     db_user = User(
         username=item.username,
         email=item.email,
-        hashed_password=hash_password(item.password)
+        hashed_password=await hash_password_async(item.password)
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return dto.UserResponseDTO(
         cuid=db_user.cuid,
         username=db_user.username,
         email=db_user.email
     )
 
-def update_user(user_id: str, item: dto.UserUpdateDTO, db: Session):
+async def update_user(user_id: str, item: dto.UserUpdateDTO, db: AsyncSession):
     """사용자 기본 정보를 업데이트합니다."""
-    db_user = get_user_by_id(user_id, db)
+    db_user = await get_user_by_id(user_id, db)
     if not db_user:
         return None
     
@@ -38,10 +45,10 @@ def update_user(user_id: str, item: dto.UserUpdateDTO, db: Session):
     if item.email is not None:
         db_user.email = item.email
     if item.password is not None:
-        db_user.hashed_password = hash_password(item.password)
+        db_user.hashed_password = await hash_password_async(item.password)
     
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return dto.UserResponseDTO(
         cuid=db_user.cuid,
@@ -49,161 +56,109 @@ def update_user(user_id: str, item: dto.UserUpdateDTO, db: Session):
         email=db_user.email
     )
 
-def get_user_profile(user_id: str, db: Session):
+async def _user_exists(user_id: str, db: AsyncSession) -> bool:
+    result = await db.execute(select(User.cuid).where(User.cuid == user_id))
+    return result.first() is not None
+
+async def _ids(stmt, db: AsyncSession) -> List[str]:
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+async def get_user_profile(user_id: str, db: AsyncSession):
     """사용자 프로필과 생성/북마크한 항목들을 조회합니다."""
-    db_user = get_user_by_id(user_id, db)
+    db_user = await get_user_by_id(user_id, db)
     if not db_user:
         return None
     
+    # 생성한 항목은 made_by_user 인덱스로, 북마크는 연결 테이블 기본 키로 조회 (오래된 순)
     return dto.UserProfileDTO(
         cuid=db_user.cuid,
         username=db_user.username,
         email=db_user.email,
-        created_dataset_ids=json.loads(db_user.created_dataset_ids or "[]"),
-        bookmarked_dataset_ids=json.loads(db_user.bookmarked_dataset_ids or "[]"),
-        created_rag_ids=json.loads(db_user.created_rag_ids or "[]"),
-        bookmarked_rag_ids=json.loads(db_user.bookmarked_rag_ids or "[]")
+        created_dataset_ids=await _ids(
+            select(Dataset.id).where(Dataset.made_by_user == user_id)
+            .order_by(Dataset.created_at, Dataset.id), db
+        ),
+        bookmarked_dataset_ids=await _ids(
+            select(DatasetBookmark.dataset_id).where(DatasetBookmark.user_cuid == user_id)
+            .order_by(DatasetBookmark.created_at, DatasetBookmark.dataset_id), db
+        ),
+        created_rag_ids=await _ids(
+            select(RagModel.id).where(RagModel.made_by_user == user_id)
+            .order_by(RagModel.created_at, RagModel.id), db
+        ),
+        bookmarked_rag_ids=await _ids(
+            select(RagBookmark.rag_id).where(RagBookmark.user_cuid == user_id)
+            .order_by(RagBookmark.created_at, RagBookmark.rag_id), db
+        )
     )
 
-def add_created_dataset(user_id: str, dataset_id: str, db: Session):
-    """사용자가 생성한 데이터셋 ID를 추가합니다."""
-    db_user = get_user_by_id(user_id, db)
-    if not db_user:
-        return False
-    
-    created_ids = json.loads(db_user.created_dataset_ids or "[]")
-    if dataset_id not in created_ids:
-        created_ids.append(dataset_id)
-        db_user.created_dataset_ids = json.dumps(created_ids)
-        db.commit()
-    
-    return True
-
-def remove_created_dataset(user_id: str, dataset_id: str, db: Session):
-    """사용자가 생성한 데이터셋 ID를 제거합니다."""
-    db_user = get_user_by_id(user_id, db)
-    if not db_user:
-        return False
-    
-    created_ids = json.loads(db_user.created_dataset_ids or "[]")
-    if dataset_id in created_ids:
-        created_ids.remove(dataset_id)
-        db_user.created_dataset_ids = json.dumps(created_ids)
-        db.commit()
-    
-    return True
-
-def add_bookmarked_dataset(user_id: str, dataset_id: str, db: Session):
-    """사용자가 북마크한 데이터셋 ID를 추가합니다."""
-    db_user = get_user_by_id(user_id, db)
-    if not db_user:
-        return False
-    
-    bookmarked_ids = json.loads(db_user.bookmarked_dataset_ids or "[]")
-    if dataset_id not in bookmarked_ids:
-        bookmarked_ids.append(dataset_id)
-        db_user.bookmarked_dataset_ids = json.dumps(bookmarked_ids)
-        db.commit()
-    
-    return True
-
-def remove_bookmarked_dataset(user_id: str, dataset_id: str, db: Session):
-    """사용자가 북마크한 데이터셋 ID를 제거합니다."""
-    db_user = get_user_by_id(user_id, db)
-    if not db_user:
-        return False
-    
-    bookmarked_ids = json.loads(db_user.bookmarked_dataset_ids or "[]")
-    if dataset_id in bookmarked_ids:
-        bookmarked_ids.remove(dataset_id)
-        db_user.bookmarked_dataset_ids = json.dumps(bookmarked_ids)
-        db.commit()
-    
-    return True
-
-def add_created_rag(user_id: str, rag_id: str, db: Session):
-    """사용자가 생성한 RAG ID를 추가합니다."""
-    db_user = get_user_by_id(user_id, db)
-    if not db_user:
-        return False
-    
-    created_ids = json.loads(db_user.created_rag_ids or "[]")
-    if rag_id not in created_ids:
-        created_ids.append(rag_id)
-        db_user.created_rag_ids = json.dumps(created_ids)
-        db.commit()
-    
-    return True
-
-def remove_created_rag(user_id: str, rag_id: str, db: Session):
-    """사용자가 생성한 RAG ID를 제거합니다."""
-    db_user = get_user_by_id(user_id, db)
-    if not db_user:
+async def _add_bookmark(bookmark_model, target_column: str, user_id: str, target_id: str, db: AsyncSession) -> bool:
+    if not await _user_exists(user_id, db):
         return False
     
-    created_ids = json.loads(db_user.created_rag_ids or "[]")
-    if rag_id in created_ids:
-        created_ids.remove(rag_id)
-        db_user.created_rag_ids = json.dumps(created_ids)
-        db.commit()
-    
-    return True
-
-def add_bookmarked_rag(user_id: str, rag_id: str, db: Session):
-    """사용자가 북마크한 RAG ID를 추가합니다."""
-    db_user = get_user_by_id(user_id, db)
-    if not db_user:
-        return False
-    
-    bookmarked_ids = json.loads(db_user.bookmarked_rag_ids or "[]")
-    if rag_id not in bookmarked_ids:
-        bookmarked_ids.append(rag_id)
-        db_user.bookmarked_rag_ids = json.dumps(bookmarked_ids)
-        db.commit()
-    
-    return True
-
-def remove_bookmarked_rag(user_id: str, rag_id: str, db: Session):
-    """사용자가 북마크한 RAG ID를 제거합니다."""
-    db_user = get_user_by_id(user_id, db)
-    if not db_user:
-        return False
-    
-    bookmarked_ids = json.loads(db_user.bookmarked_rag_ids or "[]")
-    if rag_id in bookmarked_ids:
-        bookmarked_ids.remove(rag_id)
-        db_user.bookmarked_rag_ids = json.dumps(bookmarked_ids)
-        db.commit()
-    
+    # 한 행 INSERT, 이미 북마크되어 있으면 무시 (동시 요청에도 갱신이 유실되지 않음)
+    await db.execute(
+        sqlite_insert(bookmark_model)
+        .values({"user_cuid": user_id, target_column: target_id, "created_at": datetime.datetime.now().isoformat()})
+        .on_conflict_do_nothing()
+    )
+    await db.commit()
     return True
 
-
-def add_created_rag(user_id: str, rag_id: str, db: Session):
-    """사용자가 생성한 RAG ID를 추가합니다."""
-    db_user = get_user_by_id(user_id, db)
-    if not db_user:
+async def _remove_bookmark(bookmark_model, target_column: str, user_id: str, target_id: str, db: AsyncSession) -> bool:
+    if not await _user_exists(user_id, db):
         return False
     
-    created_ids = json.loads(db_user.created_rag_ids or "[]")
-    if rag_id not in created_ids:
-        created_ids.append(rag_id)
-        db_user.created_rag_ids = json.dumps(created_ids)
-        db.commit()
-    
+    await db.execute(
+        delete(bookmark_model).where(
+            bookmark_model.user_cuid == user_id,
+            getattr(bookmark_model, target_column) == target_id
+        )
+    )
+    await db.commit()
     return True
 
+async def add_bookmarked_dataset(user_id: str, dataset_id: str, db: AsyncSession):
+    """사용자가 북마크한 데이터셋을 추가합니다."""
+    return await _add_bookmark(DatasetBookmark, "dataset_id", user_id, dataset_id, db)
+
+async def remove_bookmarked_dataset(user_id: str, dataset_id: str, db: AsyncSession):
+    """사용자가 북마크한 데이터셋을 제거합니다."""
+    return await _remove_bookmark(DatasetBookmark, "dataset_id", user_id, dataset_id, db)
+
+async def add_bookmarked_rag(user_id: str, rag_id: str, db: AsyncSession):
+    """사용자가 북마크한 RAG를 추가합니다."""
+    return await _add_bookmark(RagBookmark, "rag_id", user_id, rag_id, db)
+
+async def remove_bookmarked_rag(user_id: str, rag_id: str, db: AsyncSession):
+    """사용자가 북마크한 RAG를 제거합니다."""
+    return await _remove_bookmark(RagBookmark, "rag_id", user_id, rag_id, db)
+
+async def _get_bookmarks(bookmark_model, target_column: str, target_id: str, limit: int, db: AsyncSession) -> dto.BookmarksDTO:
+    target = getattr(bookmark_model, target_column)
+    count = await db.scalar(select(func.count()).select_from(bookmark_model).where(target == target_id))
+    if not limit:
+        return dto.BookmarksDTO(count=count)
+    result = await db.execute(
+        select(User.cuid, User.username, bookmark_model.created_at)
+        .join(User, User.cuid == bookmark_model.user_cuid)
+        .where(target == target_id)
+        .order_by(bookmark_model.created_at.desc())
+        .limit(limit)
+    )
+    return dto.BookmarksDTO(
+        count=count,
+        users=[
+            dto.BookmarkUserDTO(cuid=cuid, username=username, bookmarked_at=created_at)
+            for cuid, username, created_at in result.all()
+        ]
+    )
 
-def remove_created_rag(user_id: str, rag_id: str, db: Session):
-    """사용자가 생성한 RAG ID를 제거합니다."""
-    db_user = get_user_by_id(user_id, db)
-    if not db_user:
-        return False
-    
-    created_ids = json.loads(db_user.created_rag_ids or "[]")
-    if rag_id in created_ids:
-        created_ids.remove(rag_id)
-        db_user.created_rag_ids = json.dumps(created_ids)
-        db.commit()
-    
-    return True
+async def get_dataset_bookmarks(dataset_id: str, limit: int, db: AsyncSession) -> dto.BookmarksDTO:
+    """데이터셋을 북마크한 사용자 수와 최근 북마크한 사용자들을 조회합니다."""
+    return await _get_bookmarks(DatasetBookmark, "dataset_id", dataset_id, limit, db)
 
+async def get_rag_bookmarks(rag_id: str, limit: int, db: AsyncSession) -> dto.BookmarksDTO:
+    """RAG를 북마크한 사용자 수와 최근 북마크한 사용자들을 조회합니다."""
+    return await _get_bookmarks(RagBookmark, "rag_id", rag_id, limit, db)
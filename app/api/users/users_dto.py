@@ -35,6 +35,15 @@ class UserProfileDTO(BaseModel):
     created_rag_ids: List[str] = []
     bookmarked_rag_ids: List[str] = []
 
+class BookmarkUserDTO(BaseModel):
+    cuid: str
+    username: str
+    bookmarked_at: str
+
+class BookmarksDTO(BaseModel):
+    count: int  # 전체 북마크 수
+    users: List[BookmarkUserDTO] = []  # 최근 북마크한 사용자 순
+
 class TokenResponseDTO(BaseModel):
     access_token: str
     token_type: str = "bearer"
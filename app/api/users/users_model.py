@@ -1,4 +1,6 @@
 from sqlalchemy import (Column,
+                        Index,
+                        PrimaryKeyConstraint,
                         String)
 import cuid
 
@@ -12,8 +14,31 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
 
-    bookmarked_rag_ids = Column(String, default="[]")  # Store as JSON string
-    bookmarked_dataset_ids = Column(String, default="[]")  # Store as JSON string
+    # 생성한 RAG/데이터셋은 rags/datasets의 made_by_user로, 북마크는 아래 연결 테이블로 조회
 
-    created_rag_ids = Column(String, default="[]")  # Store as JSON string
-    created_dataset_ids = Column(String, default="[]")  # Store as JSON string
\ No newline at end of file
+
+class RagBookmark(Base):
+    __tablename__ = "rag_bookmarks"
+
+    user_cuid = Column(String, nullable=False)
+    rag_id = Column(String, nullable=False)
+    created_at = Column(String, nullable=False)  # Store as ISO format string
+
+    # 사용자별 북마크는 기본 키로, RAG별 북마크한 사용자/북마크 수는 rag_id 인덱스로 조회
+    __table_args__ = (
+        PrimaryKeyConstraint("user_cuid", "rag_id"),
+        Index("ix_rag_bookmarks_rag_id_user_cuid", "rag_id", "user_cuid"),
+    )
+
+
+class DatasetBookmark(Base):
+    __tablename__ = "dataset_bookmarks"
+
+    user_cuid = Column(String, nullable=False)
+    dataset_id = Column(String, nullable=False)
+    created_at = Column(String, nullable=False)  # Store as ISO format string
+
+    __table_args__ = (
+        PrimaryKeyConstraint("user_cuid", "dataset_id"),
+        Index("ix_dataset_bookmarks_dataset_id_user_cuid", "dataset_id", "user_cuid"),
+    )
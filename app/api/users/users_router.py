@@ -1,20 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.password import hash_password, verify_password
+from app.core.password import verify_password_async
 from app.core.auth import create_access_token, verify_access_token, get_current_user, TokenPayload
 from app.db.deps import get_db, get_chroma_client
 import app.api.users.users_dto as dto
 import app.api.users.users_crud as crud
+from app.api.datasets import datasets_crud
+import app.api.rags.rags_crud as rags_crud
 
 router = APIRouter()
 
 @router.get("/{user_id}/info/", response_model=dto.UserInfoDTO, tags=["users"])
 async def get_users(
     user_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = crud.get_user_by_id(user_id, db)
+    user = await crud.get_user_by_id(user_id, db)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -27,23 +29,23 @@ async def get_users(
 
 
 @router.post("/register", response_model=dto.UserResponseDTO, tags=["users"])
-async def register_user(item:dto.UserCreateDTO, db: Session = Depends(get_db)):
+async def register_user(item:dto.UserCreateDTO, db: AsyncSession = Depends(get_db)):
     # 이메일 중복확인
-    if crud.get_user_by_email(item.email, db):
+    if await crud.get_user_by_email(item.email, db):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     try:
-        res:dto.UserResponseDTO = crud.register_user(item, db)
+        res:dto.UserResponseDTO = await crud.register_user(item, db)
         return res
     except Exception as e:
         print(f"Registration error: {e}")
         raise HTTPException(status_code=500, detail=f"User registration failed: {str(e)}")
     
 @router.post("/login", tags=["users"])
-async def login_user(item: dto.UserLoginDTO, db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(item.email, db)
+async def login_user(item: dto.UserLoginDTO, db: AsyncSession = Depends(get_db)):
+    user = await crud.get_user_by_email(item.email, db)
 
-    if not user or not verify_password(item.password, user.hashed_password):
+    if not user or not await verify_password_async(item.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Invalid email or password")
     
     # 로그인 성공 시 JWT 토큰 발급
@@ -62,11 +64,11 @@ async def login_user(item: dto.UserLoginDTO, db: Session = Depends(get_db)):
     
 
 @router.get("/verify", tags=["users"])
-async def verify_user(current_user: Session = Depends(get_current_user), db: Session = Depends(get_db)):
+async def verify_user(current_user: dict = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if not current_user:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     
-    user = crud.get_user_by_id(current_user["sub"], db)
+    user = await crud.get_user_by_id(current_user["sub"], db)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -80,10 +82,10 @@ async def verify_user(current_user: Session = Depends(get_current_user), db: Ses
 async def update_user_profile(
     item: dto.UserUpdateDTO,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """사용자 프로필을 업데이트합니다."""
-    updated_user = crud.update_user(current_user["sub"], item, db)
+    updated_user = await crud.update_user(current_user["sub"], item, db)
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
     return updated_user
@@ -91,10 +93,10 @@ async def update_user_profile(
 @router.get("/profile", response_model=dto.UserProfileDTO, tags=["users"])
 async def get_user_profile(
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """사용자 프로필과 생성/북마크한 항목들을 조회합니다."""
-    profile = crud.get_user_profile(current_user["sub"], db)
+    profile = await crud.get_user_profile(current_user["sub"], db)
     if not profile:
         raise HTTPException(status_code=404, detail="User not found")
     return profile
@@ -103,10 +105,13 @@ async def get_user_profile(
 async def bookmark_dataset(
     dataset_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """데이터셋을 북마크합니다."""
-    success = crud.add_bookmarked_dataset(current_user["sub"], dataset_id, db)
+    if not await datasets_crud.get_dataset_by_id(dataset_id, db):
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    success = await crud.add_bookmarked_dataset(current_user["sub"], dataset_id, db)
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "Dataset bookmarked successfully"}
@@ -115,10 +120,10 @@ async def bookmark_dataset(
 async def unbookmark_dataset(
     dataset_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """데이터셋 북마크를 제거합니다."""
-    success = crud.remove_bookmarked_dataset(current_user["sub"], dataset_id, db)
+    success = await crud.remove_bookmarked_dataset(current_user["sub"], dataset_id, db)
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "Dataset bookmark removed successfully"}
@@ -127,10 +132,13 @@ async def unbookmark_dataset(
 async def bookmark_rag(
     rag_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """RAG를 북마크합니다."""
-    success = crud.add_bookmarked_rag(current_user["sub"], rag_id, db)
+    if not await rags_crud.get_rag_by_id(rag_id, db):
+        raise HTTPException(status_code=404, detail="RAG not found")
+    
+    success = await crud.add_bookmarked_rag(current_user["sub"], rag_id, db)
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "RAG bookmarked successfully"}
@@ -139,10 +147,10 @@ async def bookmark_rag(
 async def unbookmark_rag(
     rag_id: str,
     current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """RAG 북마크를 제거합니다."""
-    success = crud.remove_bookmarked_rag(current_user["sub"], rag_id, db)
+    success = await crud.remove_bookmarked_rag(current_user["sub"], rag_id, db)
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "RAG bookmark removed successfully"}
@@ -0,0 +1,49 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+
+from app.core.config import settings
+
+# 이벤트 루프를 막는 작업을 실행하는 스레드 풀 (작업 종류별로 크기 제한)
+chroma_pool = ThreadPoolExecutor(max_workers=settings.chroma_workers, thread_name_prefix="chroma")
+bcrypt_pool = ThreadPoolExecutor(max_workers=settings.bcrypt_workers, thread_name_prefix="bcrypt")
+
+# CPU를 많이 쓰는 PDF 추출용 프로세스 풀 (처음 사용할 때 생성)
+extract_workers = settings.extract_workers or os.cpu_count() or 1
+_extract_pool: Optional[ProcessPoolExecutor] = None
+_extract_pool_lock = threading.Lock()
+
+
+def get_extract_pool() -> ProcessPoolExecutor:
+    """
+    PDF 추출용 프로세스 풀을 반환합니다.
+    스레드가 여러 개 떠 있는 프로세스에서 fork하지 않도록 spawn으로 워커를 띄웁니다.
+    """
+    global _extract_pool
+    if _extract_pool is None:
+        with _extract_pool_lock:
+            if _extract_pool is None:
+                _extract_pool = ProcessPoolExecutor(
+                    max_workers=extract_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _extract_pool
+
+
+async def run_in_pool(pool: ThreadPoolExecutor, func, *args, **kwargs):
+    """
+    블로킹 함수를 지정한 스레드 풀에서 실행하고 결과를 기다립니다.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+
+
+def shutdown():
+    chroma_pool.shutdown(wait=False, cancel_futures=True)
+    bcrypt_pool.shutdown(wait=False, cancel_futures=True)
+    if _extract_pool is not None:
+        _extract_pool.shutdown(wait=False, cancel_futures=True)
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Literal
 from dotenv import load_dotenv
 
 class Settings(BaseSettings):
@@ -7,6 +8,16 @@ class Settings(BaseSettings):
     # SQL Database settings
     database_path: str
     database_url: str
+
+    # SQLite settings (연결마다 PRAGMA로 적용)
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST"] = "WAL"  # 예전 동작은 DELETE
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"  # WAL에서는 NORMAL로도 DB가 손상되지 않음
+    sqlite_busy_timeout_ms: int = 5000  # 쓰기 잠금을 기다리는 시간
+    sqlite_cache_size_mb: int = 64  # 연결당 페이지 캐시
+    sqlite_mmap_size_mb: int = 256  # 0이면 mmap 사용 안 함
+    sqlite_pool_size: int = 5  # 엔진당, uvicorn 워커 프로세스마다 따로 생김
+    sqlite_max_overflow: int = 5
+    sqlite_pool_timeout: int = 30  # 풀에서 연결을 기다리는 시간 (초)
     
     # Chroma DB settings
     chroma_db_path: str
@@ -16,9 +27,65 @@ class Settings(BaseSettings):
     jwt_algorithm: str
     jwt_access_token_expire_minutes: int
 
-    # OpenAI API settings
-    openai_api_key: str
-    openai_embeddings_model: str
+    # Model provider settings
+    llm_provider: Literal["openai", "local"] = "openai"  # local이면 네트워크 없이 동작 (벤치마크/부하 테스트용)
+
+    # OpenAI API settings (llm_provider가 openai일 때 사용)
+    openai_api_key: str = ""
+    openai_embeddings_model: str = "text-embedding-3-small"
+    openai_base_url: str | None = None  # 호환 서버/벤치마크용 엔드포인트
+
+    # Local provider settings (llm_provider가 local일 때 사용)
+    local_embedding_dimensions: int = 256
+    local_embedding_latency: float = 0.0  # 임베딩 요청당 지연 (초)
+    local_chat_mode: Literal["echo", "canned"] = "echo"  # echo: 질문과 검색된 문서 앞부분을 답변으로
+    local_chat_response: str = "로컬 제공자의 고정 답변입니다."  # canned일 때 답변
+    local_chat_latency: float = 0.0  # 답변 하나를 만드는 데 걸리는 시간 (초, 스트리밍이면 조각마다 나눠서)
+
+    # Embedding pipeline settings
+    embedding_batch_size: int = 256  # 요청당 최대 입력 개수
+    embedding_batch_max_tokens: int = 100000  # 요청당 최대 토큰 수
+    embedding_concurrency: int = 4  # 동시에 보낼 임베딩 요청 수
+
+    # Embedding cache settings
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = "./embedding_cache.sqlite3"
+    embedding_cache_max_mb: int = 1024  # 넘으면 오래 사용되지 않은 항목부터 제거
+
+    # Query embedding cache settings (in-memory)
+    query_embedding_cache_size: int = 10000
+    query_embedding_cache_ttl: int = 3600  # 초
+
+    # Semantic answer cache settings (in-memory)
+    answer_cache_enabled: bool = True
+    answer_cache_threshold: float = 0.95  # 이 이상 비슷한 질문이면 캐시된 답변 사용 (코사인 유사도)
+    answer_cache_ttl: int = 3600  # 초
+    answer_cache_size: int = 1000  # RAG당 최대 항목 수
+    answer_cache_max_rags: int = 100
+
+    # NumPy vector store settings (vector_backend가 'numpy'인 RAG)
+    numpy_store_path: str = "./numpy_store"
+    numpy_store_quantization: Literal["none", "float16", "int8"] = "none"  # 행렬 저장 형식 (다음 빌드부터 적용)
+    numpy_store_rescore: int = 4  # 양자화했으면 top_k * 이 값의 후보를 float32 사본으로 다시 채점 (0이면 사본 없음)
+
+    # Lexical (BM25) index settings
+    lexical_index_path: str = "./lexical_index"  # RAG 컬렉션별 역색인 디렉터리
+    lexical_index_cache_size: int = 32  # 메모리에 올려 둘 색인 수
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
+    hybrid_candidates: int = 50  # hybrid 검색에서 벡터/BM25 검색이 각각 가져올 후보 수
+    rrf_k: int = 60  # reciprocal rank fusion 상수
+
+    # RAG build settings
+    build_workers: int = 2  # 동시에 실행할 RAG 빌드 작업 수
+    extract_workers: int = 0  # PDF 텍스트 추출 프로세스 수 (0이면 CPU 코어 수)
+    extract_pages_per_task: int = 32  # 추출 작업 하나가 맡는 PDF 페이지 수
+    build_job_heartbeat_interval: int = 10  # 대기/실행 중인 작업의 heartbeat_at을 갱신하는 주기 (초)
+    build_job_stale_after: int = 60  # heartbeat_at이 이보다 오래되면 맡은 프로세스가 죽은 것으로 보고 실패 처리 (초)
+
+    # Blocking call thread pools
+    chroma_workers: int = 8  # Chroma 조회용 스레드 수
+    bcrypt_workers: int = 2  # 비밀번호 해시/검증용 스레드 수
 
     # File upload settings
     datasets_path: str
@@ -29,5 +96,3 @@ class Settings(BaseSettings):
 
 load_dotenv()
 settings = Settings()
-
-print(settings)
\ No newline at end of file
@@ -0,0 +1,119 @@
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+import hashlib
+
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+# 파일이 아닌 폼 필드(이름, 설명 등) 하나의 최대 크기
+MAX_FIELD_SIZE = 64 * 1024
+# 요청 전체에서 파일을 뺀 나머지(폼 필드, 파트 헤더, 경계 문자열)에 허용하는 크기
+MAX_FORM_OVERHEAD = 1024 * 1024
+
+
+class ReceivedFile(NamedTuple):
+    filename: str
+    size: int
+    sha256: str
+
+
+async def receive_multipart(
+    request: Request,
+    file_field: str,
+    file_path: Path,
+    max_file_size: int,
+    check_filename: Optional[Callable[[str], None]] = None,
+) -> Tuple[Dict[str, str], Optional[ReceivedFile]]:
+    """
+    multipart/form-data 본문을 받는 대로 파싱해 file_field 파일은 file_path에 쓰고, 나머지 필드는 문자열로 반환합니다.
+
+    UploadFile과 달리 본문 전체를 먼저 임시 파일에 받아 두지 않으므로, 파일이 max_file_size를 넘으면
+    그 바이트가 도착한 시점에 400으로 중단합니다. Content-Length가 이미 한도를 넘으면 본문을 읽지 않습니다.
+    파일이 아닌 부분(폼 필드, 파트 헤더, 경계 문자열)은 실제로 받은 바이트를 세어 MAX_FORM_OVERHEAD를 넘으면
+    413으로 중단합니다 (Content-Length 없이 chunked로 보내도 적용).
+    check_filename은 파일 데이터를 쓰기 전에 파일 이름으로 호출되며, 거부하려면 HTTPException을 냅니다.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="multipart/form-data 요청이어야 합니다.")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_file_size + MAX_FORM_OVERHEAD:
+        raise _too_large(max_file_size)
+
+    # 파서 콜백은 동기이므로 이벤트를 모아 두었다가 본문 조각마다 처리 (파일 쓰기는 스레드 풀에서)
+    events = []
+    parser = MultipartParser(boundary, {
+        "on_part_begin": lambda: events.append(("part_begin", b"")),
+        "on_header_field": lambda data, start, end: events.append(("header_field", data[start:end])),
+        "on_header_value": lambda data, start, end: events.append(("header_value", data[start:end])),
+        "on_header_end": lambda: events.append(("header_end", b"")),
+        "on_headers_finished": lambda: events.append(("headers_finished", b"")),
+        "on_part_data": lambda data, start, end: events.append(("part_data", data[start:end])),
+        "on_part_end": lambda: events.append(("part_end", b"")),
+    })
+
+    fields: Dict[str, str] = {}
+    received = None
+    headers, header_field, header_value = {}, b"", b""
+    name, value, file, filename = None, bytearray(), None, None
+    size, sha256 = 0, hashlib.sha256()
+    received_size = 0  # 받은 본문 전체 바이트 (파일이 아닌 부분 = received_size - size)
+    try:
+        async for chunk in request.stream():
+            received_size += len(chunk)
+            parser.write(chunk)
+            for event, data in events:
+                if event == "part_begin":
+                    headers, header_field, header_value = {}, b"", b""
+                    value = bytearray()
+                elif event == "header_field":
+                    header_field += data
+                elif event == "header_value":
+                    header_value += data
+                elif event == "header_end":
+                    headers[header_field.lower()] = header_value
+                    header_field, header_value = b"", b""
+                elif event == "headers_finished":
+                    _, options = parse_options_header(headers.get(b"content-disposition", b""))
+                    name = options.get(b"name", b"").decode("utf-8", errors="replace")
+                    if name == file_field and b"filename" in options and file is None and received is None:
+                        filename = options[b"filename"].decode("utf-8", errors="replace")
+                        if check_filename:
+                            check_filename(filename)
+                        file = await run_in_threadpool(open, file_path, "wb")
+                elif event == "part_data":
+                    if file is not None:
+                        size += len(data)
+                        if size > max_file_size:
+                            raise _too_large(max_file_size)
+                        sha256.update(data)
+                        await run_in_threadpool(file.write, data)
+                    else:
+                        value += data
+                        if len(value) > MAX_FIELD_SIZE:
+                            raise HTTPException(status_code=400, detail=f"폼 필드가 너무 깁니다: {name}")
+                elif event == "part_end":
+                    if file is not None:
+                        await run_in_threadpool(file.close)
+                        file = None
+                        received = ReceivedFile(filename, size, sha256.hexdigest())
+                    elif name:
+                        fields[name] = value.decode("utf-8", errors="replace")
+            events.clear()
+            if received_size - size > MAX_FORM_OVERHEAD:
+                raise HTTPException(status_code=413, detail="폼 필드가 너무 많거나 큽니다.")
+        parser.finalize()
+    finally:
+        if file is not None:
+            file.close()
+    return fields, received
+
+
+def _too_large(max_file_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"파일 크기가 너무 큽니다. 최대 {max_file_size // (1024 * 1024)}MB까지 허용됩니다."
+    )
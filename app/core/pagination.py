@@ -0,0 +1,82 @@
+from typing import List, Literal, NamedTuple, Optional, Sequence, Tuple
+import base64
+import json
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select, tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# 다음 페이지 커서를 담는 응답 헤더
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams(NamedTuple):
+    limit: int
+    after: Optional[Tuple[str, str]]  # 이전 페이지 마지막 행의 (created_at, id)
+    order: str  # 'desc'(최신순) 또는 'asc'
+
+
+def encode_cursor(created_at: str, id: str) -> str:
+    raw = json.dumps([created_at, id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+    except Exception:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+    if not isinstance(created_at, str) or not isinstance(id, str):
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+    return created_at, id
+
+
+def page_params(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="페이지 크기"),
+    cursor: Optional[str] = Query(None, description=f"이전 응답의 {NEXT_CURSOR_HEADER} 헤더 값"),
+    order: Literal["desc", "asc"] = Query("desc", description="created_at 정렬 방향"),
+) -> PageParams:
+    """
+    목록 엔드포인트의 키셋(커서) 페이지네이션 파라미터.
+    """
+    return PageParams(limit, decode_cursor(cursor) if cursor else None, order)
+
+
+def apply_keyset(stmt: Select, created_at_column, id_column, page: PageParams) -> Select:
+    """
+    (created_at, id) 순서의 키셋 조건과 정렬을 적용합니다.
+    다음 페이지가 있는지 알 수 있도록 limit보다 한 행 더 조회합니다.
+    """
+    key = tuple_(created_at_column, id_column)
+    if page.order == "desc":
+        if page.after:
+            stmt = stmt.where(key < tuple_(*page.after))
+        stmt = stmt.order_by(created_at_column.desc(), id_column.desc())
+    else:
+        if page.after:
+            stmt = stmt.where(key > tuple_(*page.after))
+        stmt = stmt.order_by(created_at_column.asc(), id_column.asc())
+    return stmt.limit(page.limit + 1)
+
+
+def like_pattern(text: str) -> str:
+    # LIKE 와일드카드를 이스케이프한 부분 일치 패턴 (ESCAPE '\\')
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def paginate(rows: Sequence, page: PageParams, response: Response) -> List:
+    """
+    limit + 1개까지 조회한 행에서 한 페이지를 잘라 반환하고,
+    다음 페이지가 있으면 마지막 행의 커서를 응답 헤더에 넣습니다.
+    행의 첫 번째 항목은 created_at과 id를 가진 모델이어야 합니다.
+    """
+    rows = list(rows)
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1][0]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
@@ -1,5 +1,7 @@
 import bcrypt
 
+from app.core.concurrency import bcrypt_pool, run_in_pool
+
 def hash_password(password: str) -> str:
     password_bytes = password.encode('utf-8')
     salt = bcrypt.gensalt()
@@ -9,4 +11,11 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     password_bytes = plain_password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
\ No newline at end of file
+    return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+async def hash_password_async(password: str) -> str:
+    # bcrypt는 CPU를 오래 쓰므로 이벤트 루프 밖에서 실행
+    return await run_in_pool(bcrypt_pool, hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await run_in_pool(bcrypt_pool, verify_password, plain_password, hashed_password)
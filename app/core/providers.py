@@ -0,0 +1,192 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import re
+import threading
+import time
+import unicodedata
+import zlib
+
+from app.core.config import settings
+
+Messages = List[Dict[str, str]]
+
+
+class Provider:
+    """
+    임베딩/채팅 모델 제공자. settings.llm_provider로 고르며 get_provider()로 공용 인스턴스를 얻습니다.
+
+    - embed / embed_async: 텍스트 목록을 같은 순서의 임베딩 목록으로
+    - chat: 메시지에 대한 답변 전체
+    - chat_stream: (답변 조각, finish_reason) 비동기 이터레이터 (aclose()하면 생성을 중단)
+    """
+
+    # 임베딩 캐시 키에 쓰는 모델 이름 (제공자/모델이 바뀌면 캐시된 임베딩을 섞어 쓰지 않도록)
+    embedding_model: str
+    _embedding_dimensions: Optional[int] = None
+
+    def embedding_dimensions(self) -> int:
+        # 임베딩 벡터의 차원. 처음 호출할 때 짧은 텍스트 하나를 임베딩해 알아냄
+        if self._embedding_dimensions is None:
+            self._embedding_dimensions = len(self.embed(["dimensions"])[0])
+        return self._embedding_dimensions
+
+    def embed(self, texts: List[str]) -> List[list]:
+        raise NotImplementedError
+
+    async def embed_async(self, texts: List[str]) -> List[list]:
+        raise NotImplementedError
+
+    async def chat(self, model: str, messages: Messages) -> str:
+        raise NotImplementedError
+
+    def chat_stream(self, model: str, messages: Messages) -> AsyncIterator[Tuple[Optional[str], Optional[str]]]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class OpenAIProvider(Provider):
+    def __init__(self):
+        # openai는 import가 무거우므로 제공자를 처음 만들 때 불러옴
+        from openai import AsyncOpenAI, OpenAI
+
+        self.embedding_model = settings.openai_embeddings_model
+        self.client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+        # API 핸들러에서 사용하는 비동기 클라이언트
+        self.async_client = AsyncOpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+
+    def embed(self, texts: List[str]) -> List[list]:
+        # 여러 텍스트를 한 번의 요청으로 임베딩 (입력 순서 유지)
+        response = self.client.embeddings.create(input=texts, model=self.embedding_model)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    async def embed_async(self, texts: List[str]) -> List[list]:
+        response = await self.async_client.embeddings.create(input=texts, model=self.embedding_model)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    async def chat(self, model: str, messages: Messages) -> str:
+        response = await self.async_client.chat.completions.create(model=model, messages=messages)
+        return response.choices[0].message.content
+
+    async def chat_stream(self, model: str, messages: Messages):
+        stream = await self.async_client.chat.completions.create(model=model, messages=messages, stream=True)
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                yield (choice.delta.content if choice.delta else None), choice.finish_reason
+        finally:
+            # 중간에 닫히면 업스트림 연결도 닫아 생성을 중단
+            await stream.close()
+
+    async def close(self):
+        self.client.close()
+        await self.async_client.close()
+
+
+# 단어 문자 묶음 (밑줄 제외)
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+class LocalProvider(Provider):
+    """
+    네트워크 없이 동작하는 결정적 제공자 (벤치마크/부하 테스트용).
+
+    임베딩은 단어와 글자 2~3-gram을 해시해 dimensions개 버킷에 부호를 붙여 더한 뒤 정규화한 벡터라서,
+    글자가 많이 겹치는 텍스트끼리 코사인 유사도가 높습니다.
+    채팅은 'echo'면 질문과 검색된 문서 앞부분을, 'canned'면 고정된 답변을 돌려줍니다.
+    embedding_latency(요청당)와 chat_latency(답변 하나, 스트리밍이면 조각마다 나눠서)로 지연을 흉내냅니다.
+    """
+
+    def __init__(self, dimensions: int, embedding_latency: float, chat_mode: str, chat_response: str, chat_latency: float):
+        self.dimensions = dimensions
+        self.embedding_latency = embedding_latency
+        self.chat_mode = chat_mode
+        self.chat_response = chat_response
+        self.chat_latency = chat_latency
+        self.embedding_model = f"local-hashed-ngram-{dimensions}"
+        self._embedding_dimensions = dimensions
+
+    def _embed_one(self, text: str) -> list:
+        import numpy as np
+
+        buckets, signs = [], []
+        for word in _WORD_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+            padded = f" {word} "
+            features = [word] + [padded[i:i + n] for n in (2, 3) for i in range(len(padded) - n + 1)]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                buckets.append(h % self.dimensions)
+                signs.append(1.0 if h & 0x80000000 else -1.0)
+        vector = np.bincount(buckets, weights=signs, minlength=self.dimensions) if buckets else np.zeros(self.dimensions)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed(self, texts: List[str]) -> List[list]:
+        if self.embedding_latency:
+            time.sleep(self.embedding_latency)
+        return [self._embed_one(text) for text in texts]
+
+    async def embed_async(self, texts: List[str]) -> List[list]:
+        if self.embedding_latency:
+            await asyncio.sleep(self.embedding_latency)
+        return [self._embed_one(text) for text in texts]
+
+    def _answer(self, messages: Messages) -> str:
+        if self.chat_mode == "canned":
+            return self.chat_response
+        question = " ".join(message["content"] for message in messages if message["role"] == "user")
+        context = " ".join(message["content"] for message in messages if message["role"] == "assistant")
+        return f"{question}\n{context[:200]}".strip()
+
+    async def chat(self, model: str, messages: Messages) -> str:
+        if self.chat_latency:
+            await asyncio.sleep(self.chat_latency)
+        return self._answer(messages)
+
+    async def chat_stream(self, model: str, messages: Messages):
+        parts = re.findall(r"\s*\S+", self._answer(messages)) or [""]
+        delay = self.chat_latency / len(parts)
+        for part in parts:
+            if delay:
+                await asyncio.sleep(delay)
+            yield part, None
+        yield None, "stop"
+
+
+_provider: Optional[Provider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> Provider:
+    """
+    settings.llm_provider에 맞는 프로세스 공용 제공자를 반환합니다. 처음 호출할 때 생성합니다.
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                if settings.llm_provider == "local":
+                    _provider = LocalProvider(
+                        dimensions=settings.local_embedding_dimensions,
+                        embedding_latency=settings.local_embedding_latency,
+                        chat_mode=settings.local_chat_mode,
+                        chat_response=settings.local_chat_response,
+                        chat_latency=settings.local_chat_latency,
+                    )
+                else:
+                    _provider = OpenAIProvider()
+    return _provider
+
+
+async def close_provider():
+    """
+    공용 제공자를 닫습니다. 앱 종료(lifespan) 시 호출됩니다.
+    """
+    global _provider
+    with _provider_lock:
+        provider, _provider = _provider, None
+    if provider is not None:
+        await provider.close()
@@ -1,49 +1,205 @@
-import chromadb
-from chromadb.errors import NotFoundError
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+import threading
+
 from app.core.config import settings
-from openai import OpenAI
+from app.core.cache import LRUCache
+from app.core.providers import get_provider
+from app.core.concurrency import chroma_pool, run_in_pool
+
+if TYPE_CHECKING:
+    import chromadb
+
+
+def _not_found_error():
+    from chromadb.errors import NotFoundError
+    return NotFoundError
+
 
 class ChromaDBClient:
     def __init__(self):
+        # chromadb는 import가 무거우므로 클라이언트를 처음 만들 때 불러옴
+        import chromadb
+
         # ChromaDB 클라이언트 생성 (영구 저장을 위해 파일 시스템 사용)
         self.client = chromadb.PersistentClient(path=settings.chroma_db_path)
-        self.openai_client = OpenAI(api_key=settings.openai_api_key)
+        # 반복되는 질문의 임베딩 요청을 줄이기 위한 (모델, 텍스트) 키의 LRU/TTL 캐시
+        self.query_embedding_cache = LRUCache(
+            maxsize=settings.query_embedding_cache_size,
+            ttl=settings.query_embedding_cache_ttl
+        )
+        # 컬렉션 이름 -> 컬렉션 핸들 (조회/저장마다 get_collection으로 메타데이터를 읽지 않도록)
+        self._collections: Dict[str, "chromadb.Collection"] = {}
+        self._collections_lock = threading.Lock()
+
+    # 임베딩 요청은 settings.llm_provider로 고른 제공자(app.core.providers)가 처리
 
     def _get_embedding(self, text: str) -> list:
-        embedding = self.openai_client.embeddings.create(
-            input=text,
-            model=settings.openai_embeddings_model
-        )
-        return embedding.data[0].embedding
+        return get_provider().embed([text])[0]
+
+    async def get_embedding_async(self, text: str) -> list:
+        return (await self.get_embeddings_async([text]))[0]
+
+    async def get_embeddings_async(self, texts: list) -> list:
+        # 캐시에 없는 텍스트만 모아 한 번의 요청으로 임베딩 (입력 순서 유지)
+        provider = get_provider()
+        model = provider.embedding_model
+        embeddings = {text: self.query_embedding_cache.get((model, text)) for text in texts}
+        missing = [text for text, embedding in embeddings.items() if embedding is None]
+        if missing:
+            for text, embedding in zip(missing, await provider.embed_async(missing)):
+                embeddings[text] = embedding
+                self.query_embedding_cache.set((model, text), embedding)
+        return [embeddings[text] for text in texts]
+
+    def _get_embeddings(self, texts: list) -> list:
+        # 여러 텍스트를 한 번의 요청으로 임베딩 (입력 순서 유지)
+        return get_provider().embed(texts)
 
     def get_chroma_collection_name(self, rag_id: str) -> str:
         # rag_id에서 하이픈을 언더스코어로 변경하여 컬렉션 이름 반환
         return f"rag_{rag_id.replace('-', '_')}"
     
     def create_or_get_collection(self, collection_name: str):
-        # 컬렉션 생성 (이미 있으면 가져옴)
-        try:
-            collection = self.client.get_collection(collection_name)
-        except NotFoundError:
-            collection = self.client.create_collection(name=collection_name)
+        # 캐시된 핸들이 없을 때만 컬렉션 조회 (없으면 생성)
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
+        with self._collections_lock:
+            collection = self._collections.get(collection_name)
+            if collection is None:
+                try:
+                    collection = self.client.get_collection(collection_name)
+                except _not_found_error():
+                    collection = self.client.create_collection(name=collection_name)
+                self._collections[collection_name] = collection
         return collection
 
+    def invalidate_collection(self, collection_name: str):
+        # 캐시된 컬렉션 핸들을 버림 (다음 사용 시 다시 조회)
+        with self._collections_lock:
+            self._collections.pop(collection_name, None)
+
+    def delete_collection(self, collection_name: str):
+        self.invalidate_collection(collection_name)
+        try:
+            self.client.delete_collection(collection_name)
+        except _not_found_error():
+            pass
+
+    def _with_collection(self, collection_name: str, fn: Callable):
+        # 다른 프로세스가 컬렉션을 지우거나 다시 만들면 캐시된 핸들이 NotFoundError를 내므로
+        # 핸들을 다시 조회해 한 번 재시도 (upsert/delete/query는 다시 실행해도 결과가 같음)
+        try:
+            return fn(self.create_or_get_collection(collection_name))
+        except _not_found_error():
+            self.invalidate_collection(collection_name)
+            return fn(self.create_or_get_collection(collection_name))
+
     def add_documents(self, collection_name: str, documents: list, embeddings: list, ids: list):
         # 컬렉션에 문서와 임베딩을 저장
-        collection = self.create_or_get_collection(collection_name)
-        collection.add(
+        self._with_collection(collection_name, lambda collection: collection.add(
             documents=documents,
             embeddings=embeddings,
             ids=ids
-        )
+        ))
 
-    def search_by_embedding(self, collection_name: str, query_embedding: list, n_results: int = 5):
-        # 임베딩 벡터로 문서 검색
+    def upsert_documents(self, collection_name: str, documents: list, embeddings: list, ids: list, metadatas: list = None):
+        # 같은 ID가 있으면 덮어쓰고 없으면 추가 (Chroma 최대 배치 크기 단위로 나눠 저장)
+        batch_size = self.client.get_max_batch_size()
+
+        def upsert(collection):
+            for start in range(0, len(ids), batch_size):
+                end = start + batch_size
+                collection.upsert(
+                    documents=documents[start:end],
+                    embeddings=embeddings[start:end],
+                    ids=ids[start:end],
+                    metadatas=metadatas[start:end] if metadatas else None
+                )
+
+        self._with_collection(collection_name, upsert)
+
+    def delete_documents(self, collection_name: str, ids: list):
+        if not ids:
+            return
+        batch_size = self.client.get_max_batch_size()
+
+        def delete(collection):
+            for start in range(0, len(ids), batch_size):
+                collection.delete(ids=ids[start:start + batch_size])
+
+        self._with_collection(collection_name, delete)
+
+    def flush(self, collection_name: str):
+        # Chroma는 upsert/delete가 바로 저장되므로 할 일 없음 (NumpyVectorStore와 같은 인터페이스)
+        pass
+
+    def iter_documents(self, collection_name: str, batch_size: int = 5000):
+        # 컬렉션의 (ID, 본문, 메타데이터)를 배치 단위로 순회 (임베딩은 읽지 않음)
         collection = self.create_or_get_collection(collection_name)
-        results = collection.query(
+        offset = 0
+        while True:
+            batch = collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            if not batch["ids"]:
+                return
+            yield from zip(batch["ids"], batch["documents"], batch["metadatas"])
+            offset += len(batch["ids"])
+
+    def get_ids(self, collection_name: str, where: Optional[dict] = None) -> list:
+        # 메타데이터 필터(where)에 맞는 청크 ID (where가 없으면 전체)
+        return self._with_collection(collection_name, lambda collection: collection.get(where=where, include=[]))["ids"]
+
+    def get_documents(self, collection_name: str, ids: list) -> dict:
+        # ID로 본문과 메타데이터 조회 (Chroma는 순서를 보장하지 않으므로 ID -> (본문, 메타데이터))
+        if not ids:
+            return {}
+        batch = self._with_collection(collection_name, lambda collection: collection.get(
+            ids=ids, include=["documents", "metadatas"]
+        ))
+        return {id: (document, metadata) for id, document, metadata in zip(batch["ids"], batch["documents"], batch["metadatas"])}
+
+    def search_by_embedding(self, collection_name: str, query_embedding: list, n_results: int = 5, where: Optional[dict] = None):
+        # 임베딩 벡터로 문서 검색 (where가 있으면 메타데이터 필터를 통과한 청크 중에서 n_results개)
+        # 벡터 목록을 넘기면 한 번의 조회로 벡터마다 결과를 돌려줌
+        return self._with_collection(collection_name, lambda collection: collection.query(
             query_embeddings=query_embedding,
-            n_results=n_results
-        )
-        return results
-    
-chroma_client = ChromaDBClient()
\ No newline at end of file
+            n_results=n_results,
+            where=where
+        ))
+
+    async def search_by_embedding_async(self, collection_name: str, query_embedding: list, n_results: int = 5, where: Optional[dict] = None):
+        # Chroma 조회는 블로킹이므로 전용 스레드 풀에서 실행
+        return await run_in_pool(chroma_pool, self.search_by_embedding, collection_name, query_embedding, n_results, where)
+
+    async def close(self):
+        with self._collections_lock:
+            self._collections.clear()
+        self.client.close()
+
+
+_client: Optional[ChromaDBClient] = None
+_client_lock = threading.Lock()
+
+
+def get_chroma_client() -> ChromaDBClient:
+    """
+    프로세스 공용 ChromaDB 클라이언트를 반환합니다. 처음 호출할 때 생성합니다.
+    API 핸들러(Depends)와 빌드 워커 스레드가 같은 PersistentClient와 컬렉션 핸들을 공유합니다.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ChromaDBClient()
+    return _client
+
+
+async def close_chroma_client():
+    """
+    공용 클라이언트를 닫습니다. 앱 종료(lifespan) 시 호출됩니다.
+    """
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        await client.close()
\ No newline at end of file
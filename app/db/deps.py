@@ -1,12 +1,9 @@
-from app.db.sqlite.database import SessionLocal
-from app.db.chroma.client import chroma_client
+from app.db.sqlite.database import AsyncSessionLocal
+from app.db.chroma.client import ChromaDBClient, get_chroma_client as _get_chroma_client
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-def get_chroma_client():
-    return chroma_client
\ No newline at end of file
+def get_chroma_client() -> ChromaDBClient:
+    return _get_chroma_client()
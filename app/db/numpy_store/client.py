@@ -0,0 +1,585 @@
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+import shutil
+import threading
+import uuid
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.concurrency import chroma_pool, run_in_pool
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+# 양자화한 행렬은 이 행 수만큼씩 float32로 바꿔 곱함 (바꾼 블록이 CPU 캐시에 남도록 작게)
+_SCAN_BLOCK_ROWS = 256
+# 세그먼트 하나로 모아 쓰는 행 수 (쓰기 중 메모리에 두는 벡터 수의 상한)
+_BLOCK_ROWS = 4096
+
+
+# 커밋된 세그먼트 목록 파일과 형식 버전
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+# 세그먼트 도입 전 형식(컬렉션 디렉터리에 바로 쓴 파일들)을 세그먼트 하나로 읽을 때의 이름
+LEGACY_SEGMENT = "."
+LEGACY_FILES = (
+    "records.json", "vectors.npy", "scales.npy", "vectors_f32.npy", "documents.bin", "document_offsets.npy",
+)
+
+
+def _quantize(vectors: np.ndarray, quantization: str):
+    # (저장할 행렬, 행별 스케일 또는 None)
+    if quantization == "float16":
+        return vectors.astype(np.float16), None
+    if quantization == "int8":
+        # 벡터마다 최대 절댓값이 127이 되도록 스케일링 (값 = int8 * scale)
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1
+        return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+    return vectors, None
+
+
+class _Segment:
+    """
+    컬렉션을 이루는 세그먼트 하나를 mmap으로 연 것. 세그먼트 디렉터리는 한 번 쓰면 바꾸지 않습니다.
+    vectors.npy: 정규화한 임베딩 행렬 (행 = 청크, float32 또는 양자화한 float16/int8)
+    scales.npy: int8일 때 행별 스케일
+    vectors_f32.npy: 양자화했을 때 다시 채점용 float32 사본 (선택, 후보 행만 읽음)
+    documents.bin + document_offsets.npy: UTF-8 본문을 이어 붙인 파일과 행별 시작 위치
+    records.json: 행별 ID, 메타데이터와 양자화 형식
+    """
+
+    def __init__(self, path: str, name: str):
+        self.name = name
+        with open(os.path.join(path, "records.json"), encoding="utf-8") as f:
+            records = json.load(f)
+        self.ids: List[str] = records["ids"]
+        self.metadatas: List[Optional[dict]] = records["metadatas"]
+        self.quantization = records.get("quantization", "none")
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.scales: Optional[np.ndarray] = None
+        self.full_vectors: Optional[np.ndarray] = None
+        self.document_offsets = np.zeros(1, dtype=np.int64)
+        self.documents = None
+        if self.ids:
+            self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+            if self.quantization == "int8":
+                self.scales = np.load(os.path.join(path, "scales.npy"), mmap_mode="r")
+            if os.path.exists(os.path.join(path, "vectors_f32.npy")):
+                self.full_vectors = np.load(os.path.join(path, "vectors_f32.npy"), mmap_mode="r")
+            self.document_offsets = np.load(os.path.join(path, "document_offsets.npy"), mmap_mode="r")
+            if self.document_offsets[-1]:
+                self.documents = np.memmap(os.path.join(path, "documents.bin"), dtype=np.uint8, mode="r")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def document(self, row: int) -> str:
+        start, end = int(self.document_offsets[row]), int(self.document_offsets[row + 1])
+        return self.documents[start:end].tobytes().decode("utf-8") if end > start else ""
+
+    def float_rows(self, rows) -> np.ndarray:
+        # 행들의 float32 벡터 (사본이 있으면 사본, 없으면 양자화를 되돌린 값)
+        if self.full_vectors is not None:
+            return np.asarray(self.full_vectors[rows])
+        vectors = np.asarray(self.vectors[rows], dtype=np.float32)
+        if self.scales is not None:
+            vectors *= np.asarray(self.scales[rows])[:, None]
+        return vectors
+
+    def similarities(self, queries: np.ndarray) -> np.ndarray:
+        # (행 수, 질의 수) 내적 행렬
+        if self.quantization == "none":
+            return np.asarray(self.vectors @ queries.T)
+        similarities = np.empty((len(self), len(queries)), dtype=np.float32)
+        for start in range(0, len(self), _SCAN_BLOCK_ROWS):
+            end = start + _SCAN_BLOCK_ROWS
+            block = np.asarray(self.vectors[start:end], dtype=np.float32) @ queries.T
+            if self.scales is not None:
+                block *= np.asarray(self.scales[start:end])[:, None]
+            similarities[start:end] = block
+        return similarities
+
+
+def _manifest_stamp(path: str) -> Optional[tuple]:
+    # 커밋마다 manifest.json을 새 파일로 바꾸므로 (inode, mtime)이 바뀌면 다시 염 (예전 형식은 records.json)
+    for name in (MANIFEST, "records.json"):
+        try:
+            stat = os.stat(os.path.join(path, name))
+            return stat.st_ino, stat.st_mtime_ns
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def _read_manifest(path: str) -> dict:
+    try:
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        # 세그먼트 도입 전 형식: 컬렉션 디렉터리 자체가 세그먼트 하나
+        return {"version": MANIFEST_VERSION, "segments": [{"name": LEGACY_SEGMENT, "deleted": []}]}
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"지원하지 않는 컬렉션 버전입니다: {manifest.get('version')}")
+    return manifest
+
+
+class _Collection:
+    """
+    manifest.json이 가리키는 세그먼트들을 합친 컬렉션의 스냅샷.
+    manifest.json: {"version", "segments": [{"name": 세그먼트 디렉터리, "deleted": [지운 행 번호]}]}
+    행 번호(row)는 세그먼트 순서대로 살아 있는 행만 이어 붙인 번호입니다.
+    """
+
+    def __init__(self, path: Optional[str], stamp: Optional[tuple] = None, opened: Optional[Dict[str, _Segment]] = None):
+        self.stamp = stamp
+        self.parts: List[Tuple[_Segment, frozenset]] = []  # (세그먼트, 지운 행 번호)
+        self._live: List[np.ndarray] = []  # 세그먼트별 살아 있는 행 번호
+        self.ids: List[str] = []
+        self.metadatas: List[Optional[dict]] = []
+        self._columns: Dict[str, list] = {}
+        if path is not None:
+            for entry in _read_manifest(path)["segments"]:
+                # 이전 스냅샷에서 연 세그먼트는 다시 열지 않음
+                segment = (opened or {}).get(entry["name"]) or _Segment(os.path.join(path, entry["name"]), entry["name"])
+                deleted = frozenset(entry["deleted"])
+                live = np.arange(len(segment))
+                if deleted:
+                    live = np.setdiff1d(live, np.fromiter(deleted, dtype=np.int64, count=len(deleted)))
+                self.parts.append((segment, deleted))
+                self._live.append(live)
+                self.ids.extend(segment.ids[row] for row in live)
+                self.metadatas.extend(segment.metadatas[row] for row in live)
+        self._starts = np.cumsum([0] + [len(live) for live in self._live])
+        self.rows: Dict[str, int] = {id: row for row, id in enumerate(self.ids)}
+        self.dimensions = next((segment.vectors.shape[1] for segment, _ in self.parts if len(segment)), 0)
+        # 다시 채점할 float32 사본이 있는 세그먼트가 있는지
+        self.rescorable = any(segment.full_vectors is not None for segment, _ in self.parts)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def segments(self) -> Dict[str, _Segment]:
+        return {segment.name: segment for segment, _ in self.parts}
+
+    def locate(self, row: int) -> Tuple[_Segment, int]:
+        # 행 번호 -> (세그먼트, 세그먼트 안의 행 번호)
+        part = int(np.searchsorted(self._starts, row, side="right")) - 1
+        return self.parts[part][0], int(self._live[part][row - self._starts[part]])
+
+    def iter_rows(self):
+        # (세그먼트, 세그먼트 안의 행 번호)를 행 번호 순서대로
+        for (segment, _), live in zip(self.parts, self._live):
+            for row in live:
+                yield segment, int(row)
+
+    def document(self, row: int) -> str:
+        segment, local = self.locate(row)
+        return segment.document(local)
+
+    def float_rows(self, rows) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        vectors = np.empty((len(rows), self.dimensions), dtype=np.float32)
+        part_of = np.searchsorted(self._starts, rows, side="right") - 1
+        for part in np.unique(part_of):
+            positions = np.flatnonzero(part_of == part)
+            local = self._live[part][rows[positions] - self._starts[part]]
+            vectors[positions] = self.parts[part][0].float_rows(local)
+        return vectors
+
+    def similarities(self, queries: np.ndarray) -> np.ndarray:
+        # (행 수, 질의 수) 내적 행렬 (세그먼트마다 계산해 살아 있는 행만 이어 붙임)
+        blocks = [
+            segment.similarities(queries) if not deleted else segment.similarities(queries)[live]
+            for (segment, deleted), live in zip(self.parts, self._live)
+        ]
+        if len(blocks) == 1:
+            return blocks[0]
+        return np.concatenate(blocks) if blocks else np.empty((0, len(queries)), dtype=np.float32)
+
+    def _column(self, key: str) -> list:
+        column = self._columns.get(key)
+        if column is None:
+            column = [metadata.get(key) if metadata else None for metadata in self.metadatas]
+            self._columns[key] = column
+        return column
+
+    def where_mask(self, where: dict) -> np.ndarray:
+        """
+        Chroma where 절($and/$or와 $eq/$ne/$in/$nin/$gt/$gte/$lt/$lte)을 행 마스크로 바꿉니다.
+        """
+        masks = []
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                children = [self.where_mask(child) for child in condition]
+                masks.append(np.logical_and.reduce(children) if key == "$and" else np.logical_or.reduce(children))
+                continue
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            column = self._column(key)
+            for op, value in condition.items():
+                if op in ("$in", "$nin"):
+                    values = set(value)
+                    mask = np.fromiter((v in values for v in column), dtype=bool, count=len(column))
+                    masks.append(mask if op == "$in" else ~mask)
+                elif op in ("$eq", "$ne"):
+                    mask = np.fromiter((v == value for v in column), dtype=bool, count=len(column))
+                    masks.append(mask if op == "$eq" else ~mask)
+                elif op in ("$gt", "$gte", "$lt", "$lte"):
+                    # 값이 없거나 숫자가 아닌 행은 NaN이 되어 비교에서 빠짐
+                    numbers = np.array(
+                        [v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan for v in column],
+                        dtype=np.float64
+                    )
+                    with np.errstate(invalid="ignore"):
+                        masks.append({
+                            "$gt": numbers > value, "$gte": numbers >= value,
+                            "$lt": numbers < value, "$lte": numbers <= value,
+                        }[op])
+                else:
+                    raise ValueError(f"지원하지 않는 where 연산자입니다: {op}")
+        return np.logical_and.reduce(masks) if masks else np.ones(len(self), dtype=bool)
+
+
+class _Staging:
+    """
+    다음 flush에서 커밋할 변경.
+    records: 아직 세그먼트로 쓰지 않은 행 (ID -> (본문, 정규화한 임베딩, 메타데이터)), _BLOCK_ROWS개가 차면 세그먼트로 씀
+    pending: 이번 flush를 위해 써 두었지만 아직 manifest에 없는 세그먼트
+    replaced: 바뀌거나 지워진 ID (커밋된 세그먼트의 같은 ID 행을 지운 것으로 표시)
+    """
+
+    def __init__(self):
+        self.records: Dict[str, tuple] = {}
+        self.pending: List[_Segment] = []
+        self.pending_rows: Dict[str, Tuple[str, int]] = {}  # ID -> (pending 세그먼트 이름, 행 번호)
+        self.pending_deleted: Dict[str, set] = {}
+        self.replaced: set = set()
+
+    def replace(self, id: str):
+        # 이전에 쓴 같은 ID의 행을 지운 것으로 표시
+        self.records.pop(id, None)
+        self.replaced.add(id)
+        location = self.pending_rows.pop(id, None)
+        if location is not None:
+            self.pending_deleted.setdefault(location[0], set()).add(location[1])
+
+
+class NumpyVectorStore:
+    """
+    RAG 컬렉션을 정규화한 float32 행렬 파일로 저장하고 mmap으로 읽는 벡터 저장소.
+    ChromaDBClient와 같은 컬렉션 메서드(upsert_documents, search_by_embedding 등)를 제공하며,
+    검색은 세그먼트마다 행렬 곱과 argpartition으로 정확한 top-k를 구합니다 (거리는 정규화한 벡터의 제곱 L2 거리).
+
+    컬렉션은 한 번 쓰면 바꾸지 않는 세그먼트 디렉터리들과, 그 목록과 지운 행을 적은 manifest.json으로 이루어집니다.
+    쓰기(add/upsert/delete)는 _BLOCK_ROWS개씩 새 세그먼트로 써 두고(메모리는 블록 크기에 비례), flush에서
+    manifest.json을 os.replace로 바꿔 한 번에 커밋합니다. 작은 세그먼트는 합쳐서 세그먼트 수를 로그 수준으로 유지합니다.
+
+    quantization이 'float16'/'int8'이면 행렬을 그 형식으로 저장해 메모리를 1/2, 1/4로 줄이고,
+    rescore > 0이면 float32 사본도 저장해 top_k * rescore개의 후보를 사본으로 다시 채점합니다.
+    형식은 세그먼트를 쓸 때 적용되므로 설정을 바꾸면 다음 빌드부터 반영됩니다.
+    """
+
+    def __init__(self, path: str, quantization: str = "none", rescore: int = 0):
+        self.path = path
+        self.quantization = quantization
+        self.rescore = rescore
+        self._collections: Dict[str, _Collection] = {}
+        self._staging: Dict[str, _Staging] = {}
+        self._lock = threading.Lock()
+
+    def _collection_path(self, collection_name: str) -> str:
+        return os.path.join(self.path, collection_name)
+
+    def create_or_get_collection(self, collection_name: str) -> _Collection:
+        # 다른 프로세스가 커밋했으면(manifest.json이 바뀌었으면) 새 스냅샷을 염
+        path = self._collection_path(collection_name)
+        for attempt in range(3):
+            stamp = _manifest_stamp(path)
+            collection = self._collections.get(collection_name)
+            if collection is not None and collection.stamp == stamp:
+                return collection
+            try:
+                with self._lock:
+                    collection = self._collections.get(collection_name)
+                    if collection is None or collection.stamp != stamp:
+                        collection = _Collection(
+                            path if stamp else None, stamp, collection.segments() if collection else None
+                        )
+                        self._collections[collection_name] = collection
+                return collection
+            except FileNotFoundError:
+                # manifest를 읽은 뒤 다음 커밋이 세그먼트를 지움 -> 새 manifest로 다시 시도
+                if attempt == 2:
+                    raise
+
+    def invalidate_collection(self, collection_name: str):
+        # 열어 둔 컬렉션과 커밋하지 않은 변경을 버림
+        with self._lock:
+            self._collections.pop(collection_name, None)
+            staging = self._staging.pop(collection_name, None)
+        if staging:
+            for segment in staging.pending:
+                shutil.rmtree(os.path.join(self._collection_path(collection_name), segment.name), ignore_errors=True)
+
+    def delete_collection(self, collection_name: str):
+        self.invalidate_collection(collection_name)
+        shutil.rmtree(self._collection_path(collection_name), ignore_errors=True)
+
+    def _stage(self, collection_name: str) -> _Staging:
+        with self._lock:
+            return self._staging.setdefault(collection_name, _Staging())
+
+    def add_documents(self, collection_name: str, documents: list, embeddings: list, ids: list):
+        self.upsert_documents(collection_name, documents, embeddings, ids)
+
+    def upsert_documents(self, collection_name: str, documents: list, embeddings: list, ids: list, metadatas: list = None):
+        staging = self._stage(collection_name)
+        vectors = _normalize(embeddings)
+        for i, id in enumerate(ids):
+            staging.replace(id)
+            staging.records[id] = (documents[i], vectors[i], metadatas[i] if metadatas else None)
+            if len(staging.records) >= _BLOCK_ROWS:
+                self._spill(collection_name, staging)
+
+    def delete_documents(self, collection_name: str, ids: list):
+        staging = self._stage(collection_name)
+        for id in ids:
+            staging.replace(id)
+
+    def _spill(self, collection_name: str, staging: _Staging):
+        # 모아 둔 행을 pending 세그먼트로 씀
+        records, staging.records = staging.records, {}
+        ids = list(records)
+        vectors = np.stack([record[1] for record in records.values()])
+        segment = self._write_segment(self._collection_path(collection_name), len(ids), vectors.shape[1], [(
+            ids, [record[0] or "" for record in records.values()], vectors, [record[2] for record in records.values()]
+        )])
+        staging.pending.append(segment)
+        for row, id in enumerate(ids):
+            staging.pending_rows[id] = (segment.name, row)
+
+    def flush(self, collection_name: str):
+        """
+        커밋하지 않은 변경을 커밋합니다.
+        새 행은 세그먼트로 덧붙이고 바뀌거나 지워진 행은 manifest에 표시만 합니다. manifest.json을 os.replace로
+        바꾸는 것이 커밋이므로, 읽는 쪽(다른 워커 포함)은 이전 스냅샷이나 새 스냅샷 전체만 보고 중간에 죽어도
+        이전 스냅샷이 그대로 남습니다. 커밋에 쓰이지 않는 세그먼트는 커밋한 뒤에 지웁니다.
+        """
+        with self._lock:
+            staging = self._staging.pop(collection_name, None)
+        if staging is None:
+            return
+        if staging.records:
+            self._spill(collection_name, staging)
+        current = self.create_or_get_collection(collection_name)
+        path = self._collection_path(collection_name)
+
+        # 커밋된 세그먼트에서 바뀌거나 지워진 행을 지운 것으로 표시
+        deleted = {segment.name: set(rows) for segment, rows in current.parts}
+        for id in staging.replaced:
+            row = current.rows.get(id)
+            if row is not None:
+                segment, local = current.locate(row)
+                deleted[segment.name].add(local)
+        parts = [(segment, deleted[segment.name]) for segment, _ in current.parts]
+        parts += [(segment, staging.pending_deleted.get(segment.name, set())) for segment in staging.pending]
+        parts = self._compact(path, [part for part in parts if len(part[1]) < len(part[0])])
+
+        os.makedirs(path, exist_ok=True)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "segments": [{"name": segment.name, "deleted": sorted(rows)} for segment, rows in parts],
+        }
+        tmp_path = os.path.join(path, f"{MANIFEST}.tmp-{uuid.uuid4().hex}")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(path, MANIFEST))
+
+        self._remove_unreferenced(path, {segment.name for segment, _ in parts})
+
+    def _compact(self, path: str, parts: list) -> list:
+        def live(part) -> int:
+            return len(part[0]) - len(part[1])
+
+        # 지운 행이 절반을 넘는 세그먼트는 살아 있는 행만 다시 써서 공간을 회수
+        parts = [self._merge(path, [part]) if 2 * len(part[1]) > len(part[0]) else part for part in parts]
+        # 뒤 세그먼트가 앞 세그먼트의 절반 이상이면 합침 (세그먼트 크기가 절반씩 줄어 세그먼트 수는 로그 수준)
+        while True:
+            pair = next((i for i in range(len(parts) - 2, -1, -1) if 2 * live(parts[i + 1]) >= live(parts[i])), None)
+            if pair is None:
+                return parts
+            parts[pair:pair + 2] = [self._merge(path, parts[pair:pair + 2])]
+
+    def _merge(self, path: str, parts: list) -> tuple:
+        # 세그먼트들의 살아 있는 행을 블록 단위로 읽어 새 세그먼트 하나로 씀
+        def blocks():
+            for segment, deleted in parts:
+                rows = np.array([row for row in range(len(segment)) if row not in deleted], dtype=np.int64)
+                for start in range(0, len(rows), _BLOCK_ROWS):
+                    block = rows[start:start + _BLOCK_ROWS]
+                    yield (
+                        [segment.ids[row] for row in block],
+                        [segment.document(row) for row in block],
+                        segment.float_rows(block),
+                        [segment.metadatas[row] for row in block],
+                    )
+
+        count = sum(len(segment) - len(deleted) for segment, deleted in parts)
+        dimensions = next(segment.vectors.shape[1] for segment, _ in parts if len(segment))
+        return self._write_segment(path, count, dimensions, blocks()), set()
+
+    def _write_segment(self, path: str, count: int, dimensions: int, blocks) -> _Segment:
+        # (ID, 본문, float32 벡터, 메타데이터) 블록들을 새 세그먼트 디렉터리에 설정한 형식으로 씀
+        name = f"seg-{uuid.uuid4().hex}"
+        segment_path = os.path.join(path, name)
+        os.makedirs(segment_path)
+        dtype = {"float16": np.float16, "int8": np.int8}.get(self.quantization, np.float32)
+
+        def open_array(name: str, dtype, shape):
+            return np.lib.format.open_memmap(os.path.join(segment_path, name), mode="w+", dtype=dtype, shape=shape)
+
+        vectors = open_array("vectors.npy", dtype, (count, dimensions))
+        scales = open_array("scales.npy", np.float32, (count,)) if self.quantization == "int8" else None
+        full_vectors = None
+        if self.quantization != "none" and self.rescore > 0:
+            full_vectors = open_array("vectors_f32.npy", np.float32, (count, dimensions))
+
+        ids, metadatas = [], []
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        row = 0
+        with open(os.path.join(segment_path, "documents.bin"), "wb") as f:
+            for block_ids, documents, block, block_metadatas in blocks:
+                end = row + len(block)
+                quantized, block_scales = _quantize(block, self.quantization)
+                vectors[row:end] = quantized
+                if scales is not None:
+                    scales[row:end] = block_scales
+                if full_vectors is not None:
+                    full_vectors[row:end] = block
+                for i, document in enumerate(documents):
+                    encoded = document.encode("utf-8")
+                    f.write(encoded)
+                    offsets[row + i + 1] = offsets[row + i] + len(encoded)
+                ids.extend(block_ids)
+                metadatas.extend(block_metadatas)
+                row = end
+        for array in (vectors, scales, full_vectors):
+            if array is not None:
+                array.flush()
+        np.save(os.path.join(segment_path, "document_offsets.npy"), offsets)
+        with open(os.path.join(segment_path, "records.json"), "w", encoding="utf-8") as f:
+            json.dump({"ids": ids, "metadatas": metadatas, "quantization": self.quantization}, f, ensure_ascii=False)
+        return _Segment(segment_path, name)
+
+    def _remove_unreferenced(self, path: str, referenced: set):
+        # 새 manifest에 없는 세그먼트와 이전에 죽은 쓰기가 남긴 파일을 지움
+        # (이미 mmap한 파일은 검색 중인 쪽에서 계속 읽을 수 있고, manifest만 읽은 쪽은 새 manifest로 다시 엶)
+        for entry in os.listdir(path):
+            if entry.startswith("seg-") and entry not in referenced:
+                shutil.rmtree(os.path.join(path, entry), ignore_errors=True)
+            elif entry.startswith(f"{MANIFEST}.tmp-"):
+                os.remove(os.path.join(path, entry))
+        if LEGACY_SEGMENT not in referenced:
+            for name in LEGACY_FILES:
+                if os.path.exists(os.path.join(path, name)):
+                    os.remove(os.path.join(path, name))
+
+    def iter_documents(self, collection_name: str, batch_size: int = 5000):
+        collection = self.create_or_get_collection(collection_name)
+        for segment, row in collection.iter_rows():
+            yield segment.ids[row], segment.document(row), segment.metadatas[row]
+
+    def get_ids(self, collection_name: str, where: Optional[dict] = None) -> list:
+        # 반영된(flush한) 행 중 where에 맞는 ID
+        collection = self.create_or_get_collection(collection_name)
+        if where is None:
+            return list(collection.ids)
+        return [collection.ids[row] for row in np.flatnonzero(collection.where_mask(where))]
+
+    def get_documents(self, collection_name: str, ids: list) -> dict:
+        collection = self.create_or_get_collection(collection_name)
+        return {
+            id: (collection.document(collection.rows[id]), collection.metadatas[collection.rows[id]])
+            for id in ids if id in collection.rows
+        }
+
+    def search_by_embedding(self, collection_name: str, query_embedding: list, n_results: int = 5, where: Optional[dict] = None):
+        # Chroma query와 같은 형태로 질의 벡터마다 하나의 결과 목록을 반환
+        collection = self.create_or_get_collection(collection_name)
+        queries = _normalize(query_embedding)
+        results = {
+            "ids": [], "embeddings": None, "documents": [], "uris": None, "data": None,
+            "metadatas": [], "distances": [], "included": ["metadatas", "documents", "distances"],
+        }
+        if not len(collection):
+            for _ in queries:
+                for key in ("ids", "documents", "metadatas", "distances"):
+                    results[key].append([])
+            return results
+
+        # (행 수, 질의 수) 유사도 행렬을 한 번에 계산
+        similarities = collection.similarities(queries)
+        if where:
+            similarities[~collection.where_mask(where)] = -np.inf
+        # 양자화한 점수로 후보를 넉넉히 고른 뒤 float32 사본으로 다시 채점
+        rescore = collection.rescorable and self.rescore > 0
+        for query, column in zip(queries, similarities.T):
+            candidates = np.flatnonzero(np.isfinite(column))
+            k = min(n_results * self.rescore if rescore else n_results, len(candidates))
+            if k and len(candidates) > k:
+                candidates = candidates[np.argpartition(-column[candidates], k - 1)[:k]]
+            scores = column[candidates]
+            if rescore and len(candidates):
+                candidates = np.sort(candidates)  # mmap한 사본을 파일 순서대로 읽도록
+                scores = collection.float_rows(candidates) @ query
+            order = np.argsort(-scores, kind="stable")[:n_results]
+            rows, scores = candidates[order], scores[order]
+            results["ids"].append([collection.ids[row] for row in rows])
+            results["documents"].append([collection.document(row) for row in rows])
+            results["metadatas"].append([collection.metadatas[row] for row in rows])
+            results["distances"].append([float(2 - 2 * score) for score in scores])
+        return results
+
+    async def search_by_embedding_async(self, collection_name: str, query_embedding: list, n_results: int = 5, where: Optional[dict] = None):
+        return await run_in_pool(chroma_pool, self.search_by_embedding, collection_name, query_embedding, n_results, where)
+
+    async def close(self):
+        with self._lock:
+            self._collections.clear()
+            self._staging.clear()
+
+
+_store: Optional[NumpyVectorStore] = None
+_store_lock = threading.Lock()
+
+
+def get_numpy_store() -> NumpyVectorStore:
+    """
+    프로세스 공용 NumPy 벡터 저장소를 반환합니다. 처음 호출할 때 생성합니다.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = NumpyVectorStore(
+                    settings.numpy_store_path,
+                    quantization=settings.numpy_store_quantization,
+                    rescore=settings.numpy_store_rescore
+                )
+    return _store
+
+
+async def close_numpy_store():
+    global _store
+    with _store_lock:
+        store, _store = _store, None
+    if store is not None:
+        await store.close()
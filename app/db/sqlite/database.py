@@ -1,10 +1,45 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 import os
 
 from app.core.config import settings
 
+# uvicorn 워커마다 두 엔진이 각자 풀을 가지므로, 프로세스당 최대 연결 수는
+# 2 * (sqlite_pool_size + sqlite_max_overflow)
+POOL_OPTIONS = dict(
+    pool_size=settings.sqlite_pool_size,
+    max_overflow=settings.sqlite_max_overflow,
+    pool_timeout=settings.sqlite_pool_timeout,
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    새 연결마다 SQLite 설정을 적용합니다.
+    WAL에서는 읽기와 쓰기가 서로 막지 않고, 쓰기끼리는 busy_timeout 동안 차례를 기다립니다.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA cache_size={-int(settings.sqlite_cache_size_mb) * 1024}")  # 음수는 KiB 단위
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_mb) * 1024 * 1024}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+# 빌드 워커 등 스레드에서 사용하는 동기 엔진
 engine = create_engine(
-    settings.database_url, connect_args={"check_same_thread": False}
+    settings.database_url, connect_args={"check_same_thread": False}, **POOL_OPTIONS
+)
+event.listen(engine, "connect", _set_sqlite_pragmas)
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+# API 핸들러에서 사용하는 비동기 엔진 (aiosqlite)
+async_engine = create_async_engine(
+    make_url(settings.database_url).set(drivername="sqlite+aiosqlite"), **POOL_OPTIONS
 )
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
\ No newline at end of file
+event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
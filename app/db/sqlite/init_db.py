@@ -1,5 +1,25 @@
-from app.db.sqlite.base import Base
-from app.db.sqlite.database import engine 
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.db.sqlite.database import engine
+
+ALEMBIC_INI = Path(__file__).resolve().parents[3] / "alembic.ini"
+# 마이그레이션 도입 전 스키마 (create_all로 만들어진 DB)
+BASELINE_REVISION = "0001"
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    """
+    DB 스키마를 최신 Alembic 마이그레이션(head)으로 올립니다.
+    마이그레이션 도입 전에 만들어진 DB는 baseline으로 표시한 뒤 올립니다.
+    """
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if "alembic_version" not in tables and "users" in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
@@ -0,0 +1,33 @@
+from typing import Literal, Union, TYPE_CHECKING
+import sys
+
+from app.db.chroma.client import ChromaDBClient, close_chroma_client, get_chroma_client
+
+if TYPE_CHECKING:
+    from app.db.numpy_store.client import NumpyVectorStore
+
+# RAG별 벡터 저장소 ('chroma': Chroma HNSW, 'numpy': mmap한 행렬로 정확한 검색)
+VectorBackend = Literal["chroma", "numpy"]
+
+
+def get_vector_store(backend: str) -> Union[ChromaDBClient, "NumpyVectorStore"]:
+    """
+    RAG의 vector_backend에 맞는 프로세스 공용 벡터 저장소를 반환합니다.
+    두 저장소는 같은 컬렉션 메서드를 제공하고, 임베딩 요청은 항상 ChromaDBClient가 맡습니다.
+    """
+    if backend == "numpy":
+        # numpy 저장소를 쓰는 RAG가 있을 때만 불러옴
+        from app.db.numpy_store.client import get_numpy_store
+        return get_numpy_store()
+    return get_chroma_client()
+
+
+async def close_vector_stores():
+    """
+    공용 벡터 저장소를 닫습니다. 앱 종료(lifespan) 시 호출됩니다.
+    """
+    await close_chroma_client()
+    # numpy 저장소는 불러온 적이 있을 때만 닫음
+    numpy_store = sys.modules.get("app.db.numpy_store.client")
+    if numpy_store is not None:
+        await numpy_store.close_numpy_store()
@@ -1,12 +1,41 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.api.routers import router
 import os
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Alembic 마이그레이션으로 스키마를 최신으로 유지
+    from app.db.sqlite.init_db import init_db
+    from app.services.rags.build_jobs import recover_interrupted_jobs
+    init_db()
+    # 죽은 프로세스가 끝내지 못한 빌드 작업은 실패로 표시 (다시 빌드할 수 있도록)
+    recover_interrupted_jobs()
+
+    # 데이터셋 저장 디렉토리 설정
+    Path(settings.datasets_path).mkdir(parents=True, exist_ok=True)
+
+    # ChromaDB 클라이언트는 처음 사용할 때 만들고(get_chroma_client), 종료 시 닫음
+    yield
+
+    from app.services.rags import build_jobs
+    from app.core import concurrency
+    from app.core.providers import close_provider
+    from app.db.vector_store import close_vector_stores
+    from app.db.sqlite.database import async_engine
+    build_jobs.shutdown()
+    concurrency.shutdown()
+    await close_vector_stores()
+    await close_provider()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -14,22 +43,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # 목록 페이지네이션 커서
 )
 
 app.include_router(router)
 
-@app.on_event("startup")
-async def startup_event():
-    if not os.path.exists(settings.database_path):
-        from app.db.sqlite.init_db import init_db
-        init_db()
-    
-    from app.db.chroma.client import chroma_client
-
-    # 데이터셋 저장 디렉토리 설정
-    Path(settings.datasets_path).mkdir(parents=True, exist_ok=True)
-
-
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to the FastAPI application!"}   
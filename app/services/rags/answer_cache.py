@@ -0,0 +1,166 @@
+from typing import List, NamedTuple, Optional
+import threading
+import time
+
+import numpy as np
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+
+class CachedAnswer(NamedTuple):
+    question: str
+    chunk_ids: List[str]  # 답변을 만들 때 검색된 청크 ID
+    answer: str
+    similarity: float  # 조회한 질문과의 코사인 유사도
+
+
+class _RagAnswers:
+    """
+    한 RAG의 캐시 항목. 질문 임베딩은 정규화해 행렬로 모아 두고 한 번의 행렬 곱으로 비교합니다.
+    """
+
+    def __init__(self, build_stamp: Optional[str], dimensions: int):
+        self.build_stamp = build_stamp
+        self.embeddings = np.empty((0, dimensions), dtype=np.float32)
+        self.entries: List[tuple] = []  # (질문, 청크 ID, 답변)
+        self.expires_at = np.empty(0, dtype=np.float64)
+        self.last_used = np.empty(0, dtype=np.float64)
+
+    def remove(self, mask: np.ndarray):
+        keep = ~mask
+        self.embeddings = self.embeddings[keep]
+        self.entries = [entry for entry, kept in zip(self.entries, keep) if kept]
+        self.expires_at = self.expires_at[keep]
+        self.last_used = self.last_used[keep]
+
+
+def _normalize(embedding: list) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticAnswerCache:
+    """
+    RAG별 질문 임베딩 -> (검색된 청크 ID, 답변) 캐시.
+    새 질문과 코사인 유사도가 threshold 이상인 질문이 있으면 그 답변을 돌려줍니다.
+    항목은 ttl초 뒤 만료되고, RAG당 max_entries개를 넘으면 가장 오래 사용되지 않은 항목부터,
+    RAG 수가 max_rags개를 넘으면 가장 오래 사용되지 않은 RAG부터 제거합니다.
+    RAG가 다시 빌드되면(build_stamp가 바뀌면) 그 RAG의 항목은 모두 무효가 됩니다.
+    """
+
+    def __init__(self, threshold: float, ttl: Optional[float], max_entries: int, max_rags: int):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+        self._rags = LRUCache(maxsize=max_rags)  # rag_id -> _RagAnswers
+        self._lock = threading.Lock()
+
+    def _get_rag(self, rag_id: str, build_stamp: Optional[str], dimensions: int, create: bool) -> Optional[_RagAnswers]:
+        answers = self._rags.get(rag_id)
+        if answers is not None and (answers.build_stamp != build_stamp or answers.embeddings.shape[1] != dimensions):
+            # 다시 빌드되었거나 임베딩 모델이 바뀐 RAG의 항목은 버림
+            self.invalidations += len(answers.entries)
+            self._rags.pop(rag_id)
+            answers = None
+        if answers is None and create:
+            answers = _RagAnswers(build_stamp, dimensions)
+            self._rags.set(rag_id, answers)
+        return answers
+
+    def get(self, rag_id: str, build_stamp: Optional[str], embedding: list) -> Optional[CachedAnswer]:
+        """
+        질문 임베딩과 충분히 비슷한 질문의 캐시된 답변을 반환합니다. 없으면 None입니다.
+        """
+        query = _normalize(embedding)
+        now = time.monotonic()
+        with self._lock:
+            answers = self._get_rag(rag_id, build_stamp, len(query), create=False)
+            if answers is not None:
+                expired = answers.expires_at <= now
+                if expired.any():
+                    self.expirations += int(expired.sum())
+                    answers.remove(expired)
+            if answers is None or not answers.entries:
+                self.misses += 1
+                return None
+
+            similarities = answers.embeddings @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            answers.last_used[best] = now
+            question, chunk_ids, answer = answers.entries[best]
+            return CachedAnswer(question, chunk_ids, answer, float(similarities[best]))
+
+    def set(self, rag_id: str, build_stamp: Optional[str], question: str, embedding: list, chunk_ids: List[str], answer: str):
+        vector = _normalize(embedding)
+        now = time.monotonic()
+        with self._lock:
+            answers = self._get_rag(rag_id, build_stamp, len(vector), create=True)
+            if len(answers.entries) >= self.max_entries:
+                evict = np.zeros(len(answers.entries), dtype=bool)
+                evict[np.argsort(answers.last_used)[:len(answers.entries) - self.max_entries + 1]] = True
+                self.evictions += int(evict.sum())
+                answers.remove(evict)
+            answers.embeddings = np.vstack([answers.embeddings, vector[np.newaxis, :]])
+            answers.entries.append((question, list(chunk_ids), answer))
+            answers.expires_at = np.append(answers.expires_at, now + self.ttl if self.ttl else np.inf)
+            answers.last_used = np.append(answers.last_used, now)
+
+    def invalidate(self, rag_id: str):
+        """
+        RAG의 캐시 항목을 모두 제거합니다.
+        """
+        with self._lock:
+            answers = self._rags.pop(rag_id)
+            if answers is not None:
+                self.invalidations += len(answers.entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "rag_evictions": self._rags.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "rags": len(self._rags),
+                "threshold": self.threshold,
+            }
+
+
+_cache: Optional[SemanticAnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """
+    프로세스 공용 답변 캐시를 반환합니다. 비활성화되어 있으면 None입니다.
+    """
+    global _cache
+    if not settings.answer_cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticAnswerCache(
+                    threshold=settings.answer_cache_threshold,
+                    ttl=settings.answer_cache_ttl,
+                    max_entries=settings.answer_cache_size,
+                    max_rags=settings.answer_cache_max_rags
+                )
+    return _cache
@@ -1,74 +1,202 @@
-from app.db.chroma.client import ChromaDBClient
+from app.db.chroma.client import get_chroma_client
+from app.db.vector_store import get_vector_store
 from app.core.config import settings
-from app.api.rags.rags_crud import get_rag_by_id
-from app.api.datasets.datasets_crud import get_dataset_by_id
-from app.db.deps import get_db
+from app.core.providers import get_provider
+from app.core.concurrency import extract_workers, get_extract_pool
+from app.api.rags.rags_model import RagModel, RagDatasetBuild
+from app.api.datasets.datasets_model import Dataset
+from app.services.rags.embeddings import iter_embedding_batches
+from app.services.rags.embedding_cache import cached_embed_fn, get_embedding_cache
+from app.services.rags.extract import iter_sources_pages
+from app.services.rags.chunking import chunk_metadata, format_chunk_params, iter_chunks
+from app.services.rags.lexical_index import build_lexical_index, lexical_index_dir
 from sqlalchemy.orm import Session
+import datetime
+import hashlib
 import json
-import PyPDF2
 import os
-from typing import List
+from typing import Callable, List, Optional
 
-chroma_client = ChromaDBClient()
+def file_sha256(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
 
-def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end]
-        chunks.append(chunk)
-        start = end - chunk_overlap
-    return chunks
+def chunk_ids(dataset_id: str, start: int, end: int) -> List[str]:
+    return [f"{dataset_id}_{i}" for i in range(start, end)]
 
-def read_pdf_content(file_path: str) -> str:
-    with open(file_path, 'rb') as file:
-        pdf_reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-    return text
+def stale_chunk_ids(store, collection_name: str, dataset_id: str, keep: int, recorded: int) -> List[str]:
+    """
+    데이터셋의 청크 중 이번 빌드의 0..keep-1번째가 아닌 청크 ID를 반환합니다.
+    dataset_id 메타데이터로 찾으므로 기록하기 전에 실패한 빌드가 남긴 청크도 포함하고,
+    메타데이터가 없던 예전 청크는 기록된 청크 수(recorded) 범위로 찾습니다.
+    """
+    ids = set(store.get_ids(collection_name, {"dataset_id": dataset_id}))
+    ids.update(chunk_ids(dataset_id, 0, recorded))
+    ids.difference_update(chunk_ids(dataset_id, 0, keep))
+    return sorted(ids)
 
-def build_db(rag_id: str, db: Session):
+def embedded_with_other_model(store, collection_name: str, builds: dict, embedding_model: str, embedding_dimensions: int) -> bool:
+    """
+    컬렉션에 지금 모델/차원이 아닌 임베딩이 있는지 확인합니다.
+    빌드 기록과 청크 메타데이터를 함께 보므로, 기록 전에 실패한 빌드가 다른 모델로 써 둔 청크도 찾습니다.
+    빈 컬렉션도 이전 차원이 남아 있을 수 있으므로 True입니다 (지워도 잃는 것이 없음).
+    """
+    embedding = (embedding_model, embedding_dimensions)
+    if any((build.embedding_model, build.embedding_dimensions) != embedding for build in builds.values()):
+        return True
+    ids = store.get_ids(collection_name)
+    matching = store.get_ids(collection_name, {
+        "$and": [{"embedding_model": embedding_model}, {"embedding_dimensions": embedding_dimensions}]
+    })
+    return not ids or len(ids) != len(matching)
 
+def build_db(rag_id: str, db: Session, progress: Optional[Callable[[int, Optional[int]], None]] = None):
+    """
+    RAG 컬렉션을 증분 빌드합니다.
+    내용과 청크 설정이 그대로인 데이터셋은 건너뛰고, 바뀐 데이터셋은 다시 임베딩해 upsert하며,
+    RAG에서 빠진 데이터셋의 청크는 삭제합니다.
+    임베딩 모델이나 차원이 바뀌었으면 벡터를 섞어 쓸 수 없으므로 컬렉션을 새로 만들어 모두 다시 임베딩합니다.
+    """
+    chroma_client = get_chroma_client()
     collection_name = chroma_client.get_chroma_collection_name(rag_id)
-    
-    chroma_client.create_or_get_collection(collection_name)
 
-    rag = get_rag_by_id(rag_id, db)
+    rag = db.get(RagModel, rag_id)
+    if not rag:
+        # 작업이 대기하는 동안 RAG가 삭제된 경우
+        raise ValueError(f"RAG를 찾을 수 없습니다: {rag_id}")
+    # 청크 저장/삭제는 RAG의 벡터 저장소에, 임베딩 요청은 항상 ChromaDBClient로
+    store = get_vector_store(rag.vector_backend)
+    
+    # 빌드는 핸들을 새로 조회해서 시작 (다른 곳에서 컬렉션이 다시 만들어졌을 수 있음)
+    store.invalidate_collection(collection_name)
+    store.create_or_get_collection(collection_name)
     dataset_ids = json.loads(rag.dataset_ids)
+    chunk_params = format_chunk_params(rag.chunk_unit, rag.chunk_size, rag.chunk_overlap)
     
-    all_documents = []
-    all_embeddings = []
-    all_ids = []
+    builds = {
+        build.dataset_id: build
+        for build in db.query(RagDatasetBuild).filter(RagDatasetBuild.rag_id == rag_id)
+    }
     
+    provider = get_provider()
+    embedding_model, embedding_dimensions = provider.embedding_model, provider.embedding_dimensions()
+    # 다른 모델로 임베딩한 컬렉션은 지우고 빈 컬렉션에서 다시 빌드 (Chroma 컬렉션은 처음 저장한 차원에 고정됨)
+    reset = embedded_with_other_model(store, collection_name, builds, embedding_model, embedding_dimensions)
+    if reset:
+        store.delete_collection(collection_name)
+        store.create_or_get_collection(collection_name)
+        for build in builds.values():
+            db.delete(build)
+        builds = {}
+        db.commit()
+    
+    # RAG에서 빠진 데이터셋의 청크 삭제 (빌드 기록이 없는 데이터셋이 남긴 청크도 메타데이터로 찾음)
+    removed_ids = set(store.get_ids(collection_name, {"dataset_id": {"$nin": dataset_ids}} if dataset_ids else None))
+    removed_builds = [build for dataset_id, build in builds.items() if dataset_id not in dataset_ids]
+    for build in removed_builds:
+        removed_ids.update(chunk_ids(build.dataset_id, 0, build.chunk_count))
+    removed = len(removed_ids)
+    if removed_ids:
+        store.delete_documents(collection_name, sorted(removed_ids))
+        store.flush(collection_name)
+    for build in removed_builds:
+        db.delete(build)
+        del builds[build.dataset_id]
+    db.commit()
+    
+    # 캐시에 없는 청크만 제공자(OpenAI 또는 로컬)로 임베딩
+    embed_fn = chroma_client._get_embeddings
+    cache = get_embedding_cache()
+    if cache:
+        embed_fn = cached_embed_fn(embed_fn, cache, embedding_model)
+    
+    # 내용과 청크 설정이 바뀐 데이터셋만 다시 빌드
+    targets = []
     for dataset_id in dataset_ids:
-        dataset = get_dataset_by_id(dataset_id, db)
-        
-        file_path = f"./uploads/datasets/{dataset_id}.{dataset.file_type}"
+        dataset = db.get(Dataset, dataset_id)
+        if not dataset:
+            raise ValueError(f"데이터셋을 찾을 수 없습니다: {dataset_id}")
         
-        if dataset.file_type == 'pdf':
-            content = read_pdf_content(file_path)
-        else:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        file_path = os.path.join(settings.datasets_path, f"{dataset_id}.{dataset.file_type}")
+        content_hash = dataset.sha256 or file_sha256(file_path)
         
-        chunks = chunk_text(content)
-        
-        # 각 청크에 대해 임베딩 생성
-        for i, chunk in enumerate(chunks):
-            embedding = chroma_client._get_embedding(chunk)
-            
-            all_documents.append(chunk)
-            all_embeddings.append(embedding)
-            all_ids.append(f"{dataset_id}_{i}")
+        build = builds.get(dataset_id)
+        if build and build.content_hash == content_hash and build.chunk_params == chunk_params:
+            continue
+        targets.append((dataset_id, file_path, dataset.file_type, content_hash, build))
     
-    chroma_client.add_documents(
-        collection_name=collection_name,
-        documents=all_documents,
-        embeddings=all_embeddings,
-        ids=all_ids
+    chunks_embedded = 0
+    if progress:
+        progress(0, None)
+    
+    # PDF 추출은 프로세스 풀에서 페이지 범위 단위로 병렬 처리하고, 결과는 데이터셋/페이지 순서대로 받음
+    sources_pages = iter_sources_pages(
+        [(file_path, file_type) for _, file_path, file_type, _, _ in targets],
+        get_extract_pool(),
+        pages_per_task=settings.extract_pages_per_task,
+        prefetch=extract_workers * 2
     )
+    
+    try:
+        for (dataset_id, file_path, file_type, content_hash, build), pages in zip(targets, sources_pages):
+            # 페이지 -> 청크 -> 임베딩 배치 -> Chroma 저장을 스트리밍으로 처리 (메모리는 배치 크기에 비례)
+            chunks = iter_chunks(pages, rag.chunk_unit, rag.chunk_size, rag.chunk_overlap)
+            chunk_count = 0
+            for batch, embeddings in iter_embedding_batches(
+                chunks, embed_fn,
+                text=lambda chunk: chunk.text,
+                token_count=lambda chunk: chunk.tokens
+            ):
+                store.upsert_documents(
+                    collection_name=collection_name,
+                    documents=[chunk.text for chunk in batch],
+                    embeddings=embeddings,
+                    ids=[f"{dataset_id}_{chunk.index}" for chunk in batch],
+                    metadatas=[
+                        chunk_metadata(chunk, dataset_id, chunk_params, embedding_model, embedding_dimensions)
+                        for chunk in batch
+                    ]
+                )
+                chunk_count += len(batch)
+                chunks_embedded += len(batch)
+                if progress:
+                    progress(chunks_embedded, None)
+            
+            # 이번 빌드에 없는 청크 삭제 (청크 수가 줄었거나 이전에 실패한 빌드가 더 많이 써 둔 경우)
+            store.delete_documents(collection_name, stale_chunk_ids(
+                store, collection_name, dataset_id, chunk_count, build.chunk_count if build else 0
+            ))
+            # 빌드 상태를 기록하기 전에 데이터셋의 변경을 저장소에 반영
+            store.flush(collection_name)
+            
+            if not build:
+                build = RagDatasetBuild(rag_id=rag_id, dataset_id=dataset_id)
+                db.add(build)
+            build.content_hash = content_hash
+            build.chunk_params = chunk_params
+            build.chunk_count = chunk_count
+            build.embedding_model = embedding_model
+            build.embedding_dimensions = embedding_dimensions
+            build.built_at = datetime.datetime.now().isoformat()
+            db.commit()
+    except BaseException:
+        # 저장소에 반영하지 않은 변경은 버림
+        store.invalidate_collection(collection_name)
+        raise
+    finally:
+        # 실패 시 아직 시작하지 않은 추출 작업 취소
+        sources_pages.close()
+    
+    # 컬렉션이 바뀌었거나 색인이 아직 없으면 BM25 색인을 컬렉션 전체에서 다시 만듦
+    index_path = lexical_index_dir(collection_name)
+    if targets or removed or reset or not os.path.exists(index_path):
+        build_lexical_index(index_path, store.iter_documents(collection_name))
+    
+    if progress:
+        progress(chunks_embedded, chunks_embedded)
 
-    print(f"RAG {rag_id} 데이터베이스 구축 완료. {len(all_documents)}개의 문서가 추가되었습니다.")
-    return True
\ No newline at end of file
+    print(f"RAG {rag_id} 데이터베이스 구축 완료. {len(targets)}개 데이터셋에서 {chunks_embedded}개의 문서가 갱신되었습니다.")
+    return True
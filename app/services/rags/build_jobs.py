@@ -0,0 +1,222 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+import datetime
+import os
+import socket
+import threading
+import traceback
+import uuid
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.sqlite.database import SessionLocal
+from app.api.rags.rags_model import RagBuildJob
+import app.api.rags.rags_crud as crud
+
+# RAG 빌드 작업을 실행하는 워커 풀 (API 이벤트 루프와 분리)
+_executor = ThreadPoolExecutor(max_workers=settings.build_workers, thread_name_prefix="rag-build")
+# 아직 끝나지 않은 작업 ID -> Future (종료 시 취소된 작업을 실패로 기록하기 위해)
+_futures: Dict[str, Future] = {}
+_futures_lock = threading.Lock()
+
+# 이 프로세스를 가리키는 작업 소유자 ID (uvicorn 워커마다 다르고, 다시 시작하면 바뀜)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+ACTIVE_STATUSES = ("queued", "running")
+STALE_ERROR = "빌드를 맡은 서버 프로세스가 응답하지 않아 빌드가 중단되었습니다."
+
+# 이 프로세스가 맡은 작업의 heartbeat_at을 갱신하는 스레드 (첫 작업을 큐에 넣을 때 시작)
+_heartbeat_thread: Optional[threading.Thread] = None
+_heartbeat_stop = threading.Event()
+
+
+def _stale_before() -> str:
+    # 이 시각보다 heartbeat_at이 오래된 작업은 맡은 프로세스가 죽은 것으로 봄
+    return (datetime.datetime.now() - datetime.timedelta(seconds=settings.build_job_stale_after)).isoformat()
+
+
+def _is_stale(job: RagBuildJob) -> bool:
+    return job.heartbeat_at is None or job.heartbeat_at < _stale_before()
+
+
+def _stale_condition():
+    return or_(RagBuildJob.heartbeat_at.is_(None), RagBuildJob.heartbeat_at < _stale_before())
+
+
+async def enqueue_build(rag_id: str, db: AsyncSession) -> RagBuildJob:
+    """
+    RAG 빌드 작업을 큐에 넣고 바로 반환합니다.
+    같은 RAG의 빌드가 이미 대기/실행 중이면 그 작업을 반환합니다.
+    단, 맡은 프로세스가 죽어 heartbeat가 끊긴 작업은 실패로 표시하고 새 작업을 만듭니다.
+    """
+    job = await crud.get_active_build_job(rag_id, db)
+    if job and not _is_stale(job):
+        return job
+    if job:
+        await db.execute(
+            update(RagBuildJob)
+            .where(RagBuildJob.id == job.id, RagBuildJob.status.in_(ACTIVE_STATUSES), _stale_condition())
+            .values(status="failed", error=STALE_ERROR, finished_at=datetime.datetime.now().isoformat())
+        )
+        await db.commit()
+
+    try:
+        job = await crud.create_build_job(rag_id, db, owner=WORKER_ID)
+    except IntegrityError:
+        # 동시에 들어온 다른 요청이 먼저 작업을 만듦 (RAG당 활성 작업 하나만 허용하는 부분 유니크 인덱스)
+        await db.rollback()
+        return await crud.get_active_build_job(rag_id, db)
+
+    with _futures_lock:
+        future = _executor.submit(run_build_job, job.id)
+        _futures[job.id] = future
+    future.add_done_callback(lambda _: _forget(job.id))
+    _start_heartbeat()
+    return job
+
+
+def _forget(job_id: str):
+    with _futures_lock:
+        _futures.pop(job_id, None)
+
+
+def _start_heartbeat():
+    global _heartbeat_thread, _heartbeat_stop
+    with _futures_lock:
+        if _heartbeat_thread is None:
+            _heartbeat_stop = threading.Event()
+            _heartbeat_thread = threading.Thread(
+                target=_heartbeat_loop, args=(_heartbeat_stop,), name="rag-build-heartbeat", daemon=True
+            )
+            _heartbeat_thread.start()
+
+
+def _heartbeat_loop(stop: threading.Event):
+    while not stop.wait(settings.build_job_heartbeat_interval):
+        try:
+            heartbeat()
+        except Exception:
+            # DB가 잠깐 잠겨 있어도 다음 주기에 다시 기록
+            traceback.print_exc()
+
+
+def heartbeat() -> int:
+    """
+    이 프로세스가 맡아 아직 끝나지 않은 작업의 heartbeat_at을 지금 시각으로 갱신합니다.
+    """
+    with _futures_lock:
+        job_ids = list(_futures)
+    if not job_ids:
+        return 0
+    with SessionLocal() as db:
+        result = db.execute(
+            update(RagBuildJob)
+            .where(RagBuildJob.id.in_(job_ids), RagBuildJob.status.in_(ACTIVE_STATUSES))
+            .values(heartbeat_at=datetime.datetime.now().isoformat())
+        )
+        db.commit()
+        return result.rowcount
+
+
+def _update_job(job_id: str, db: Session, **fields) -> RagBuildJob:
+    # 워커 스레드의 동기 세션으로 작업 상태/진행률 갱신
+    job = db.get(RagBuildJob, job_id)
+    if not job:
+        return None
+    for key, value in fields.items():
+        setattr(job, key, value)
+    db.commit()
+    return job
+
+
+def run_build_job(job_id: str):
+    """
+    워커 스레드에서 빌드 작업을 실행하고 상태를 SQLite에 기록합니다.
+    """
+    db = SessionLocal()
+    try:
+        job = _update_job(
+            job_id, db,
+            status="running",
+            started_at=datetime.datetime.now().isoformat()
+        )
+        if not job:
+            return
+
+        def on_progress(chunks_embedded: int, chunks_total: Optional[int]):
+            # 스트리밍 빌드 중에는 전체 청크 수를 알 수 없으므로 끝날 때 기록됨
+            fields = {"chunks_embedded": chunks_embedded}
+            if chunks_total is not None:
+                fields["chunks_total"] = chunks_total
+            _update_job(job_id, db, **fields)
+
+        # PDF 추출/청크/임베딩 모듈(PyPDF2, numpy, tiktoken)은 첫 빌드 때 불러옴
+        from app.services.rags.build_db import build_db
+        from app.services.rags.answer_cache import get_answer_cache
+        build_db(job.rag_id, db, progress=on_progress)
+
+        # 재빌드 전의 검색 결과로 만든 답변은 더 이상 쓰지 않음
+        answer_cache = get_answer_cache()
+        if answer_cache:
+            answer_cache.invalidate(job.rag_id)
+
+        _update_job(
+            job_id, db,
+            status="done",
+            finished_at=datetime.datetime.now().isoformat()
+        )
+    except Exception as e:
+        traceback.print_exc()
+        db.rollback()
+        _update_job(
+            job_id, db,
+            status="failed",
+            error=str(e),
+            finished_at=datetime.datetime.now().isoformat()
+        )
+    finally:
+        db.close()
+
+
+def _fail_jobs(error: str, job_ids: Optional[Iterable[str]] = None, stale_only: bool = False) -> int:
+    # 대기/실행 중인 작업(job_ids가 있으면 그 작업만, stale_only면 heartbeat가 끊긴 작업만)을 실패로 표시하고 표시한 수를 반환
+    stmt = update(RagBuildJob).where(RagBuildJob.status.in_(ACTIVE_STATUSES))
+    if job_ids is not None:
+        stmt = stmt.where(RagBuildJob.id.in_(list(job_ids)))
+    if stale_only:
+        stmt = stmt.where(_stale_condition())
+    with SessionLocal() as db:
+        result = db.execute(stmt.values(
+            status="failed",
+            error=error,
+            finished_at=datetime.datetime.now().isoformat()
+        ))
+        db.commit()
+        return result.rowcount
+
+
+def recover_interrupted_jobs() -> int:
+    """
+    앱 시작 시 호출됩니다. 죽은 프로세스가 대기/실행 중으로 남긴 작업을 실패로 표시해 같은 RAG를 다시
+    빌드할 수 있게 합니다. 여러 워커로 실행하므로 heartbeat가 build_job_stale_after보다 오래 끊긴 작업만
+    표시합니다 (살아 있는 다른 워커의 작업은 그대로 둠).
+    """
+    return _fail_jobs(STALE_ERROR, stale_only=True)
+
+
+def shutdown():
+    """
+    대기 중인 작업을 취소하고 워커 풀을 종료합니다. 취소된 작업은 실패로 기록합니다.
+    """
+    global _heartbeat_thread
+    with _futures_lock:
+        futures = dict(_futures)
+        _heartbeat_stop.set()
+        _heartbeat_thread = None
+    _executor.shutdown(wait=False, cancel_futures=True)
+    cancelled = [job_id for job_id, future in futures.items() if future.cancelled()]
+    if cancelled:
+        _fail_jobs("서버 종료로 빌드가 취소되었습니다.", cancelled)
@@ -0,0 +1,228 @@
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+import threading
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.rags.embeddings import get_encoding
+
+# 청크 분할 단위
+CHUNK_UNITS = ("char", "token")
+
+# 청크 경계나 메타데이터가 바뀌면 올림 (chunk_params에 들어가므로 다음 빌드에서 다시 나뉨)
+CHUNKING_VERSION = 2
+
+
+class Chunk(NamedTuple):
+    index: int  # 데이터셋 안에서의 청크 순번
+    text: str
+    page: int  # 청크가 시작하는 페이지 번호
+    start: int  # 데이터셋 전체 텍스트(페이지를 이어붙인 것)에서 청크가 시작하는 문자 위치
+    last_page: int  # 청크가 끝나는 페이지 번호
+    tokens: Optional[int] = None  # 토큰 단위로 나눈 경우 청크의 토큰 수
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.text)
+
+
+def _shift_page_marks(page_marks: list, offset: int) -> list:
+    # buffer 앞부분을 offset만큼 잘라낸 뒤의 페이지 시작 위치 (잘린 페이지 중 마지막 것은 0 위치로)
+    shifted = [(start - offset, number) for start, number in page_marks]
+    kept = [mark for mark in shifted if mark[0] > 0]
+    cut = [mark for mark in shifted if mark[0] <= 0]
+    if cut:
+        kept.insert(0, (0, cut[-1][1]))
+    return kept
+
+
+def _page_at(page_marks: list, offset: int) -> int:
+    page = page_marks[0][1]
+    for start, number in page_marks:
+        if start > offset:
+            break
+        page = number
+    return page
+
+
+_token_lengths = {}  # 인코딩 이름 -> 토큰 ID별 바이트 길이
+_token_lengths_lock = threading.Lock()
+
+
+def _get_token_lengths(encoding) -> np.ndarray:
+    if encoding.name not in _token_lengths:
+        with _token_lengths_lock:
+            if encoding.name not in _token_lengths:
+                lengths = np.zeros(encoding.n_vocab, dtype=np.int64)
+                for token in range(encoding.n_vocab):
+                    try:
+                        lengths[token] = len(encoding.decode_single_token_bytes(token))
+                    except KeyError:
+                        pass
+                _token_lengths[encoding.name] = lengths
+    return _token_lengths[encoding.name]
+
+
+def token_offsets(text: str, encoding) -> np.ndarray:
+    """
+    텍스트를 한 번 토큰화해 각 토큰이 시작하는 문자 위치를 반환합니다.
+    토큰이 UTF-8 글자 중간에서 시작하면 그 글자의 위치를 씁니다 (decode_with_offsets와 같은 결과).
+    encoding이 False면 UTF-8 바이트 하나를 토큰 하나로 봅니다 (count_tokens와 같은 기준).
+    """
+    data = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    # 바이트 위치 -> 그 바이트가 속한 글자의 위치
+    char_index = np.cumsum((data & 0xC0) != 0x80) - 1
+    if encoding is False:
+        return char_index
+    tokens = np.array(encoding.encode_ordinary(text), dtype=np.int64)
+    if not len(tokens):
+        return np.zeros(0, dtype=np.int64)
+    lengths = _get_token_lengths(encoding)[tokens]
+    byte_starts = np.cumsum(lengths) - lengths
+    return char_index[byte_starts]
+
+
+def _check_params(chunk_size: int, chunk_overlap: int) -> int:
+    step = chunk_size - chunk_overlap
+    if chunk_overlap < 0 or step <= 0:
+        raise ValueError("chunk_overlap은 0 이상, chunk_size보다 작아야 합니다.")
+    return step
+
+
+def iter_char_chunks(pages: Iterable[Tuple[int, str]], chunk_size: int = 1000, chunk_overlap: int = 200) -> Iterator[Chunk]:
+    """
+    (페이지 번호, 텍스트) 스트림을 문자 단위 청크로 나눕니다.
+    문서 전체를 이어붙인 텍스트를 chunk_size 크기, chunk_overlap만큼 겹치게 자른 것과 같은 결과를
+    페이지를 하나씩 받으면서 만들어내므로 메모리는 페이지 크기와 청크 크기에만 비례합니다.
+    """
+    step = _check_params(chunk_size, chunk_overlap)
+
+    buffer = ""
+    offset = 0  # 버린 앞부분의 길이 (buffer[0]의 문서 전체 기준 위치)
+    pos = 0  # buffer 안에서 다음 청크의 시작 위치
+    page_marks = []  # (buffer 안의 시작 위치, 페이지 번호)
+    index = 0
+
+    def make_chunk() -> Chunk:
+        text = buffer[pos:pos + chunk_size]
+        return Chunk(index, text, _page_at(page_marks, pos), offset + pos, _page_at(page_marks, pos + len(text) - 1))
+
+    for page_number, text in pages:
+        if not text:
+            continue
+        # 이미 청크로 나간 앞부분을 버리고 새 페이지를 이어붙임
+        buffer = buffer[pos:] + text
+        page_marks = _shift_page_marks(page_marks, pos)
+        page_marks.append((len(buffer) - len(text), page_number))
+        offset += pos
+        pos = 0
+
+        while len(buffer) - pos >= chunk_size:
+            yield make_chunk()
+            index += 1
+            pos += step
+
+    while pos < len(buffer):
+        yield make_chunk()
+        index += 1
+        pos += step
+
+
+def iter_token_chunks(pages: Iterable[Tuple[int, str]], chunk_size: int = 256, chunk_overlap: int = 32, encoding=None) -> Iterator[Chunk]:
+    """
+    (페이지 번호, 텍스트) 스트림을 tiktoken 토큰 단위 청크로 나눕니다.
+    페이지마다 한 번만 토큰화하고 각 토큰의 문자 위치를 기록해 두었다가, 청크는 원문을 그 위치로
+    잘라 만듭니다. 그래서 토큰이 한글 글자 중간에서 끊겨도 청크 텍스트가 깨지지 않습니다.
+    로컬 제공자(get_encoding()이 False)는 네트워크 없이 빌드하도록 UTF-8 바이트를 토큰으로 씁니다.
+    """
+    step = _check_params(chunk_size, chunk_overlap)
+    if encoding is None:
+        encoding = get_encoding()
+    if encoding is False and settings.llm_provider != "local":
+        # OpenAI 임베딩의 토큰 제한에 맞춘 청크여야 하므로 바이트로 대신 나누지 않음
+        raise RuntimeError("tiktoken 인코딩을 불러올 수 없어 토큰 단위로 청크를 나눌 수 없습니다.")
+
+    buffer = ""
+    offset = 0  # 버린 앞부분의 길이 (buffer[0]의 문서 전체 기준 위치)
+    starts = []  # buffer 안에서 각 토큰이 시작하는 문자 위치
+    pos = 0  # 다음 청크의 시작 토큰
+    page_marks = []  # (buffer 안의 시작 위치, 페이지 번호)
+    index = 0
+
+    def make_chunk(start_token: int) -> Chunk:
+        end_token = start_token + chunk_size
+        start = starts[start_token]
+        end = starts[end_token] if end_token < len(starts) else len(buffer)
+        tokens = min(chunk_size, len(starts) - start_token)
+        return Chunk(
+            index, buffer[start:end], _page_at(page_marks, start), offset + start,
+            _page_at(page_marks, max(start, end - 1)), tokens
+        )
+
+    for page_number, text in pages:
+        if not text:
+            continue
+        # 이미 청크로 나간 토큰과 그 앞의 텍스트를 버리고 새 페이지를 이어붙임
+        cut = starts[pos] if pos < len(starts) else len(buffer)
+        buffer = buffer[cut:] + text
+        starts = [start - cut for start in starts[pos:]]
+        page_marks = _shift_page_marks(page_marks, cut)
+        offset += cut
+        base = len(buffer) - len(text)
+        page_marks.append((base, page_number))
+        pos = 0
+
+        starts.extend((token_offsets(text, encoding) + base).tolist())
+
+        while len(starts) - pos >= chunk_size:
+            yield make_chunk(pos)
+            index += 1
+            pos += step
+
+    while pos < len(starts):
+        yield make_chunk(pos)
+        index += 1
+        pos += step
+
+
+def iter_chunks(pages: Iterable[Tuple[int, str]], chunk_unit: str, chunk_size: int, chunk_overlap: int) -> Iterator[Chunk]:
+    """
+    RAG 설정의 단위(char/token)에 맞는 청커로 페이지 스트림을 나눕니다.
+    """
+    if chunk_unit == "char":
+        return iter_char_chunks(pages, chunk_size, chunk_overlap)
+    if chunk_unit == "token":
+        return iter_token_chunks(pages, chunk_size, chunk_overlap)
+    raise ValueError(f"지원하지 않는 청크 단위입니다: {chunk_unit}")
+
+
+def format_chunk_params(chunk_unit: str, chunk_size: int, chunk_overlap: int) -> str:
+    """
+    증분 빌드에서 청크 설정 변경을 감지하기 위한 문자열 (e.g. 'char:1000:200:v2', 'token:256:32:cl100k_base:v2')
+    토큰 단위는 토크나이저(tiktoken 인코딩 이름, 바이트로 센 경우 'bytes')도 넣어, 바뀌면 다시 나뉘게 합니다.
+    """
+    if chunk_unit == "token":
+        encoding = get_encoding()
+        tokenizer = encoding.name if encoding is not False else "bytes"
+        return f"{chunk_unit}:{chunk_size}:{chunk_overlap}:{tokenizer}:v{CHUNKING_VERSION}"
+    return f"{chunk_unit}:{chunk_size}:{chunk_overlap}:v{CHUNKING_VERSION}"
+
+
+def chunk_metadata(chunk: Chunk, dataset_id: str, chunk_params: str, embedding_model: str, embedding_dimensions: int) -> dict:
+    """
+    Chroma에 청크와 함께 저장하는 메타데이터. 검색 시 where 필터에 쓸 수 있습니다.
+    """
+    metadata = {
+        "dataset_id": dataset_id,
+        "chunk_index": chunk.index,
+        "page": chunk.page,
+        "last_page": chunk.last_page,
+        "char_start": chunk.start,
+        "char_end": chunk.end,
+        "chunk_params": chunk_params,
+        "embedding_model": embedding_model,
+        "embedding_dimensions": embedding_dimensions,
+    }
+    if chunk.tokens is not None:
+        metadata["tokens"] = chunk.tokens
+    return metadata
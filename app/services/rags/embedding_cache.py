@@ -0,0 +1,173 @@
+from array import array
+from typing import List, Optional
+import hashlib
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+
+# 한 번의 IN 조회에 넣을 최대 파라미터 수 (SQLite 변수 제한보다 작게)
+_LOOKUP_CHUNK = 500
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    (임베딩 모델, 청크 텍스트의 SHA-256)을 키로 하는 영구 임베딩 캐시.
+    SQLite 파일에 float32 BLOB으로 저장하며, 전체 크기가 max_bytes를 넘으면
+    가장 오래 사용되지 않은 항목부터 제거합니다.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                embedding BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[list]]:
+        """
+        텍스트별 캐시된 임베딩을 반환합니다. 없는 항목은 None입니다.
+        """
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(hashes), _LOOKUP_CHUNK):
+                chunk = hashes[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, embedding FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    (model, *chunk)
+                ).fetchall()
+                found.update(rows)
+            if found:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, key) for key in found]
+                )
+                self._conn.execute("COMMIT")
+            results = []
+            for key in hashes:
+                blob = found.get(key)
+                if blob is None:
+                    results.append(None)
+                else:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    results.append(vector.tolist())
+            hit_count = sum(1 for result in results if result is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[list]):
+        """
+        임베딩을 저장하고 필요하면 크기 제한에 맞춰 오래된 항목을 제거합니다.
+        """
+        now = time.time()
+        rows = []
+        for text, embedding in zip(texts, embeddings):
+            blob = array("f", embedding).tobytes()
+            rows.append((model, text_hash(text), blob, len(blob), now))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, embedding, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute("COMMIT")
+            self._total_bytes += sum(row[3] for row in rows)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # 다른 프로세스의 쓰기도 반영하도록 실제 크기를 다시 계산한 뒤 목표 크기(90%)까지 제거
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                "SELECT model, text_hash, size FROM embeddings ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                break
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND text_hash = ?",
+                [(model, key) for model, key, _ in rows]
+            )
+            self._conn.execute("COMMIT")
+            self._total_bytes -= sum(size for _, _, size in rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def cached_embed_fn(embed_fn, cache: EmbeddingCache, model: str):
+    """
+    캐시를 먼저 조회하고 없는 텍스트만 embed_fn으로 임베딩하는 함수를 반환합니다.
+    """
+    def embed(texts: List[str]) -> List[list]:
+        embeddings = cache.get_many(model, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            new_embeddings = embed_fn(missing_texts)
+            cache.put_many(model, missing_texts, new_embeddings)
+            for i, embedding in zip(missing, new_embeddings):
+                embeddings[i] = embedding
+        return embeddings
+
+    return embed
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    프로세스 공용 임베딩 캐시를 반환합니다. 비활성화되어 있으면 None입니다.
+    """
+    global _cache
+    if not settings.embedding_cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    settings.embedding_cache_path,
+                    settings.embedding_cache_max_mb * 1024 * 1024
+                )
+    return _cache
@@ -0,0 +1,114 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+# OpenAI 임베딩 API의 요청당 제한
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300000
+
+EmbedFn = Callable[[List[str]], List[list]]
+
+_encoding = None
+
+
+def get_encoding():
+    """
+    임베딩 모델의 tiktoken 인코딩을 반환합니다. 불러올 수 없거나 로컬 제공자를 쓰면 False입니다.
+    (False면 UTF-8 바이트 하나를 토큰 하나로 셉니다)
+    """
+    global _encoding
+    if _encoding is None and settings.llm_provider == "local":
+        # 로컬 제공자는 네트워크 없이 동작해야 하므로 인코딩 파일을 내려받지 않음
+        _encoding = False
+    if _encoding is None:
+        try:
+            import tiktoken
+            try:
+                _encoding = tiktoken.encoding_for_model(settings.openai_embeddings_model)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # 인코딩 파일을 내려받을 수 없는 환경에서는 바이트 수로 대신 계산
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수를 계산합니다.
+    tiktoken을 쓸 수 없거나 로컬 제공자를 쓰면 UTF-8 바이트 수(토큰 수의 상한)를 반환합니다.
+    """
+    encoding = get_encoding()
+    if encoding is False:
+        return len(text.encode("utf-8"))
+    return len(encoding.encode_ordinary(text))
+
+
+def make_batches(
+    items: Iterable[Any],
+    max_inputs: int,
+    max_tokens: int,
+    text: Callable[[Any], str] = None,
+    token_count: Callable[[Any], Optional[int]] = None,
+) -> Iterator[List[Any]]:
+    """
+    항목을 입력 개수와 토큰 수 제한을 넘지 않는 배치로 묶습니다.
+    항목이 문자열이 아니면 text로 임베딩할 텍스트를 꺼내고, token_count가 토큰 수를 알려주면
+    다시 토큰화하지 않습니다.
+    """
+    batch: List[Any] = []
+    batch_tokens = 0
+    for item in items:
+        tokens = token_count(item) if token_count else None
+        if tokens is None:
+            tokens = count_tokens(text(item) if text else item)
+        if batch and (len(batch) >= max_inputs or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def iter_embedding_batches(
+    items: Iterable[Any],
+    embed_fn: EmbedFn,
+    batch_size: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    text: Callable[[Any], str] = None,
+    token_count: Callable[[Any], Optional[int]] = None,
+) -> Iterator[Tuple[List[Any], List[list]]]:
+    """
+    항목을 배치로 묶어 임베딩하고 (배치, 임베딩) 쌍을 입력 순서대로 반환합니다.
+    동시에 진행 중인 요청은 최대 concurrency개로 제한되므로, items가 제너레이터이면
+    메모리에 올라가는 항목도 배치 크기 x concurrency 정도로 유지됩니다.
+    """
+    batch_size = min(batch_size or settings.embedding_batch_size, MAX_INPUTS_PER_REQUEST)
+    max_tokens = min(max_tokens or settings.embedding_batch_max_tokens, MAX_TOKENS_PER_REQUEST)
+    concurrency = max(1, concurrency or settings.embedding_concurrency)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embedding") as executor:
+        pending = deque()
+        for batch in make_batches(items, batch_size, max_tokens, text, token_count):
+            texts = [text(item) for item in batch] if text else batch
+            pending.append((batch, executor.submit(embed_fn, texts)))
+            if len(pending) >= concurrency:
+                done_batch, future = pending.popleft()
+                yield done_batch, future.result()
+        while pending:
+            done_batch, future = pending.popleft()
+            yield done_batch, future.result()
+
+
+def embed_texts(texts: List[str], embed_fn: EmbedFn, **kwargs) -> List[list]:
+    """
+    텍스트 목록 전체를 임베딩하여 입력 순서대로 반환합니다.
+    """
+    embeddings: List[list] = []
+    for _, batch_embeddings in iter_embedding_batches(texts, embed_fn, **kwargs):
+        embeddings.extend(batch_embeddings)
+    return embeddings
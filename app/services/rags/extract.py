@@ -0,0 +1,93 @@
+from collections import deque
+from concurrent.futures import Executor
+from typing import Iterator, List, Sequence, Tuple
+import PyPDF2
+
+# 텍스트 파일을 읽어들이는 단위 (문자 수)
+TEXT_BLOCK_SIZE = 1024 * 1024
+
+def iter_pdf_pages(file_path: str) -> Iterator[Tuple[int, str]]:
+    """
+    PDF의 페이지를 하나씩 추출하여 (페이지 번호, 텍스트)로 반환합니다. 페이지 번호는 1부터 시작합니다.
+    """
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page_number, page in enumerate(pdf_reader.pages, start=1):
+            yield page_number, page.extract_text() or ""
+
+def iter_text_pages(file_path: str) -> Iterator[Tuple[int, str]]:
+    """
+    텍스트 파일을 블록 단위로 읽어 (1, 텍스트)로 반환합니다. 텍스트 파일은 한 페이지로 취급합니다.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for block in iter(lambda: file.read(TEXT_BLOCK_SIZE), ''):
+            yield 1, block
+
+def iter_dataset_pages(file_path: str, file_type: str) -> Iterator[Tuple[int, str]]:
+    if file_type == 'pdf':
+        return iter_pdf_pages(file_path)
+    return iter_text_pages(file_path)
+
+def count_pdf_pages(file_path: str) -> int:
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+def extract_pdf_page_range(file_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """
+    PDF의 [start, end) 페이지를 추출합니다. 프로세스 풀 워커에서 실행됩니다.
+    """
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [(number + 1, pdf_reader.pages[number].extract_text() or "") for number in range(start, end)]
+
+def _plan_pdf_tasks(sources: Sequence[Tuple[str, str]], pages_per_task: int) -> Iterator[Tuple[int, str, int, int]]:
+    # (소스 순번, 파일 경로, 시작 페이지, 끝 페이지)
+    for position, (file_path, file_type) in enumerate(sources):
+        if file_type != 'pdf':
+            continue
+        page_count = count_pdf_pages(file_path)
+        for start in range(0, page_count, pages_per_task):
+            yield position, file_path, start, min(start + pages_per_task, page_count)
+
+def iter_sources_pages(
+    sources: Sequence[Tuple[str, str]],
+    executor: Executor,
+    pages_per_task: int = 32,
+    prefetch: int = 8,
+) -> Iterator[Iterator[Tuple[int, str]]]:
+    """
+    (파일 경로, 파일 형식) 목록을 받아 소스마다 페이지 이터레이터를 순서대로 반환합니다.
+    PDF는 pages_per_task 페이지씩 나눠 executor에서 미리 추출하며(최대 prefetch개 작업),
+    다음 데이터셋의 추출도 앞 데이터셋을 임베딩하는 동안 진행됩니다.
+    텍스트 파일은 CPU를 거의 쓰지 않으므로 현재 프로세스에서 바로 읽습니다.
+    반환된 페이지 이터레이터는 다음 소스로 넘어가기 전에 끝까지 소비해야 합니다.
+    """
+    tasks = _plan_pdf_tasks(sources, pages_per_task)
+    pending = deque()
+
+    def fill():
+        while len(pending) < prefetch:
+            task = next(tasks, None)
+            if task is None:
+                return
+            position, file_path, start, end = task
+            pending.append((position, executor.submit(extract_pdf_page_range, file_path, start, end)))
+
+    def pdf_pages(position: int) -> Iterator[Tuple[int, str]]:
+        while True:
+            fill()
+            if not pending or pending[0][0] != position:
+                return
+            _, future = pending.popleft()
+            yield from future.result()
+
+    try:
+        for position, (file_path, file_type) in enumerate(sources):
+            fill()
+            if file_type == 'pdf':
+                yield pdf_pages(position)
+            else:
+                yield iter_text_pages(file_path)
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -0,0 +1,229 @@
+from typing import Iterable, List, Optional, Sequence, Tuple
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import unicodedata
+import uuid
+
+import numpy as np
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+LEXICAL_INDEX_VERSION = 1
+
+# 한글 음절 묶음과 그 밖의 단어 문자 묶음 (밑줄 제외)
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[^\W_가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25용 토크나이저.
+    한글은 조사/어미가 붙어도 맞도록 음절 바이그램으로 나누고(한 글자 단어는 그대로),
+    영문/숫자 등은 단어 단위로 자릅니다. NFKC 정규화 후 소문자로 비교합니다.
+    """
+    tokens = []
+    for word in _TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        if "가" <= word[0] <= "힣" and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def lexical_index_dir(collection_name: str) -> str:
+    return os.path.join(settings.lexical_index_path, collection_name)
+
+
+def build_lexical_index(path: str, documents: Iterable[Tuple[str, str, Optional[dict]]]):
+    """
+    (청크 ID, 본문, 메타데이터) 목록으로 BM25 역색인을 만들어 path 디렉터리에 저장합니다.
+    용어별 포스팅(문서 번호, 출현 횟수)은 CSR 형태의 .npy 배열로 저장해 불러올 때 mmap합니다.
+    새 색인은 임시 디렉터리에 쓴 뒤 이름을 바꿔 교체하므로, 읽는 쪽은 이전 색인이나 새 색인만 봅니다.
+    """
+    chunk_ids: List[str] = []
+    datasets: List[str] = []
+    dataset_numbers = {}
+    doc_dataset, doc_page, doc_last_page, doc_lengths = [], [], [], []
+    postings = {}  # 용어 -> ([문서 번호], [출현 횟수])
+
+    for chunk_id, text, metadata in documents:
+        metadata = metadata or {}
+        number = len(chunk_ids)
+        chunk_ids.append(chunk_id)
+        dataset_id = metadata.get("dataset_id")
+        if dataset_id not in dataset_numbers:
+            dataset_numbers[dataset_id] = len(datasets)
+            datasets.append(dataset_id)
+        doc_dataset.append(dataset_numbers[dataset_id])
+        doc_page.append(metadata.get("page", -1))
+        doc_last_page.append(metadata.get("last_page", metadata.get("page", -1)))
+
+        counts = {}
+        tokens = tokenize(text or "")
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        doc_lengths.append(len(tokens))
+        for token, count in counts.items():
+            docs, tfs = postings.setdefault(token, ([], []))
+            docs.append(number)
+            tfs.append(count)
+
+    terms = sorted(postings)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    for i, term in enumerate(terms):
+        offsets[i + 1] = offsets[i] + len(postings[term][0])
+    posting_docs = np.fromiter(
+        (doc for term in terms for doc in postings[term][0]), dtype=np.int32, count=int(offsets[-1])
+    )
+    posting_tfs = np.fromiter(
+        (min(tf, 65535) for term in terms for tf in postings[term][1]), dtype=np.uint16, count=int(offsets[-1])
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+    os.makedirs(tmp_path)
+    arrays = {
+        "offsets": offsets,
+        "posting_docs": posting_docs,
+        "posting_tfs": posting_tfs,
+        "doc_lengths": np.asarray(doc_lengths, dtype=np.int32),
+        "doc_dataset": np.asarray(doc_dataset, dtype=np.int32),
+        "doc_page": np.asarray(doc_page, dtype=np.int32),
+        "doc_last_page": np.asarray(doc_last_page, dtype=np.int32),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": LEXICAL_INDEX_VERSION,
+            "average_length": sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0,
+            "chunk_ids": chunk_ids,
+            "datasets": datasets,
+            "terms": terms,
+        }, f, ensure_ascii=False)
+
+    old_path = f"{path}.old-{uuid.uuid4().hex}"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    # 이미 mmap된 이전 파일은 연결이 끊겨도 읽던 쪽에서 계속 사용할 수 있음
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+class LexicalIndex:
+    """
+    mmap으로 불러온 BM25 역색인. 용어 사전과 청크 ID만 메모리에 올리고 포스팅은 필요한 부분만 읽습니다.
+    """
+
+    def __init__(self, path: str, k1: float, b: float):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != LEXICAL_INDEX_VERSION:
+            raise ValueError(f"지원하지 않는 색인 버전입니다: {meta.get('version')}")
+        self.chunk_ids: List[str] = meta["chunk_ids"]
+        self.datasets: List[Optional[str]] = meta["datasets"]
+        self.terms = {term: i for i, term in enumerate(meta["terms"])}
+
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self.offsets = load("offsets")
+        self.posting_docs = load("posting_docs")
+        self.posting_tfs = load("posting_tfs")
+        self.doc_dataset = load("doc_dataset")
+        self.doc_page = load("doc_page")
+        self.doc_last_page = load("doc_last_page")
+
+        self.k1 = k1
+        # 문서 길이 정규화 항 k1 * (1 - b + b * |d| / avgdl)은 질의와 무관하므로 미리 계산
+        average_length = meta["average_length"] or 1.0
+        self.length_norms = (k1 * (1 - b + b * load("doc_lengths") / average_length)).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def _mask(self, dataset_ids: Optional[Sequence[str]], page_from: Optional[int], page_to: Optional[int]) -> Optional[np.ndarray]:
+        # 벡터 검색의 where 필터와 같은 조건 (지정한 것끼리는 AND)
+        mask = None
+        if dataset_ids:
+            wanted = set(dataset_ids)
+            numbers = [i for i, dataset_id in enumerate(self.datasets) if dataset_id in wanted]
+            mask = np.isin(self.doc_dataset, numbers)
+        if page_from is not None:
+            mask = (self.doc_last_page >= page_from) if mask is None else mask & (self.doc_last_page >= page_from)
+        if page_to is not None:
+            condition = (self.doc_page >= 0) & (self.doc_page <= page_to)
+            mask = condition if mask is None else mask & condition
+        return mask
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        dataset_ids: Optional[Sequence[str]] = None,
+        page_from: Optional[int] = None,
+        page_to: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        BM25 점수가 높은 순서로 최대 top_k개의 (청크 ID, 점수)를 반환합니다.
+        질의 용어가 하나도 나오지 않는 청크는 반환하지 않습니다.
+        """
+        document_count = len(self.chunk_ids)
+        term_ids = {self.terms[token] for token in tokenize(query) if token in self.terms}
+        if not term_ids or not document_count:
+            return []
+
+        scores = np.zeros(document_count, dtype=np.float32)
+        for term_id in term_ids:
+            start, end = int(self.offsets[term_id]), int(self.offsets[term_id + 1])
+            docs = self.posting_docs[start:end]
+            tfs = self.posting_tfs[start:end].astype(np.float32)
+            df = end - start
+            idf = math.log(1 + (document_count - df + 0.5) / (df + 0.5))
+            # 한 용어의 포스팅에는 같은 문서가 한 번만 나오므로 팬시 인덱싱으로 누적해도 됨
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + self.length_norms[docs])
+
+        mask = self._mask(dataset_ids, page_from, page_to)
+        if mask is not None:
+            scores[~mask] = 0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.chunk_ids[i], float(scores[i])) for i in candidates]
+
+
+_indexes = LRUCache(maxsize=settings.lexical_index_cache_size)  # 컬렉션 이름 -> (파일 식별자, LexicalIndex)
+_indexes_lock = threading.Lock()
+
+
+def get_lexical_index(collection_name: str) -> Optional[LexicalIndex]:
+    """
+    컬렉션의 BM25 색인을 반환합니다. 아직 만들지 않았으면 None입니다.
+    불러온 색인은 재사용하고, 빌드로 색인 디렉터리가 교체되면 다시 불러옵니다.
+    """
+    path = lexical_index_dir(collection_name)
+    try:
+        stat = os.stat(os.path.join(path, "meta.json"))
+    except FileNotFoundError:
+        return None
+    stamp = (stat.st_ino, stat.st_mtime_ns)
+
+    cached = _indexes.get(collection_name)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _indexes_lock:
+        cached = _indexes.get(collection_name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            index = LexicalIndex(path, settings.bm25_k1, settings.bm25_b)
+        except FileNotFoundError:
+            # 빌드가 색인을 교체하는 중
+            return None
+        _indexes.set(collection_name, (stamp, index))
+        return index
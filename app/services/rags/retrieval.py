@@ -0,0 +1,122 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import asyncio
+
+from app.core.concurrency import chroma_pool, run_in_pool
+from app.core.config import settings
+from app.db.chroma.client import ChromaDBClient
+from app.db.vector_store import get_vector_store
+
+
+class LexicalIndexMissingError(Exception):
+    """
+    BM25 색인이 아직 없는 RAG를 lexical/hybrid 모드로 검색할 때 발생합니다. (다시 빌드하면 만들어짐)
+    """
+
+
+class SearchFilter(NamedTuple):
+    # 검색 단계에서 거르는 조건 (지정한 것끼리는 AND)
+    dataset_ids: Optional[List[str]] = None
+    page_from: Optional[int] = None  # 이 페이지 이후에 끝나는 청크
+    page_to: Optional[int] = None  # 이 페이지 이전에 시작하는 청크
+
+    def where(self) -> Optional[dict]:
+        # 같은 조건의 Chroma where 절
+        conditions = []
+        if self.dataset_ids:
+            conditions.append({"dataset_id": {"$in": self.dataset_ids}})
+        if self.page_from is not None:
+            conditions.append({"last_page": {"$gte": self.page_from}})
+        if self.page_to is not None:
+            conditions.append({"page": {"$lte": self.page_to}})
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int) -> List[Tuple[str, float]]:
+    """
+    여러 검색 결과 순위를 RRF 점수(각 순위에서 1 / (k + 순위)의 합)로 합쳐 점수 높은 순서로 반환합니다.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, id in enumerate(ranking, start=1):
+            scores[id] = scores.get(id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def _lexical_search(collection_name: str, queries: List[str], top_k: int, search_filter: SearchFilter) -> List[List[Tuple[str, float]]]:
+    # numpy는 BM25 검색을 처음 할 때 불러옴
+    from app.services.rags.lexical_index import get_lexical_index
+
+    index = get_lexical_index(collection_name)
+    if index is None:
+        raise LexicalIndexMissingError(collection_name)
+    return [index.search(query, top_k, *search_filter) for query in queries]
+
+
+async def search_documents(
+    chroma_client: ChromaDBClient,
+    rag_id: str,
+    queries: List[str],
+    top_k: int,
+    mode: str = "vector",
+    search_filter: SearchFilter = SearchFilter(),
+    vector_backend: str = "chroma",
+) -> dict:
+    """
+    질의마다 top_k개의 청크를 검색해 Chroma query 결과와 같은 형태(질의마다 하나의 목록)로 반환합니다.
+
+    - vector: 질의 임베딩으로 벡터 저장소 검색 (distances 포함)
+    - lexical: BM25 색인만 사용하므로 임베딩 요청이 없음 (scores는 BM25 점수)
+    - hybrid: 벡터/BM25 검색 후보를 reciprocal rank fusion으로 합침 (scores는 RRF 점수)
+
+    임베딩 요청은 chroma_client로, 벡터 검색과 본문 조회는 vector_backend의 저장소로 합니다.
+    """
+    collection_name = chroma_client.get_chroma_collection_name(rag_id=rag_id)
+    store = get_vector_store(vector_backend)
+
+    if mode == "vector":
+        return await store.search_by_embedding_async(
+            collection_name,
+            await chroma_client.get_embeddings_async(queries),
+            n_results=top_k,
+            where=search_filter.where()
+        )
+
+    candidates = top_k if mode == "lexical" else max(top_k, settings.hybrid_candidates)
+    lexical = run_in_pool(chroma_pool, _lexical_search, collection_name, queries, candidates, search_filter)
+    documents: Dict[str, tuple] = {}  # 청크 ID -> (본문, 메타데이터)
+
+    if mode == "lexical":
+        ranked = await lexical
+    else:
+        async def vector():
+            return await store.search_by_embedding_async(
+                collection_name,
+                await chroma_client.get_embeddings_async(queries),
+                n_results=candidates,
+                where=search_filter.where()
+            )
+
+        lexical_hits, vector_results = await asyncio.gather(lexical, vector())
+        ranked = []
+        for hits, ids, docs, metadatas in zip(
+            lexical_hits, vector_results["ids"], vector_results["documents"], vector_results["metadatas"]
+        ):
+            documents.update(zip(ids, zip(docs, metadatas)))
+            ranked.append(reciprocal_rank_fusion([ids, [id for id, _ in hits]], settings.rrf_k)[:top_k])
+
+    # 벡터 검색 결과에 없던 청크의 본문/메타데이터만 한 번에 조회
+    missing = list({id for hits in ranked for id, _ in hits if id not in documents})
+    if missing:
+        documents.update(await run_in_pool(chroma_pool, store.get_documents, collection_name, missing))
+
+    results = {"ids": [], "documents": [], "metadatas": [], "scores": [], "included": ["documents", "metadatas"]}
+    for hits in ranked:
+        # 색인 이후 지워진 청크는 건너뜀
+        hits = [(id, score) for id, score in hits if id in documents]
+        results["ids"].append([id for id, _ in hits])
+        results["documents"].append([documents[id][0] for id, _ in hits])
+        results["metadatas"].append([documents[id][1] for id, _ in hits])
+        results["scores"].append([score for _, score in hits])
+    return results
@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+# 앱이 파일을 쓰는 경로 설정 (벤치마크는 모두 임시 디렉터리 안으로 돌려 저장소에 파일을 남기지 않음)
+PATH_SETTINGS = (
+    "DATABASE_PATH", "DATABASE_URL", "CHROMA_DB_PATH", "NUMPY_STORE_PATH",
+    "LEXICAL_INDEX_PATH", "DATASETS_PATH", "EMBEDDING_CACHE_PATH",
+)
+
+
+def workdir_paths(workdir: str) -> dict:
+    # PATH_SETTINGS의 각 경로를 workdir 안으로
+    return {
+        "DATABASE_PATH": f"{workdir}/database.db",
+        "DATABASE_URL": f"sqlite:///{workdir}/database.db",
+        "CHROMA_DB_PATH": f"{workdir}/chroma",
+        "NUMPY_STORE_PATH": f"{workdir}/numpy_store",
+        "LEXICAL_INDEX_PATH": f"{workdir}/lexical_index",
+        "DATASETS_PATH": f"{workdir}/datasets",
+        "EMBEDDING_CACHE_PATH": f"{workdir}/embedding_cache.sqlite3",
+    }
+
+
+# 벤치마크는 .env 없이도 실행되도록 기본값을 채움
+if not all(name in os.environ for name in PATH_SETTINGS):
+    for name, value in workdir_paths(tempfile.mkdtemp(prefix="butadon-bench-")).items():
+        os.environ.setdefault(name, value)
+os.environ.setdefault("APP_NAME", "benchmark")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("OPENAI_EMBEDDINGS_MODEL", "text-embedding-3-small")
@@ -0,0 +1,104 @@
+"""
+청크 분할 처리량 벤치마크.
+
+한국어/영어가 섞인 큰 텍스트를 페이지 단위로 흘려 넣어 문자 단위와 토큰 단위 청커의
+처리량(MB/초)을 재고, 청크마다 따로 토큰화하는 방식과 비교합니다.
+문자 단위 청크의 토큰 수가 언어에 따라 얼마나 달라지는지도 함께 출력합니다.
+토큰 단위 측정에는 tiktoken 인코딩이 필요합니다(없으면 건너뜀).
+
+    python -m benchmarks.chunking_throughput --size-mb 20
+"""
+import argparse
+import statistics
+import time
+
+from app.services.rags.chunking import iter_char_chunks, iter_token_chunks
+from app.services.rags.embeddings import get_encoding
+
+KOREAN = "부원이 모두 모여 Git/Github에 대한 수업을 들었습니다. 다음 주에는 백엔드 배포를 실습합니다. "
+ENGLISH = "The quick brown fox jumps over the lazy dog while the build server embeds every chunk. "
+
+
+def make_pages(size_mb: float, page_chars: int = 3000) -> list:
+    # 한국어 페이지와 영어 페이지를 번갈아 배치
+    pages = []
+    total = 0
+    number = 1
+    while total < size_mb * 1024 * 1024:
+        base = KOREAN if number % 2 else ENGLISH
+        text = (base * (page_chars // len(base) + 1))[:page_chars]
+        pages.append((number, text))
+        total += len(text.encode("utf-8"))
+        number += 1
+    return pages
+
+
+def run(label: str, fn, pages: list, size_bytes: int):
+    start = time.perf_counter()
+    count = fn(pages)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44} {elapsed:8.2f}s {size_bytes / elapsed / 1024 / 1024:8.1f} MB/s {count:>9} chunks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=20.0)
+    parser.add_argument("--char-size", type=int, default=1000)
+    parser.add_argument("--char-overlap", type=int, default=200)
+    parser.add_argument("--token-size", type=int, default=256)
+    parser.add_argument("--token-overlap", type=int, default=32)
+    args = parser.parse_args()
+
+    pages = make_pages(args.size_mb)
+    size_bytes = sum(len(text.encode("utf-8")) for _, text in pages)
+    print(f"pages={len(pages)} size={size_bytes / 1024 / 1024:.1f}MB")
+
+    def legacy_chunk_text(pages):
+        # 예전 build_db 방식: 문서 전체를 이어붙인 뒤 문자 단위로 자름
+        text = "".join(text for _, text in pages)
+        chunks = []
+        start = 0
+        while start < len(text):
+            chunks.append(text[start:start + args.char_size])
+            start += args.char_size - args.char_overlap
+        return len(chunks)
+
+    run("char (legacy, whole document)", legacy_chunk_text, pages, size_bytes)
+    run(
+        "char (streaming pages)",
+        lambda pages: sum(1 for _ in iter_char_chunks(pages, args.char_size, args.char_overlap)),
+        pages, size_bytes,
+    )
+
+    encoding = get_encoding()
+    if not encoding:
+        print("tiktoken 인코딩을 불러올 수 없어 토큰 단위 측정을 건너뜁니다.")
+        return
+
+    def per_chunk_tokenize(pages):
+        # 비교용: 문자 청크를 만든 뒤 청크마다 다시 토큰화해 토큰 수를 구함
+        count = 0
+        for chunk in iter_char_chunks(pages, args.char_size, args.char_overlap):
+            len(encoding.encode_ordinary(chunk.text))
+            count += 1
+        return count
+
+    run("char + per-chunk tokenize", per_chunk_tokenize, pages, size_bytes)
+    run(
+        "token (tokenize once per page)",
+        lambda pages: sum(1 for _ in iter_token_chunks(pages, args.token_size, args.token_overlap, encoding)),
+        pages, size_bytes,
+    )
+
+    # 같은 문자 수 청크라도 언어에 따라 토큰 수가 크게 다름
+    for label, base in (("korean", KOREAN), ("english", ENGLISH)):
+        sample = [(1, base * (20 * args.char_size // len(base)))]
+        tokens = [
+            len(encoding.encode_ordinary(chunk.text))
+            for chunk in iter_char_chunks(sample, args.char_size, args.char_overlap)
+        ]
+        print(f"{label:<8} {args.char_size}-char chunk tokens: median={statistics.median(tokens):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Chroma 컬렉션 핸들 캐시 마이크로벤치마크.
+
+임시 Chroma DB에 컬렉션 하나를 만들고, 검색할 때마다 get_collection으로 핸들을
+조회하던 예전 방식과 캐시된 핸들로 바로 query하는 현재 search_by_embedding의
+호출당 지연을 비교합니다. 핸들 조회만 따로 잰 시간도 함께 출력합니다.
+
+    python -m benchmarks.collection_handles --documents 2000 --queries 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def measure(label: str, fn, queries: int):
+    samples = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    print(f"{label:<40} p50={statistics.median(samples):8.1f}us p99={samples[int(len(samples) * 0.99)]:8.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["CHROMA_DB_PATH"] = tempfile.mkdtemp(prefix="butadon-chroma-")
+    from app.db.chroma.client import ChromaDBClient
+
+    client = ChromaDBClient()
+    name = client.get_chroma_collection_name("benchmark")
+    rng = random.Random(0)
+    vectors = [[rng.random() for _ in range(args.dimensions)] for _ in range(args.documents)]
+    client.upsert_documents(
+        name, [f"document {i}" for i in range(args.documents)], vectors, [str(i) for i in range(args.documents)]
+    )
+    query = vectors[0]
+    print(f"documents={args.documents} dimensions={args.dimensions}")
+
+    measure("get_collection (handle lookup)", lambda: client.client.get_collection(name), args.queries)
+    measure("cached handle lookup", lambda: client.create_or_get_collection(name), args.queries)
+    measure(
+        "search: get_collection + query (legacy)",
+        lambda: client.client.get_collection(name).query(query_embeddings=query, n_results=5),
+        args.queries,
+    )
+    measure("search: cached handle + query", lambda: client.search_by_embedding(name, query, 5), args.queries)
+
+
+if __name__ == "__main__":
+    main()
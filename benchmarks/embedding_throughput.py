@@ -0,0 +1,68 @@
+"""
+임베딩 파이프라인 처리량 벤치마크.
+
+로컬 가짜 임베딩 서버를 띄우고, 청크별 단건 요청과
+배치/동시 요청 방식의 처리량(청크/초)을 비교합니다.
+
+    python -m benchmarks.embedding_throughput --chunks 2000
+"""
+import argparse
+import time
+
+from openai import OpenAI
+
+from app.core.config import settings
+from app.services.rags.embeddings import embed_texts
+from benchmarks.fake_openai import start_server
+
+
+def make_chunks(count: int, size: int = 1000) -> list:
+    base = "부원이 모두 모여 Git/Github에 대한 수업을 들었습니다. The quick brown fox jumps over the lazy dog. "
+    text = base * (size // len(base) + 1)
+    return [f"{i} {text[:size]}" for i in range(count)]
+
+
+def run(label: str, fn, chunks: list):
+    start = time.perf_counter()
+    embeddings = fn(chunks)
+    elapsed = time.perf_counter() - start
+    assert len(embeddings) == len(chunks)
+    print(f"{label:<36} {elapsed:8.2f}s {len(chunks) / elapsed:10.1f} chunks/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2, help="요청당 지연(초)")
+    parser.add_argument("--sequential-sample", type=int, default=50,
+                        help="단건 요청 방식은 이 개수만 측정")
+    args = parser.parse_args()
+
+    server, base_url = start_server(latency=args.latency)
+    client = OpenAI(api_key="benchmark", base_url=base_url)
+    model = settings.openai_embeddings_model
+
+    def embed_one_by_one(texts):
+        return [client.embeddings.create(input=text, model=model).data[0].embedding for text in texts]
+
+    def embed_batch(texts):
+        response = client.embeddings.create(input=texts, model=model)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    chunks = make_chunks(args.chunks)
+    print(f"chunks={len(chunks)} latency={args.latency}s")
+
+    run("sequential (1 chunk/request)", embed_one_by_one, chunks[:args.sequential_sample])
+    for batch_size in (16, 64, 256):
+        for concurrency in (1, 4, 8):
+            run(
+                f"batch={batch_size} concurrency={concurrency}",
+                lambda texts: embed_texts(texts, embed_batch, batch_size=batch_size, concurrency=concurrency),
+                chunks,
+            )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+벤치마크용 로컬 가짜 OpenAI 서버.
+
+/v1/embeddings 요청에 결정적인 임베딩을, /v1/chat/completions 요청에
+고정된 답변을 돌려주며, 요청당 지연(latency)과 입력당 지연을 흉내냅니다.
+stream=true인 채팅 요청은 답변을 STREAM_TOKENS개 조각으로 나눠 chat_latency 동안
+고르게 SSE로 보내고, 클라이언트가 중간에 끊으면 생성을 멈춥니다.
+
+    python -m benchmarks.fake_openai --port 8765 --latency 0.2
+"""
+import argparse
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DIMENSIONS = 256
+STREAM_TOKENS = 40
+
+
+def fake_embedding(text: str, dimensions: int = DIMENSIONS) -> list:
+    # 텍스트 해시로 만든 결정적 벡터
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    values = []
+    counter = 0
+    while len(values) < dimensions:
+        block = hashlib.sha256(seed + counter.to_bytes(4, "little")).digest()
+        values.extend((b - 127.5) / 127.5 for b in block)
+        counter += 1
+    return values[:dimensions]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    latency = 0.2  # 요청당 지연(초)
+    per_input_latency = 0.0005  # 입력당 추가 지연(초)
+    chat_latency = 2.0  # 채팅 응답 지연(초)
+    streams_completed = 0
+    streams_cancelled = 0  # 클라이언트가 끊어 중단된 스트림 수
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path.endswith("/embeddings"):
+            inputs = request["input"]
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            time.sleep(self.latency + self.per_input_latency * len(inputs))
+
+            data = []
+            for index, text in enumerate(inputs):
+                vector = fake_embedding(text)
+                if request.get("encoding_format") == "base64":
+                    vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+                data.append({"object": "embedding", "index": index, "embedding": vector})
+
+            tokens = sum(len(text) for text in inputs)
+            self._send_json({
+                "object": "list",
+                "data": data,
+                "model": request.get("model", "fake"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            })
+        elif self.path.endswith("/chat/completions") and request.get("stream"):
+            self._stream_chat(request)
+        elif self.path.endswith("/chat/completions"):
+            time.sleep(self.chat_latency)
+            question = request["messages"][-1]["content"] if request.get("messages") else ""
+            self._send_json({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": f"가짜 답변: {question[:100]}"},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+        else:
+            self.send_error(404)
+
+
+    def _stream_chat(self, request: dict):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        def chunk(delta: dict, finish_reason=None) -> bytes:
+            payload = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+        try:
+            for index in range(STREAM_TOKENS):
+                time.sleep(self.chat_latency / STREAM_TOKENS)
+                delta = {"content": f"토큰{index} "}
+                if index == 0:
+                    delta["role"] = "assistant"
+                self.wfile.write(chunk(delta))
+            self.wfile.write(chunk({}, "stop"))
+            self.wfile.write(b"data: [DONE]\n\n")
+            type(self).streams_completed += 1
+        except (BrokenPipeError, ConnectionResetError):
+            type(self).streams_cancelled += 1
+
+
+def start_server(port: int = 0, latency: float = 0.2, per_input_latency: float = 0.0005, chat_latency: float = 2.0):
+    """
+    백그라운드 스레드에서 가짜 서버를 시작하고 (서버, base_url)을 반환합니다.
+    스트림 완료/중단 횟수는 server.RequestHandlerClass에서 확인할 수 있습니다.
+    """
+    handler = type("Handler", (FakeOpenAIHandler,), {
+        "latency": latency,
+        "per_input_latency": per_input_latency,
+        "chat_latency": chat_latency,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--per-input-latency", type=float, default=0.0005)
+    parser.add_argument("--chat-latency", type=float, default=2.0)
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.latency, args.per_input_latency, args.chat_latency)
+    print(f"가짜 OpenAI 서버 실행 중: {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,166 @@
+"""
+목록 엔드포인트 쿼리 수/지연 벤치마크.
+
+임시 SQLite DB에 사용자와 데이터셋/RAG를 채운 뒤, 행마다 사용자를 따로 조회하던
+예전 방식(N+1)과 users 테이블과 조인하는 현재 목록 조회의 실행 쿼리 수와
+지연을 비교합니다. 이어서 한 페이지(--page-size) 조회를 첫 페이지와 깊은 페이지에서
+OFFSET 방식과 키셋(커서) 방식으로 비교합니다.
+
+    python -m benchmarks.list_queries --rows 10000 --users 100
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.sqlite.base import Base
+from app.api.users.users_model import User
+from app.api.datasets.datasets_model import Dataset
+from app.api.datasets.datasets_dto import DatasetResponseDTO
+from app.api.rags.rags_model import RagModel
+import app.api.rags.rags_dto as rags_dto
+from app.api.users import users_crud
+from app.api.datasets import datasets_crud
+from app.api.rags import rags_crud
+from app.core.pagination import PageParams
+
+
+def seed(url: str, rows: int, users: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    start = datetime.datetime.now()
+    user_ids = [f"user{i:06d}" for i in range(users)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"cuid": user_id, "username": user_id, "email": f"{user_id}@example.com", "hashed_password": "x"}
+            for user_id in user_ids
+        ])
+        conn.execute(Dataset.__table__.insert(), [
+            {"id": str(uuid.uuid4()), "name": f"dataset {i}", "made_by_user": user_ids[i % users],
+             "description": "benchmark", "file_type": "txt", "created_at": (start + datetime.timedelta(seconds=i)).isoformat()}
+            for i in range(rows)
+        ])
+        conn.execute(RagModel.__table__.insert(), [
+            {"id": str(uuid.uuid4()), "name": f"rag {i}", "made_by_user": user_ids[i % users],
+             "created_at": (start + datetime.timedelta(seconds=i)).isoformat(), "dataset_ids": json.dumps([]), "llm_model": "gpt-4o-mini",
+             "chunk_size": 1000, "chunk_overlap": 200, "chunk_unit": "char"}
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+async def list_datasets_n_plus_one(db):
+    # 예전 구현: 데이터셋마다 사용자 조회
+    datasets = (await db.execute(select(Dataset))).scalars().all()
+    result = []
+    for dataset in datasets:
+        user = await users_crud.get_user_by_id(dataset.made_by_user, db)
+        result.append(DatasetResponseDTO.from_model(dataset, user.username if user else None))
+    return result
+
+
+async def list_rags_n_plus_one(db):
+    rags = (await db.execute(select(RagModel))).scalars().all()
+    result = []
+    for rag in rags:
+        user = await users_crud.get_user_by_id(rag.made_by_user, db)
+        result.append(rags_dto.RagResponseDTO.from_model(rag, user.username if user else None))
+    return result
+
+
+async def list_offset(db, model, offset: int, limit: int):
+    # 비교용: OFFSET 페이지네이션
+    result = await db.execute(
+        select(model, User.username).outerjoin(User, User.cuid == model.made_by_user)
+        .order_by(model.created_at.desc(), model.id.desc()).offset(offset).limit(limit)
+    )
+    return result.all()
+
+
+async def best_of(session_factory, fn, repeat: int = 5):
+    # 새 세션에서 repeat번 조회해 가장 빠른 시간을 반환
+    best = None
+    for _ in range(repeat):
+        async with session_factory() as db:
+            start = time.perf_counter()
+            rows = await fn(db)
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return rows, best
+
+
+async def run(url: str, rows: int, page_size: int):
+    engine = create_async_engine(url)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    queries = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_query(*args):
+        nonlocal queries
+        queries += 1
+
+    everything = PageParams(rows, None, "desc")
+    cases = [
+        ("datasets N+1", list_datasets_n_plus_one),
+        ("datasets joined", lambda db: datasets_crud.get_dataset_list(db, everything)),
+        ("rags N+1", list_rags_n_plus_one),
+        ("rags joined", lambda db: rags_crud.get_rags_list(db, everything)),
+    ]
+    for label, list_fn in cases:
+        async with session_factory() as db:
+            queries = 0
+            start = time.perf_counter()
+            result = await list_fn(db)
+            elapsed = time.perf_counter() - start
+        assert len(result) == rows
+        print(f"{label:<36} queries={queries:<7} {elapsed * 1000:9.1f}ms")
+
+    print(f"page_size={page_size}")
+    for label, model, list_fn in (
+        ("datasets", Dataset, datasets_crud.get_dataset_list),
+        ("rags", RagModel, rags_crud.get_rags_list),
+    ):
+        for offset in (0, rows - page_size):
+            after = None
+            if offset:
+                # 커서를 따라가 offset 위치에 도달했을 때의 커서
+                async with session_factory() as db:
+                    last = (await list_fn(db, PageParams(offset, None, "desc")))[offset - 1][0]
+                    after = (last.created_at, last.id)
+            offset_rows, offset_elapsed = await best_of(
+                session_factory, lambda db: list_offset(db, model, offset, page_size)
+            )
+            keyset_rows, keyset_elapsed = await best_of(
+                session_factory, lambda db: list_fn(db, PageParams(page_size, after, "desc"))
+            )
+            assert [row[0].id for row in offset_rows] == [row[0].id for row in keyset_rows[:page_size]]
+            print(
+                f"{label:<9} offset={offset:<7} OFFSET {offset_elapsed * 1000:7.2f}ms"
+                f"  keyset {keyset_elapsed * 1000:7.2f}ms"
+            )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="butadon-list-"), "database.db")
+    seed(f"sqlite:///{path}", args.rows, args.users)
+    print(f"rows={args.rows} users={args.users}")
+    asyncio.run(run(f"sqlite+aiosqlite:///{path}", args.rows, args.page_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+이벤트 루프 블로킹 부하 테스트.
+
+앱을 uvicorn으로 띄우고(가짜 OpenAI 서버 사용) /rags/{id}/question을
+포화시킨 상태에서 /users/verify 같은 가벼운 엔드포인트의 p50/p99 지연을
+부하가 없을 때와 비교합니다. 앱, 가짜 서버, 측정기가 각각 별도 프로세스로
+실행되므로 코어가 적은 머신에서는 CPU 경합이 꼬리 지연에 섞입니다.
+
+    python -m benchmarks.load_latency --duration 10 --question-concurrency 64
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.servers import app_with_fake_openai, create_built_rag
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[index]
+
+
+def report(label: str, latencies: list):
+    if not latencies:
+        print(f"{label:<32} (no samples)")
+        return
+    ms = [value * 1000 for value in latencies]
+    print(
+        f"{label:<32} n={len(ms):<6} p50={statistics.median(ms):8.1f}ms "
+        f"p99={percentile(ms, 0.99):8.1f}ms max={max(ms):8.1f}ms"
+    )
+
+
+async def probe(client, path: str, headers: dict, stop_at: float, latencies: list):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def hammer(client, path: str, stop_at: float, latencies: list):
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(base_url: str, args):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        rag_id, headers = await create_built_rag(client, "loadtest")
+
+        # 1) 부하 없음
+        idle = []
+        stop_at = time.perf_counter() + args.duration
+        await asyncio.gather(*(
+            probe(client, "/users/verify", headers, stop_at, idle) for _ in range(args.probe_concurrency)
+        ))
+
+        # 2) 질문 엔드포인트 포화 (클라이언트 연결 풀 대기가 섞이지 않도록 부하용 클라이언트 분리)
+        loaded, questions = [], []
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=args.question_concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as load_client:
+            stop_at = time.perf_counter() + args.duration
+            await asyncio.gather(
+                *(hammer(load_client, f"/rags/{rag_id}/question/테스트 질문", stop_at, questions)
+                  for _ in range(args.question_concurrency)),
+                *(probe(client, "/users/verify", headers, stop_at, loaded)
+                  for _ in range(args.probe_concurrency)),
+            )
+
+    report("/users/verify (idle)", idle)
+    report("/users/verify (question saturated)", loaded)
+    report("/rags/{id}/question", questions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--probe-concurrency", type=int, default=4)
+    parser.add_argument("--question-concurrency", type=int, default=64)
+    parser.add_argument("--chat-latency", type=float, default=2.0)
+    args = parser.parse_args()
+
+    # 같은 질문을 반복하므로 답변 캐시를 꺼서 매번 채팅 요청까지 거치게 함
+    with app_with_fake_openai(chat_latency=args.chat_latency, answer_cache_enabled="false") as base_url:
+        asyncio.run(run(base_url, args))
+
+
+if __name__ == "__main__":
+    main()
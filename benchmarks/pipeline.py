@@ -0,0 +1,141 @@
+"""
+전체 파이프라인 벤치마크 (네트워크 없이).
+
+로컬 제공자(LLM_PROVIDER=local)를 쓰는 앱을 띄우고 데이터셋 업로드 -> RAG 빌드 -> 문서 검색
+(vector/lexical/hybrid) -> 질문 응답(일반/스트리밍)을 차례로 잽니다. 제공자의 지연은
+--embedding-latency(요청당)와 --chat-latency(답변당)로 흉내내므로 외부 API 없이도
+앱 자체의 처리 시간과 모델 지연이 섞인 시간을 함께 볼 수 있습니다.
+
+    python -m benchmarks.pipeline --documents 4 --paragraphs 2000 --queries 100
+    python -m benchmarks.pipeline --vector-backend numpy --embedding-latency 0.2 --chat-latency 2
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.servers import app_with_local_provider
+
+# 데이터셋 문단을 만드는 단어 (검색이 의미 있도록 문단마다 주제 단어가 다름)
+_TOPICS = [
+    "환불", "배송", "회원가입", "결제", "쿠폰", "교환", "포인트", "적립", "반품", "영수증",
+    "git", "github", "branch", "merge", "commit", "rebase", "docker", "python", "fastapi", "sqlite",
+]
+_FILLER = ["부원이", "모두", "모여", "수업을", "들었습니다", "규정은", "다음과", "같습니다", "자세한", "내용은", "문의", "바랍니다"]
+
+
+def make_text(rng: random.Random, paragraphs: int) -> str:
+    lines = []
+    for _ in range(paragraphs):
+        topics = rng.sample(_TOPICS, 2)
+        words = topics * 3 + [rng.choice(_FILLER) for _ in range(20)]
+        rng.shuffle(words)
+        lines.append(" ".join(words) + ".")
+    return "\n".join(lines)
+
+
+def report(label: str, values: list):
+    ms = sorted(value * 1000 for value in values)
+    print(
+        f"{label:<26} p50={statistics.median(ms):8.1f}ms p99={ms[int(len(ms) * 0.99)]:8.1f}ms"
+        f" max={ms[-1]:8.1f}ms"
+    )
+
+
+async def build(client, args, rng: random.Random) -> tuple:
+    account = {"username": "pipeline", "email": "pipeline@example.com", "password": "pipeline-password"}
+    await client.post("/users/register", json=account)
+    login = await client.post("/users/login", json={"email": account["email"], "password": account["password"]})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    start = time.perf_counter()
+    dataset_ids = []
+    for i in range(args.documents):
+        dataset = await client.post(
+            "/datasets/create",
+            data={"name": f"pipeline-{i}", "description": "pipeline"},
+            files={"file": (f"pipeline-{i}.txt", make_text(rng, args.paragraphs).encode("utf-8"))},
+            headers=headers,
+        )
+        dataset_ids.append(dataset.json()["id"])
+    upload = time.perf_counter() - start
+
+    rag = await client.post("/rags/create", json={
+        "name": "pipeline", "dataset_ids": dataset_ids, "chunk_size": args.chunk_size,
+        "vector_backend": args.vector_backend, "llm_model": "local",
+    }, headers=headers)
+    rag_id = rag.json()["id"]
+
+    start = time.perf_counter()
+    job = (await client.post(f"/rags/{rag_id}/build", headers=headers)).json()
+    while job["status"] in ("queued", "running"):
+        await asyncio.sleep(0.1)
+        job = (await client.get(f"/rags/{rag_id}/build/{job['job_id']}")).json()
+    elapsed = time.perf_counter() - start
+    print(f"upload: {upload:.2f}s ({args.documents} datasets)")
+    print(f"build: {job['status']} {elapsed:.2f}s ({job['chunks_embedded']} chunks, {job['chunks_embedded'] / elapsed:.0f} chunks/s)")
+    return rag_id, headers
+
+
+async def run(base_url: str, args):
+    import httpx
+
+    rng = random.Random(0)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        rag_id, headers = await build(client, args, rng)
+        queries = [" ".join(rng.sample(_TOPICS, 2)) + f" {i}" for i in range(args.queries)]
+
+        for mode in ("vector", "lexical", "hybrid"):
+            samples = []
+            for query in queries:
+                start = time.perf_counter()
+                response = await client.post("/rags/document_search", json={
+                    "rag_id": rag_id, "query": query, "top_k": args.top_k, "mode": mode,
+                }, headers=headers)
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+            report(f"search ({mode})", samples)
+
+        samples = []
+        for query in queries[:args.questions]:
+            start = time.perf_counter()
+            response = await client.get(f"/rags/{rag_id}/question/{query}")
+            samples.append(time.perf_counter() - start)
+            response.raise_for_status()
+        report("question", samples)
+
+        first_token, total = [], []
+        for query in queries[:args.questions]:
+            start = time.perf_counter()
+            first = None
+            async with client.stream("GET", f"/rags/{rag_id}/question/{query}/stream") as response:
+                async for line in response.aiter_lines():
+                    if line.startswith("event: token") and first is None:
+                        first = time.perf_counter() - start
+            first_token.append(first)
+            total.append(time.perf_counter() - start)
+        report("stream first token", first_token)
+        report("stream total", total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=4, help="업로드할 데이터셋 수")
+    parser.add_argument("--paragraphs", type=int, default=2000, help="데이터셋마다 문단 수")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--vector-backend", choices=["chroma", "numpy"], default="chroma")
+    parser.add_argument("--queries", type=int, default=100, help="모드마다 검색 횟수")
+    parser.add_argument("--questions", type=int, default=20, help="질문 응답 횟수")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--embedding-latency", type=float, default=0.0)
+    parser.add_argument("--chat-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    # 같은 질문이 답변 캐시에 맞지 않도록 꺼서 매번 전체 파이프라인을 거치게 함
+    with app_with_local_provider(args.embedding_latency, args.chat_latency, answer_cache_enabled="false") as base_url:
+        asyncio.run(run(base_url, args))
+
+
+if __name__ == "__main__":
+    main()
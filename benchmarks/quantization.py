@@ -0,0 +1,116 @@
+"""
+NumPy 벡터 저장소 양자화 벤치마크.
+
+실제 컬렉션(--chroma-collection 또는 --numpy-collection, 이름은 rag_<id>)의 임베딩이나
+합성 벡터를 float32/float16/int8 형식으로 저장하고, 형식마다 검색용 행렬 크기(상주 메모리),
+디스크 사용량, 정확한 float32 검색 대비 recall@k와 질의 지연을 출력합니다.
+양자화 형식은 float32 사본으로 다시 채점할 때(--rescore)와 하지 않을 때를 모두 잽니다.
+
+    python -m benchmarks.quantization --chroma-collection rag_<id> --queries 500
+    python -m benchmarks.quantization --documents 20000 --dimensions 1536
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.vector_backends import make_vectors
+
+
+def load_chroma(name: str) -> np.ndarray:
+    from app.db.chroma.client import ChromaDBClient
+
+    collection = ChromaDBClient().create_or_get_collection(name)
+    vectors, offset = [], 0
+    while True:
+        batch = collection.get(include=["embeddings"], limit=5000, offset=offset)
+        if not len(batch["ids"]):
+            break
+        vectors.append(np.asarray(batch["embeddings"], dtype=np.float32))
+        offset += len(batch["ids"])
+    return np.concatenate(vectors)
+
+
+def load_numpy(name: str) -> np.ndarray:
+    from app.db.numpy_store.client import get_numpy_store
+
+    collection = get_numpy_store().create_or_get_collection(name)
+    return collection.float_rows(np.arange(len(collection)))
+
+
+def directory_size(path: str, names=None) -> int:
+    # 세그먼트 디렉터리까지 포함한 파일 크기 합
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path) for name in files if names is None or name in names
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chroma-collection")
+    parser.add_argument("--numpy-collection")
+    parser.add_argument("--documents", type=int, default=20000, help="합성 벡터 수")
+    parser.add_argument("--dimensions", type=int, default=1536, help="합성 벡터 차원")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--noise", type=float, default=0.5, help="질의 = 저장된 벡터 + noise * 가우시안")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.chroma_collection:
+        vectors, source = load_chroma(args.chroma_collection), args.chroma_collection
+    elif args.numpy_collection:
+        vectors, source = load_numpy(args.numpy_collection), args.numpy_collection
+    else:
+        vectors, source = make_vectors(rng, args.documents, args.dimensions, 50), "synthetic"
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    args.top_k = min(args.top_k, len(vectors))
+
+    # 저장된 청크와 비슷하지만 같지는 않은 질의 (실제 질문이 청크와 가까운 상황을 흉내)
+    queries = vectors[rng.integers(0, len(vectors), args.queries)]
+    queries = queries + args.noise * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(vectors.shape[1])
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    # 정답의 k번째 점수 이상인 결과를 맞은 것으로 셈 (내용이 같은 청크처럼 점수가 같은 경우 대비)
+    exact = vectors @ queries.T
+    thresholds = -np.partition(-exact, args.top_k - 1, axis=0)[args.top_k - 1] - 1e-6
+
+    from app.db.numpy_store.client import NumpyVectorStore
+
+    ids = [f"chunk_{i}" for i in range(len(vectors))]
+    row_of = {id: row for row, id in enumerate(ids)}
+    embeddings = vectors.tolist()
+    print(f"source={source} vectors={len(vectors)} dimensions={vectors.shape[1]} queries={args.queries} top_k={args.top_k}")
+    print(f"{'format':<22}{'index MB':>10}{'disk MB':>10}{'recall':>9}{'p50 ms':>9}{'p99 ms':>9}")
+
+    for quantization, rescore in (("none", 0), ("float16", 0), ("float16", args.rescore), ("int8", 0), ("int8", args.rescore)):
+        store = NumpyVectorStore(tempfile.mkdtemp(prefix="butadon-quantization-"), quantization, rescore)
+        store.upsert_documents("benchmark", [""] * len(ids), embeddings, ids)
+        store.flush("benchmark")
+        path = os.path.join(store.path, "benchmark")
+
+        samples, hits = [], 0
+        for column, query in enumerate(queries):
+            start = time.perf_counter()
+            result = store.search_by_embedding("benchmark", query.tolist(), args.top_k)
+            samples.append((time.perf_counter() - start) * 1000)
+            hits += sum(exact[row_of[id], column] >= thresholds[column] for id in result["ids"][0])
+        samples.sort()
+
+        label = quantization if not rescore else f"{quantization} + rescore x{rescore}"
+        print(
+            f"{label:<22}"
+            f"{directory_size(path, ('vectors.npy', 'scales.npy')) / 2**20:>10.1f}"
+            f"{directory_size(path) / 2**20:>10.1f}"
+            f"{hits / (len(queries) * args.top_k):>9.4f}"
+            f"{statistics.median(samples):>9.2f}"
+            f"{samples[int(len(samples) * 0.99)]:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+질문 응답 첫 바이트 시간(TTFB) 벤치마크.
+
+가짜 OpenAI 서버(채팅 응답에 chat_latency초 소요)를 쓰는 앱에서
+/rags/{id}/question과 SSE 스트리밍 /rags/{id}/question/{q}/stream의
+첫 바이트, 첫 토큰, 전체 응답 시간을 비교합니다.
+
+    python -m benchmarks.question_ttfb --requests 20 --chat-latency 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.servers import app_with_fake_openai, create_built_rag
+
+
+def report(label: str, values: list):
+    ms = sorted(value * 1000 for value in values)
+    print(f"{label:<28} p50={statistics.median(ms):8.1f}ms max={ms[-1]:8.1f}ms")
+
+
+async def run(base_url: str, args):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        rag_id, _ = await create_built_rag(client, "ttfb")
+
+        blocking_ttfb, blocking_total = [], []
+        for i in range(args.requests):
+            start = time.perf_counter()
+            first_byte = None
+            async with client.stream("GET", f"/rags/{rag_id}/question/테스트 질문 {i}") as response:
+                async for _ in response.aiter_bytes():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - start
+            blocking_ttfb.append(first_byte)
+            blocking_total.append(time.perf_counter() - start)
+
+        stream_ttfb, stream_first_token, stream_total = [], [], []
+        for i in range(args.requests):
+            start = time.perf_counter()
+            first_token = None
+            async with client.stream("GET", f"/rags/{rag_id}/question/테스트 질문 {i}/stream") as response:
+                async for line in response.aiter_lines():
+                    if line.startswith("event: retrieval"):
+                        stream_ttfb.append(time.perf_counter() - start)
+                    elif line.startswith("event: token") and first_token is None:
+                        first_token = time.perf_counter() - start
+            stream_first_token.append(first_token)
+            stream_total.append(time.perf_counter() - start)
+
+    report("question TTFB", blocking_ttfb)
+    report("question total", blocking_total)
+    report("stream TTFB (retrieval)", stream_ttfb)
+    report("stream first token", stream_first_token)
+    report("stream total", stream_total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--chat-latency", type=float, default=5.0)
+    args = parser.parse_args()
+
+    # 같은 질문을 반복하므로 답변 캐시를 꺼서 매번 채팅 요청까지 거치게 함
+    with app_with_fake_openai(chat_latency=args.chat_latency, answer_cache_enabled="false") as base_url:
+        asyncio.run(run(base_url, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+벤치마크용 앱/가짜 OpenAI 서버 실행 도우미.
+
+측정 프로세스와 GIL을 나눠 쓰지 않도록 가짜 OpenAI 서버와 앱(uvicorn)을
+임시 디렉터리를 쓰는 별도 프로세스로 띄웁니다. 로컬 제공자를 쓰면 가짜 서버 없이 앱만 띄웁니다.
+"""
+import asyncio
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import workdir_paths
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise TimeoutError(f"port {port} did not open")
+
+
+def workdir_env(prefix: str = "butadon-bench-") -> dict:
+    # 현재 환경 변수에서 앱이 쓰는 모든 경로만 새 임시 디렉터리 안으로 바꾼 것
+    env = dict(os.environ)
+    env.update(workdir_paths(tempfile.mkdtemp(prefix=prefix)))
+    return env
+
+
+@contextlib.contextmanager
+def _run(processes: list, ports: list):
+    try:
+        for port in ports:
+            wait_for_port(port)
+        yield
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+def _app_process(env: dict, port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+
+
+@contextlib.contextmanager
+def app_with_fake_openai(chat_latency: float = 2.0, latency: float = 0.05, **settings):
+    """
+    가짜 OpenAI 서버와 앱을 띄우고 앱의 base_url을 반환합니다.
+    settings는 환경 변수로 넘길 추가 설정입니다. (예: answer_cache_enabled="false")
+    """
+    fake_port, app_port = free_port(), free_port()
+    env = workdir_env()
+    env["OPENAI_BASE_URL"] = f"http://127.0.0.1:{fake_port}/v1"
+    env.update({name.upper(): str(value) for name, value in settings.items()})
+
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fake_openai", "--port", str(fake_port),
+             "--latency", str(latency), "--chat-latency", str(chat_latency)],
+            env=env, stdout=subprocess.DEVNULL,
+        ),
+        _app_process(env, app_port),
+    ]
+    with _run(processes, [fake_port, app_port]):
+        yield f"http://127.0.0.1:{app_port}"
+
+
+@contextlib.contextmanager
+def app_with_local_provider(embedding_latency: float = 0.0, chat_latency: float = 0.0, **settings):
+    """
+    네트워크 없이 로컬 제공자(LLM_PROVIDER=local)를 쓰는 앱을 띄우고 base_url을 반환합니다.
+    settings는 환경 변수로 넘길 추가 설정입니다. (예: answer_cache_enabled="false")
+    """
+    app_port = free_port()
+    env = workdir_env()
+    env.update({
+        "LLM_PROVIDER": "local",
+        "LOCAL_EMBEDDING_LATENCY": str(embedding_latency),
+        "LOCAL_CHAT_LATENCY": str(chat_latency),
+    })
+    env.update({name.upper(): str(value) for name, value in settings.items()})
+
+    with _run([_app_process(env, app_port)], [app_port]):
+        yield f"http://127.0.0.1:{app_port}"
+
+
+async def create_built_rag(client, name: str = "benchmark") -> tuple:
+    """
+    사용자, 데이터셋, RAG를 만들고 빌드가 끝날 때까지 기다린 뒤 (rag_id, 인증 헤더)를 반환합니다.
+    """
+    account = {"username": name, "email": f"{name}@example.com", "password": f"{name}-password"}
+    await client.post("/users/register", json=account)
+    login = await client.post("/users/login", json={"email": account["email"], "password": account["password"]})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    content = ("부원이 모두 모여 Git/Github에 대한 수업을 들었습니다. " * 2000).encode("utf-8")
+    dataset = await client.post(
+        "/datasets/create",
+        data={"name": name, "description": name},
+        files={"file": (f"{name}.txt", content)},
+        headers=headers,
+    )
+    rag = await client.post("/rags/create", json={
+        "name": name, "dataset_ids": [dataset.json()["id"]], "chunk_size": 1000, "llm_model": "fake",
+    }, headers=headers)
+    rag_id = rag.json()["id"]
+
+    job = (await client.post(f"/rags/{rag_id}/build", headers=headers)).json()
+    while job["status"] in ("queued", "running"):
+        await asyncio.sleep(0.2)
+        job = (await client.get(f"/rags/{rag_id}/build/{job['job_id']}")).json()
+    print(f"build: {job['status']} ({job['chunks_embedded']} chunks)")
+    return rag_id, headers
@@ -0,0 +1,164 @@
+"""
+SQLite 동시 읽기/쓰기 처리량 벤치마크.
+
+같은 DB 파일에 여러 프로세스(uvicorn 워커 흉내)가 동시에 목록 조회(읽기)와
+북마크 추가/삭제(쓰기)를 --seconds초 동안 보내고, 예전 설정(journal_mode=DELETE,
+synchronous=FULL)과 현재 설정(WAL, synchronous=NORMAL 등)의 처리량, p99 지연,
+'database is locked' 오류 수를 비교합니다.
+
+    python -m benchmarks.sqlite_concurrency --processes 4 --tasks 8 --seconds 10
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+PROFILES = {
+    "legacy (DELETE, FULL)": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_CACHE_SIZE_MB": "2",
+        "SQLITE_MMAP_SIZE_MB": "0",
+    },
+    "production (WAL, NORMAL)": {},  # config.py 기본값
+}
+
+
+def seed(url: str, users: int, rows: int) -> dict:
+    from sqlalchemy import create_engine
+    from app.db.sqlite.base import Base
+    from app.api.users.users_model import User
+    from app.api.datasets.datasets_model import Dataset
+    from app.api.rags.rags_model import RagModel
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    start = datetime.datetime.now()
+    user_ids = [f"user{i:06d}" for i in range(users)]
+    rag_ids = [str(uuid.uuid4()) for _ in range(rows)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"cuid": user_id, "username": user_id, "email": f"{user_id}@example.com", "hashed_password": "x"}
+            for user_id in user_ids
+        ])
+        conn.execute(Dataset.__table__.insert(), [
+            {"id": str(uuid.uuid4()), "name": f"dataset {i}", "made_by_user": user_ids[i % users],
+             "description": "benchmark", "file_type": "txt",
+             "created_at": (start + datetime.timedelta(seconds=i)).isoformat()}
+            for i in range(rows)
+        ])
+        conn.execute(RagModel.__table__.insert(), [
+            {"id": rag_id, "name": f"rag {i}", "made_by_user": user_ids[i % users],
+             "created_at": (start + datetime.timedelta(seconds=i)).isoformat(), "dataset_ids": json.dumps([]),
+             "llm_model": "gpt-4o-mini", "chunk_size": 1000, "chunk_overlap": 200, "chunk_unit": "char"}
+            for i, rag_id in enumerate(rag_ids)
+        ])
+    engine.dispose()
+    return {"users": user_ids, "rags": rag_ids}
+
+
+async def worker(args, ids: dict) -> dict:
+    # 앱과 같은 엔진/CRUD 경로를 사용 (PRAGMA는 환경 변수로 받은 설정대로 적용됨)
+    from app.db.sqlite.database import AsyncSessionLocal, async_engine
+    from app.api.datasets import datasets_crud
+    from app.api.users import users_crud
+    from app.core.pagination import PageParams
+
+    stats = {"reads": [], "writes": [], "locked": 0, "errors": 0}
+    deadline = time.monotonic() + args.seconds
+
+    async def task():
+        rng = random.Random()
+        while time.monotonic() < deadline:
+            write = rng.random() < args.write_ratio
+            start = time.perf_counter()
+            try:
+                async with AsyncSessionLocal() as db:
+                    if write:
+                        user_id, rag_id = rng.choice(ids["users"]), rng.choice(ids["rags"])
+                        if rng.random() < 0.5:
+                            await users_crud.add_bookmarked_rag(user_id, rag_id, db)
+                        else:
+                            await users_crud.remove_bookmarked_rag(user_id, rag_id, db)
+                    else:
+                        await datasets_crud.get_dataset_list(db, PageParams(50, None, "desc"))
+            except Exception as e:
+                if "database is locked" in str(e):
+                    stats["locked"] += 1
+                else:
+                    stats["errors"] += 1
+                continue
+            stats["writes" if write else "reads"].append(time.perf_counter() - start)
+
+    await asyncio.gather(*(task() for _ in range(args.tasks)))
+    await async_engine.dispose()
+    return stats
+
+
+def p99(values: list) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.99))] * 1000
+
+
+def run_profile(label: str, overrides: dict, args, workdir: str):
+    path = os.path.join(workdir, f"{len(os.listdir(workdir))}.db")
+    env = dict(os.environ, DATABASE_PATH=path, DATABASE_URL=f"sqlite:///{path}", **overrides)
+    ids_path = path + ".ids.json"
+    with open(ids_path, "w") as f:
+        json.dump(seed(f"sqlite:///{path}", args.users, args.rows), f)
+
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.sqlite_concurrency", "--child", ids_path,
+             "--tasks", str(args.tasks), "--seconds", str(args.seconds), "--write-ratio", str(args.write_ratio)],
+            env=env, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(args.processes)
+    ]
+    results = [json.loads(process.communicate()[0].strip().splitlines()[-1]) for process in processes]
+
+    reads = [value for result in results for value in result["reads"]]
+    writes = [value for result in results for value in result["writes"]]
+    locked = sum(result["locked"] for result in results)
+    errors = sum(result["errors"] for result in results)
+    print(
+        f"{label:<26} reads/s={len(reads) / args.seconds:8.1f} (p99 {p99(reads):7.1f}ms)"
+        f"  writes/s={len(writes) / args.seconds:7.1f} (p99 {p99(writes):7.1f}ms)"
+        f"  locked={locked} errors={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=8, help="프로세스당 동시 요청 수")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.child) as f:
+            ids = json.load(f)
+        print(json.dumps(asyncio.run(worker(args, ids))))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="butadon-sqlite-")
+    print(f"processes={args.processes} tasks={args.tasks} write_ratio={args.write_ratio}")
+    for label, overrides in PROFILES.items():
+        run_profile(label, overrides, args, workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+콜드 스타트 벤치마크.
+
+새 프로세스에서 app.main을 import하는 시간과, uvicorn을 띄운 뒤 첫 요청이 성공하기까지의
+시간(time-to-first-request)을 --runs번 재서 중앙값을 출력합니다. import 직후 무거운
+모듈(chromadb, openai, numpy, PyPDF2, tiktoken)이 이미 불러와져 있거나, 중앙값이
+예산(--import-budget, --first-request-budget)을 넘으면 종료 코드 1로 끝납니다.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.servers import free_port, workdir_env
+
+# 첫 사용 시에만 불러와야 하는 모듈
+LAZY_MODULES = ("chromadb", "openai", "numpy", "PyPDF2", "tiktoken")
+
+IMPORT_SNIPPET = f"""
+import json, sys, time
+import benchmarks
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], env=workdir_env("butadon-startup-"), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_first_request(timeout: float = 60.0) -> float:
+    # 프로세스 시작부터 GET /가 200을 돌려줄 때까지 (lifespan의 마이그레이션 포함)
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=workdir_env("butadon-startup-"), stdout=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("app did not answer the first request")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget", type=float, default=2.0, help="import 시간 중앙값 예산(초)")
+    parser.add_argument("--first-request-budget", type=float, default=4.0, help="첫 요청까지 중앙값 예산(초)")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    import_seconds = statistics.median(result["seconds"] for result in imports)
+    loaded = sorted({module for result in imports for module in result["loaded"]})
+    first_request_seconds = statistics.median(measure_first_request() for _ in range(args.runs))
+
+    print(f"import app.main          median={import_seconds * 1000:8.1f}ms  budget={args.import_budget * 1000:.0f}ms")
+    print(f"time to first request    median={first_request_seconds * 1000:8.1f}ms  budget={args.first_request_budget * 1000:.0f}ms")
+    print(f"heavy modules at import  {', '.join(loaded) or 'none'}")
+
+    failures = []
+    if loaded:
+        failures.append(f"loaded at import: {', '.join(loaded)}")
+    if import_seconds > args.import_budget:
+        failures.append("import time over budget")
+    if first_request_seconds > args.first_request_budget:
+        failures.append("time to first request over budget")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+벡터 저장소 비교 벤치마크 (Chroma HNSW vs NumPy mmap 행렬).
+
+임시 디렉터리에 같은 벡터(군집을 이룬 정규화 벡터)를 두 저장소에 넣고, 무작위 질의마다
+search_by_embedding의 지연(p50/p99)과 정확한 최근접 이웃 대비 recall@k를 비교합니다.
+두 저장소 모두 앱과 같은 클래스(ChromaDBClient, NumpyVectorStore)를 사용합니다.
+
+    python -m benchmarks.vector_backends --documents 20000 --dimensions 1536 --queries 500
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+
+def make_vectors(rng: np.random.Generator, count: int, dimensions: int, clusters: int) -> np.ndarray:
+    # 실제 임베딩처럼 몇몇 주제 주변에 몰려 있는 정규화 벡터
+    centers = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def measure(label: str, search, queries: np.ndarray, truth: np.ndarray, ids: list, top_k: int):
+    samples, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = search(query.tolist())
+        samples.append((time.perf_counter() - start) * 1000)
+        hits += len(set(result["ids"][0]) & {ids[row] for row in expected})
+    samples.sort()
+    recall = hits / (len(queries) * top_k)
+    print(
+        f"{label:<10} p50={statistics.median(samples):7.2f}ms p99={samples[int(len(samples) * 0.99)]:7.2f}ms"
+        f"  recall@{top_k}={recall:.4f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="butadon-vectors-")
+    os.environ["CHROMA_DB_PATH"] = os.path.join(workdir, "chroma")
+    os.environ["NUMPY_STORE_PATH"] = os.path.join(workdir, "numpy")
+    from app.db.chroma.client import ChromaDBClient
+    from app.db.numpy_store.client import NumpyVectorStore
+    from app.core.config import settings
+
+    rng = np.random.default_rng(0)
+    vectors = make_vectors(rng, args.documents, args.dimensions, args.clusters)
+    queries = make_vectors(rng, args.queries, args.dimensions, args.clusters)
+    ids = [f"doc_{i}" for i in range(args.documents)]
+    documents = [f"document {i}" for i in range(args.documents)]
+    metadatas = [{"chunk_index": i} for i in range(args.documents)]
+
+    # 정답: 모든 벡터와의 내적으로 구한 정확한 top-k
+    similarities = vectors @ queries.T
+    truth = np.argsort(-similarities, axis=0)[:args.top_k].T
+
+    chroma = ChromaDBClient()
+    store = NumpyVectorStore(settings.numpy_store_path)
+    name = chroma.get_chroma_collection_name("benchmark")
+    embeddings = vectors.tolist()
+
+    start = time.perf_counter()
+    chroma.upsert_documents(name, documents, embeddings, ids, metadatas)
+    chroma_load = time.perf_counter() - start
+    start = time.perf_counter()
+    store.upsert_documents(name, documents, embeddings, ids, metadatas)
+    store.flush(name)
+    numpy_load = time.perf_counter() - start
+
+    print(f"documents={args.documents} dimensions={args.dimensions} queries={args.queries}")
+    print(f"load: chroma={chroma_load:.1f}s numpy={numpy_load:.1f}s")
+    measure("chroma", lambda query: chroma.search_by_embedding(name, query, args.top_k), queries, truth, ids, args.top_k)
+    measure("numpy", lambda query: store.search_by_embedding(name, query, args.top_k), queries, truth, ids, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""baseline schema (users, datasets, rags)
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-07-20 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("cuid", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("bookmarked_rag_ids", sa.String(), nullable=True),
+        sa.Column("bookmarked_dataset_ids", sa.String(), nullable=True),
+        sa.Column("created_rag_ids", sa.String(), nullable=True),
+        sa.Column("created_dataset_ids", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("cuid"),
+    )
+    op.create_index("ix_users_cuid", "users", ["cuid"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "datasets",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("made_by_user", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("file_type", sa.String(), nullable=False),
+        sa.Column("created_at", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_datasets_id", "datasets", ["id"])
+
+    op.create_table(
+        "rags",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("made_by_user", sa.String(), nullable=False),
+        sa.Column("created_at", sa.String(), nullable=False),
+        sa.Column("dataset_ids", sa.String(), nullable=False),
+        sa.Column("llm_model", sa.String(), nullable=False),
+        sa.Column("chunk_size", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_rags_id", "rags", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rags_id", table_name="rags")
+    op.drop_table("rags")
+    op.drop_index("ix_datasets_id", table_name="datasets")
+    op.drop_table("datasets")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_index("ix_users_cuid", table_name="users")
+    op.drop_table("users")
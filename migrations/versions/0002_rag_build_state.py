@@ -0,0 +1,81 @@
+"""dataset hashes, RAG build jobs/state and chunk settings
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-08-04 00:00:00
+
+마이그레이션 도입 전 create_all로 일부 테이블이 이미 만들어진 DB도 있으므로
+없는 테이블/컬럼만 추가합니다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(table: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def _has_column(table: str, column: str) -> bool:
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade() -> None:
+    if not _has_column("datasets", "sha256"):
+        op.add_column("datasets", sa.Column("sha256", sa.String(), nullable=True))
+
+    if not _has_column("rags", "chunk_overlap"):
+        op.add_column("rags", sa.Column("chunk_overlap", sa.Integer(), nullable=False, server_default="200"))
+        # 기존 RAG는 chunk_size의 20%를 겹치도록 (RagCreateDTO 기본값과 동일)
+        op.execute("UPDATE rags SET chunk_overlap = chunk_size / 5")
+    if not _has_column("rags", "chunk_unit"):
+        op.add_column("rags", sa.Column("chunk_unit", sa.String(), nullable=False, server_default="char"))
+
+    if not _has_table("rag_build_jobs"):
+        op.create_table(
+            "rag_build_jobs",
+            sa.Column("id", sa.String(), nullable=False),
+            sa.Column("rag_id", sa.String(), nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("chunks_total", sa.Integer(), nullable=False),
+            sa.Column("chunks_embedded", sa.Integer(), nullable=False),
+            sa.Column("error", sa.String(), nullable=True),
+            sa.Column("created_at", sa.String(), nullable=False),
+            sa.Column("started_at", sa.String(), nullable=True),
+            sa.Column("finished_at", sa.String(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_rag_build_jobs_id", "rag_build_jobs", ["id"])
+        op.create_index("ix_rag_build_jobs_rag_id", "rag_build_jobs", ["rag_id"])
+
+    if not _has_table("rag_dataset_builds"):
+        op.create_table(
+            "rag_dataset_builds",
+            sa.Column("rag_id", sa.String(), nullable=False),
+            sa.Column("dataset_id", sa.String(), nullable=False),
+            sa.Column("content_hash", sa.String(), nullable=False),
+            sa.Column("chunk_params", sa.String(), nullable=False),
+            sa.Column("chunk_count", sa.Integer(), nullable=False),
+            sa.Column("built_at", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("rag_id", "dataset_id"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("rag_dataset_builds")
+    op.drop_index("ix_rag_build_jobs_rag_id", table_name="rag_build_jobs")
+    op.drop_index("ix_rag_build_jobs_id", table_name="rag_build_jobs")
+    op.drop_table("rag_build_jobs")
+    with op.batch_alter_table("rags") as batch_op:
+        batch_op.drop_column("chunk_unit")
+        batch_op.drop_column("chunk_overlap")
+    with op.batch_alter_table("datasets") as batch_op:
+        batch_op.drop_column("sha256")
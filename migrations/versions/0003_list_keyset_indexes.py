@@ -0,0 +1,35 @@
+"""keyset pagination indexes for RAG/dataset lists
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-08-11 00:00:00
+
+목록은 (created_at, id) 순서로 커서 페이지네이션하므로, 필터 컬럼을 앞에 둔
+복합 인덱스로 페이지 크기만큼만 읽도록 합니다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_datasets_created_at_id", "datasets", ["created_at", "id"])
+    op.create_index("ix_datasets_made_by_user_created_at_id", "datasets", ["made_by_user", "created_at", "id"])
+    op.create_index("ix_datasets_file_type_created_at_id", "datasets", ["file_type", "created_at", "id"])
+    op.create_index("ix_rags_created_at_id", "rags", ["created_at", "id"])
+    op.create_index("ix_rags_made_by_user_created_at_id", "rags", ["made_by_user", "created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rags_made_by_user_created_at_id", table_name="rags")
+    op.drop_index("ix_rags_created_at_id", table_name="rags")
+    op.drop_index("ix_datasets_file_type_created_at_id", table_name="datasets")
+    op.drop_index("ix_datasets_made_by_user_created_at_id", table_name="datasets")
+    op.drop_index("ix_datasets_created_at_id", table_name="datasets")
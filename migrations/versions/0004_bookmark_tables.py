@@ -0,0 +1,106 @@
+"""move bookmarks into association tables and drop JSON id columns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-08-18 00:00:00
+
+users의 JSON 문자열 컬럼(bookmarked_*_ids, created_*_ids)을 없애고, 북마크는
+(user_cuid, 대상 ID) 기본 키의 연결 테이블로 옮깁니다. 생성한 항목은
+rags/datasets의 made_by_user로 조회하므로 created_*_ids는 옮기지 않습니다.
+"""
+from typing import Sequence, Union
+import datetime
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (연결 테이블, 대상 ID 컬럼, 대상 테이블, users의 북마크 JSON 컬럼, users의 생성 JSON 컬럼)
+BOOKMARKS = (
+    ("rag_bookmarks", "rag_id", "rags", "bookmarked_rag_ids", "created_rag_ids"),
+    ("dataset_bookmarks", "dataset_id", "datasets", "bookmarked_dataset_ids", "created_dataset_ids"),
+)
+
+
+def _parse_ids(value) -> list:
+    try:
+        ids = json.loads(value or "[]")
+    except ValueError:
+        return []
+    return [i for i in ids if isinstance(i, str)] if isinstance(ids, list) else []
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    users = list(bind.execute(sa.text(
+        "SELECT cuid, bookmarked_rag_ids, bookmarked_dataset_ids FROM users"
+    )).mappings())
+    # 북마크 순서를 유지하도록 목록 순서대로 1마이크로초씩 늘린 시각을 기록
+    migrated_at = datetime.datetime.now()
+
+    for table, target_column, target_table, bookmarked_column, _ in BOOKMARKS:
+        bookmarks = op.create_table(
+            table,
+            sa.Column("user_cuid", sa.String(), nullable=False),
+            sa.Column(target_column, sa.String(), nullable=False),
+            sa.Column("created_at", sa.String(), nullable=False),
+            sa.PrimaryKeyConstraint("user_cuid", target_column),
+        )
+        op.create_index(f"ix_{table}_{target_column}_user_cuid", table, [target_column, "user_cuid"])
+
+        # 이미 지워진 대상을 가리키는 북마크는 옮기지 않음
+        existing = {row[0] for row in bind.execute(sa.text(f"SELECT id FROM {target_table}"))}
+        rows = []
+        for user in users:
+            seen = set()
+            for target_id in _parse_ids(user[bookmarked_column]):
+                if target_id in existing and target_id not in seen:
+                    seen.add(target_id)
+                    created_at = migrated_at + datetime.timedelta(microseconds=len(seen))
+                    rows.append({"user_cuid": user["cuid"], target_column: target_id, "created_at": created_at.isoformat()})
+        if rows:
+            op.bulk_insert(bookmarks, rows)
+
+    with op.batch_alter_table("users") as batch_op:
+        for _, _, _, bookmarked_column, created_column in BOOKMARKS:
+            batch_op.drop_column(bookmarked_column)
+            batch_op.drop_column(created_column)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        for _, _, _, bookmarked_column, created_column in BOOKMARKS:
+            batch_op.add_column(sa.Column(bookmarked_column, sa.String(), nullable=True))
+            batch_op.add_column(sa.Column(created_column, sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    for table, target_column, target_table, bookmarked_column, created_column in BOOKMARKS:
+        bookmarked, created = {}, {}
+        for user_cuid, target_id in bind.execute(sa.text(
+            f"SELECT user_cuid, {target_column} FROM {table} ORDER BY created_at"
+        )):
+            bookmarked.setdefault(user_cuid, []).append(target_id)
+        for user_cuid, target_id in bind.execute(sa.text(
+            f"SELECT made_by_user, id FROM {target_table} ORDER BY created_at"
+        )):
+            created.setdefault(user_cuid, []).append(target_id)
+
+        for (user_cuid,) in bind.execute(sa.text("SELECT cuid FROM users")).all():
+            bind.execute(
+                sa.text(f"UPDATE users SET {bookmarked_column} = :bookmarked, {created_column} = :created WHERE cuid = :cuid"),
+                {
+                    "bookmarked": json.dumps(bookmarked.get(user_cuid, [])),
+                    "created": json.dumps(created.get(user_cuid, [])),
+                    "cuid": user_cuid,
+                }
+            )
+
+        op.drop_index(f"ix_{table}_{target_column}_user_cuid", table_name=table)
+        op.drop_table(table)
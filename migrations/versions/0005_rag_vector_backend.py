@@ -0,0 +1,29 @@
+"""per-RAG vector backend
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-08-25 00:00:00
+
+RAG마다 벡터 저장소('chroma' 또는 'numpy')를 고를 수 있도록 컬럼을 추가합니다.
+기존 RAG는 모두 Chroma를 사용합니다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("rags", sa.Column("vector_backend", sa.String(), nullable=False, server_default="chroma"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("rags") as batch_op:
+        batch_op.drop_column("vector_backend")
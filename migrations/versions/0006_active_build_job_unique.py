@@ -0,0 +1,38 @@
+"""one active build job per RAG
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-09-01 00:00:00
+
+RAG마다 대기/실행 중인 빌드 작업이 하나만 있도록 부분 유니크 인덱스를 추가합니다.
+이미 여러 개가 대기/실행 중으로 남아 있으면 가장 나중 것만 두고 나머지는 실패로 표시합니다.
+"""
+from typing import Sequence, Union
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "status IN ('queued', 'running')"
+
+
+def upgrade() -> None:
+    op.execute(sa.text(
+        f"UPDATE rag_build_jobs SET status = 'failed', error = :error, finished_at = :now "
+        f"WHERE {ACTIVE} AND rowid NOT IN (SELECT MAX(rowid) FROM rag_build_jobs WHERE {ACTIVE} GROUP BY rag_id)"
+    ).bindparams(error="같은 RAG의 다른 빌드 작업으로 대체됨", now=datetime.datetime.now().isoformat()))
+    op.create_index(
+        "ux_rag_build_jobs_active_rag_id", "rag_build_jobs", ["rag_id"], unique=True,
+        sqlite_where=sa.text(ACTIVE),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_rag_build_jobs_active_rag_id", table_name="rag_build_jobs")
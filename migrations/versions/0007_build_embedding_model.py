@@ -0,0 +1,31 @@
+"""record the embedding model of each dataset build
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-09-08 00:00:00
+
+데이터셋 빌드 기록에 청크를 임베딩한 모델과 벡터 차원을 추가합니다.
+기존 기록은 어떤 모델로 임베딩했는지 알 수 없으므로 NULL로 두며, 다음 빌드에서 컬렉션 전체를 다시 임베딩합니다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("rag_dataset_builds", sa.Column("embedding_model", sa.String(), nullable=True))
+    op.add_column("rag_dataset_builds", sa.Column("embedding_dimensions", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("rag_dataset_builds") as batch_op:
+        batch_op.drop_column("embedding_dimensions")
+        batch_op.drop_column("embedding_model")
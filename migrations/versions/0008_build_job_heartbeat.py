@@ -0,0 +1,32 @@
+"""build job owner and heartbeat
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-09-15 00:00:00
+
+빌드 작업을 맡은 프로세스와 마지막 heartbeat 시각을 추가합니다.
+여러 워커 중 하나가 다시 시작해도 heartbeat가 끊긴(맡은 프로세스가 죽은) 작업만 실패로 표시하기 위함입니다.
+기존 작업은 heartbeat가 없으므로 대기/실행 중으로 남아 있었다면 다음 시작 때 실패로 표시됩니다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("rag_build_jobs", sa.Column("owner", sa.String(), nullable=True))
+    op.add_column("rag_build_jobs", sa.Column("heartbeat_at", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("rag_build_jobs") as batch_op:
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("owner")
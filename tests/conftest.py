@@ -0,0 +1,91 @@
+"""
+테스트 공용 설정.
+
+앱 모듈을 불러오기 전에 모든 경로를 임시 디렉터리로 돌리고 로컬 제공자(네트워크 없음)를 쓰도록
+환경 변수를 채웁니다. DB는 세션마다 한 번 마이그레이션하고 테스트가 끝날 때마다 비웁니다.
+"""
+import os
+import tempfile
+
+import pytest
+
+_workdir = tempfile.mkdtemp(prefix="butadon-test-")
+os.environ.update({
+    "APP_NAME": "test",
+    "DATABASE_PATH": f"{_workdir}/database.db",
+    "DATABASE_URL": f"sqlite:///{_workdir}/database.db",
+    "CHROMA_DB_PATH": f"{_workdir}/chroma",
+    "NUMPY_STORE_PATH": f"{_workdir}/numpy_store",
+    "LEXICAL_INDEX_PATH": f"{_workdir}/lexical_index",
+    "DATASETS_PATH": f"{_workdir}/datasets",
+    "EMBEDDING_CACHE_ENABLED": "false",
+    "ANSWER_CACHE_ENABLED": "false",
+    "JWT_SECRET_KEY": "test",
+    "JWT_ALGORITHM": "HS256",
+    "JWT_ACCESS_TOKEN_EXPIRE_MINUTES": "60",
+    "LLM_PROVIDER": "local",
+})
+
+
+@pytest.fixture(scope="session")
+def workdir() -> str:
+    return _workdir
+
+
+@pytest.fixture(scope="session")
+def database():
+    from app.db.sqlite.init_db import init_db
+
+    init_db()
+
+
+@pytest.fixture
+def db(database):
+    from app.db.sqlite.base import Base
+    from app.db.sqlite.database import SessionLocal
+    import app.api.users.users_model  # noqa: F401
+    import app.api.datasets.datasets_model  # noqa: F401
+    import app.api.rags.rags_model  # noqa: F401
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        # 다음 테스트가 빈 DB에서 시작하도록 모든 행을 지움
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        session.close()
+
+
+@pytest.fixture
+async def async_db(db):
+    from app.db.sqlite.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client(db):
+    import httpx
+    from app.main import app
+
+    # lifespan은 실행하지 않음 (스키마는 database 픽스처가 만듦)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def user(client) -> dict:
+    # 가입한 사용자의 CUID와 인증 헤더
+    account = {"username": "tester", "email": "tester@example.com", "password": "tester-password"}
+    cuid = (await client.post("/users/register", json=account)).json()["cuid"]
+    login = await client.post("/users/login", json={"email": account["email"], "password": account["password"]})
+    return {"cuid": cuid, "headers": {"Authorization": f"Bearer {login.json()['access_token']}"}}
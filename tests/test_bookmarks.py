@@ -0,0 +1,42 @@
+import datetime
+import json
+
+import pytest
+
+from app.api.datasets.datasets_model import Dataset
+from app.api.rags.rags_model import RagModel
+
+pytestmark = pytest.mark.anyio
+
+
+async def register(client, name: str) -> dict:
+    account = {"username": name, "email": f"{name}@example.com", "password": f"{name}-password"}
+    cuid = (await client.post("/users/register", json=account)).json()["cuid"]
+    login = await client.post("/users/login", json={"email": account["email"], "password": account["password"]})
+    return {"cuid": cuid, "headers": {"Authorization": f"Bearer {login.json()['access_token']}"}}
+
+
+@pytest.fixture
+def items(db, user) -> dict:
+    now = datetime.datetime.now().isoformat()
+    db.add(RagModel(
+        id="rag", name="rag", made_by_user=user["cuid"], created_at=now, dataset_ids=json.dumps([]),
+        llm_model="local", chunk_size=100, chunk_overlap=0, chunk_unit="char", vector_backend="chroma"
+    ))
+    db.add(Dataset(id="dataset", name="dataset", made_by_user=user["cuid"], file_type="txt", created_at=now))
+    db.commit()
+    return {"rags": "rag", "datasets": "dataset"}
+
+
+@pytest.mark.parametrize("kind", ["rags", "datasets"])
+async def test_only_owner_sees_who_bookmarked(client, user, items, kind):
+    other = await register(client, "other")
+    assert (await client.post(f"/users/bookmarks/{kind}/{items[kind]}", headers=other["headers"])).status_code == 200
+    path = f"/{kind}/{items[kind]}/bookmarks"
+
+    owner_view = (await client.get(path, headers=user["headers"])).json()
+    assert owner_view["count"] == 1
+    assert [u["cuid"] for u in owner_view["users"]] == [other["cuid"]]
+
+    assert (await client.get(path, headers=other["headers"])).json() == {"count": 1, "users": []}
+    assert (await client.get(path)).status_code in (401, 403)
@@ -0,0 +1,151 @@
+import datetime
+import json
+import os
+import uuid
+
+import pytest
+
+from app.api.datasets.datasets_model import Dataset
+from app.api.rags.rags_model import RagDatasetBuild, RagModel
+from app.core.config import settings
+from app.db.chroma.client import get_chroma_client
+from app.db.vector_store import get_vector_store
+from app.services.rags.build_db import build_db
+
+
+@pytest.fixture(params=["chroma", "numpy"])
+def backend(request) -> str:
+    return request.param
+
+
+def write_dataset(db, text: str, dataset_id: str = None) -> str:
+    # 파일을 바꿔 쓸 때는 업로드처럼 sha256 없이 두어 빌드가 파일에서 해시를 계산하게 함
+    dataset_id = dataset_id or str(uuid.uuid4())
+    os.makedirs(settings.datasets_path, exist_ok=True)
+    with open(os.path.join(settings.datasets_path, f"{dataset_id}.txt"), "w", encoding="utf-8") as file:
+        file.write(text)
+    if not db.get(Dataset, dataset_id):
+        db.add(Dataset(
+            id=dataset_id, name="dataset", made_by_user="user", file_type="txt",
+            created_at=datetime.datetime.now().isoformat()
+        ))
+        db.commit()
+    return dataset_id
+
+
+def create_rag(db, dataset_ids: list, backend: str, chunk_unit: str = "char") -> str:
+    rag = RagModel(
+        id=str(uuid.uuid4()), name="rag", made_by_user="user", created_at=datetime.datetime.now().isoformat(),
+        dataset_ids=json.dumps(dataset_ids), llm_model="local", chunk_size=100, chunk_overlap=0,
+        chunk_unit=chunk_unit, vector_backend=backend
+    )
+    db.add(rag)
+    db.commit()
+    return rag.id
+
+
+def build(db, rag_id: str) -> int:
+    # 이번 빌드에서 임베딩한 청크 수
+    progress = []
+    build_db(rag_id, db, progress=lambda embedded, total: progress.append(embedded))
+    return progress[-1]
+
+
+def stored_ids(rag_id: str, backend: str) -> set:
+    collection_name = get_chroma_client().get_chroma_collection_name(rag_id)
+    return set(get_vector_store(backend).get_ids(collection_name))
+
+
+def text(chars: int) -> str:
+    return ("가나다라마바사아자차카타파하 " * (chars // 15 + 1))[:chars]
+
+
+def test_unchanged_datasets_are_skipped(db, backend):
+    first, second = write_dataset(db, text(500)), write_dataset(db, text(300))
+    rag_id = create_rag(db, [first, second], backend)
+
+    assert build(db, rag_id) == 8
+    assert build(db, rag_id) == 0
+
+    write_dataset(db, text(250), second)
+    assert build(db, rag_id) == 3
+    assert stored_ids(rag_id, backend) == {f"{first}_{i}" for i in range(5)} | {f"{second}_{i}" for i in range(3)}
+    assert db.get(RagDatasetBuild, (rag_id, second)).chunk_count == 3
+
+
+def test_chunk_params_change_rebuilds(db, backend):
+    dataset_id = write_dataset(db, text(500))
+    rag_id = create_rag(db, [dataset_id], backend)
+    build(db, rag_id)
+
+    db.get(RagModel, rag_id).chunk_size = 250
+    db.commit()
+    assert build(db, rag_id) == 2
+    assert stored_ids(rag_id, backend) == {f"{dataset_id}_0", f"{dataset_id}_1"}
+
+
+def test_leftovers_of_failed_build_are_deleted(db, backend):
+    dataset_id = write_dataset(db, text(300))
+    rag_id = create_rag(db, [dataset_id], backend)
+    build(db, rag_id)
+
+    # 기록된 청크 수(3)보다 많이 쓴 뒤 실패한 빌드가 남긴 청크
+    collection_name = get_chroma_client().get_chroma_collection_name(rag_id)
+    store = get_vector_store(backend)
+    leftover = [f"{dataset_id}_{i}" for i in range(3, 6)]
+    store.upsert_documents(
+        collection_name, ["남은 청크"] * 3, get_chroma_client()._get_embeddings(["남은 청크"] * 3), leftover,
+        [{"dataset_id": dataset_id, "chunk_index": i} for i in range(3, 6)]
+    )
+    store.flush(collection_name)
+
+    write_dataset(db, text(200), dataset_id)
+    build(db, rag_id)
+    assert stored_ids(rag_id, backend) == {f"{dataset_id}_0", f"{dataset_id}_1"}
+
+
+def test_removed_datasets_are_deleted(db, backend):
+    kept, removed = write_dataset(db, text(200)), write_dataset(db, text(200))
+    rag_id = create_rag(db, [kept, removed], backend)
+    build(db, rag_id)
+
+    db.get(RagModel, rag_id).dataset_ids = json.dumps([kept])
+    db.commit()
+    assert build(db, rag_id) == 0
+    assert stored_ids(rag_id, backend) == {f"{kept}_0", f"{kept}_1"}
+    assert db.get(RagDatasetBuild, (rag_id, removed)) is None
+
+
+def test_token_unit_builds_with_local_provider(db, backend):
+    # 로컬 제공자는 tiktoken 없이 UTF-8 바이트를 토큰으로 세어 청크를 나눔 (한글 한 글자 = 3바이트)
+    dataset_id = write_dataset(db, text(300))
+    rag_id = create_rag(db, [dataset_id], backend, chunk_unit="token")
+    assert build(db, rag_id) == 9
+    assert build(db, rag_id) == 0
+
+
+def test_embedding_model_change_rebuilds_collection(db, backend, monkeypatch):
+    from app.core import providers
+
+    first, second = write_dataset(db, text(200)), write_dataset(db, text(200))
+    rag_id = create_rag(db, [first, second], backend)
+    build(db, rag_id)
+
+    # 차원이 다른 임베딩 모델로 바꾸면 건너뛰지 않고 새 컬렉션에 모두 다시 임베딩
+    monkeypatch.setattr(providers.settings, "local_embedding_dimensions", 128)
+    monkeypatch.setattr(providers, "_provider", None)
+    assert build(db, rag_id) == 4
+    assert build(db, rag_id) == 0
+    assert {(b.embedding_model, b.embedding_dimensions) for b in db.query(RagDatasetBuild)} == {("local-hashed-ngram-128", 128)}
+
+    collection_name = get_chroma_client().get_chroma_collection_name(rag_id)
+    results = get_vector_store(backend).search_by_embedding(
+        collection_name, providers.get_provider().embed(["가나다"]), n_results=2
+    )
+    assert len(results["ids"][0]) == 2
+    assert {m["embedding_dimensions"] for m in results["metadatas"][0]} == {128}
+
+
+def test_missing_rag(db):
+    with pytest.raises(ValueError, match="RAG를 찾을 수 없습니다"):
+        build_db("deleted-rag", db)
@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import datetime
+import threading
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+import app.api.rags.rags_crud as crud
+from app.core.config import settings
+from app.api.rags.rags_model import RagBuildJob
+from app.services.rags import build_jobs
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def blocked_executor(monkeypatch):
+    # 워커 하나짜리 풀에서 첫 작업이 release될 때까지 막혀 있도록 (두 번째 작업은 대기 상태로 남음)
+    release = threading.Event()
+    started = []
+
+    def run_build_job(job_id):
+        started.append(job_id)
+        release.wait(5)
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(build_jobs, "_executor", executor)
+    monkeypatch.setattr(build_jobs, "run_build_job", run_build_job)
+    yield started
+    release.set()
+    executor.shutdown(wait=True)
+
+
+def _statuses(db) -> dict:
+    db.expire_all()
+    return {job.id: job.status for job in db.query(RagBuildJob)}
+
+
+async def test_enqueue_returns_active_job(async_db, blocked_executor):
+    job = await build_jobs.enqueue_build("rag-1", async_db)
+    again = await build_jobs.enqueue_build("rag-1", async_db)
+    assert again.id == job.id
+
+
+async def test_concurrent_enqueue_creates_one_job(async_db, db, blocked_executor, monkeypatch):
+    # 두 요청이 모두 활성 작업이 없다고 본 뒤 동시에 만드는 경우
+    first_id = (await crud.create_build_job("rag-1", async_db)).id
+    lookup = crud.get_active_build_job
+    calls = []
+
+    async def get_active_build_job(rag_id, session):
+        # 첫 조회는 다른 요청이 작업을 만들기 전에 본 것처럼 빈 결과
+        calls.append(rag_id)
+        return None if len(calls) == 1 else await lookup(rag_id, session)
+
+    monkeypatch.setattr(crud, "get_active_build_job", get_active_build_job)
+    job = await build_jobs.enqueue_build("rag-1", async_db)
+    assert job.id == first_id
+    assert list(_statuses(db)) == [first_id]
+
+
+async def test_unique_index_allows_finished_jobs(async_db):
+    job_id = (await crud.create_build_job("rag-1", async_db)).id
+    with pytest.raises(IntegrityError):
+        await crud.create_build_job("rag-1", async_db)
+    await async_db.rollback()
+
+    job = await async_db.get(RagBuildJob, job_id)
+    job.status = "failed"
+    await async_db.commit()
+    assert (await crud.create_build_job("rag-1", async_db)).status == "queued"
+
+
+async def test_shutdown_fails_cancelled_jobs(async_db, db, blocked_executor):
+    running = await build_jobs.enqueue_build("rag-1", async_db)
+    queued = await build_jobs.enqueue_build("rag-2", async_db)
+
+    build_jobs.shutdown()
+
+    statuses = _statuses(db)
+    assert statuses[queued.id] == "failed"
+    # 이미 실행 중인 작업은 끝날 때 스스로 상태를 기록
+    assert statuses[running.id] == "queued"
+    assert blocked_executor == [running.id]
+
+
+async def set_job(async_db, rag_id: str, status: str, age: Optional[int]) -> str:
+    # 다른 워커가 만든 작업 (age: 마지막 heartbeat 이후 지난 초, None이면 heartbeat 없음)
+    job = await crud.create_build_job(rag_id, async_db, owner="other-worker")
+    job.status = status
+    job.heartbeat_at = None if age is None else (datetime.datetime.now() - datetime.timedelta(seconds=age)).isoformat()
+    await async_db.commit()
+    return job.id
+
+
+async def test_recover_interrupted_jobs(async_db, db):
+    # heartbeat가 끊긴 작업만 실패로 표시하고, 살아 있는 다른 워커의 작업은 그대로 둠
+    stale = await set_job(async_db, "rag-1", "queued", age=settings.build_job_stale_after + 1)
+    missing = await set_job(async_db, "rag-2", "running", age=None)
+    live = await set_job(async_db, "rag-3", "running", age=1)
+    done = await set_job(async_db, "rag-4", "done", age=settings.build_job_stale_after + 1)
+
+    assert build_jobs.recover_interrupted_jobs() == 2
+    assert _statuses(db) == {stale: "failed", missing: "failed", live: "running", done: "done"}
+    # 중단된 작업이 정리되었으므로 다시 빌드할 수 있음
+    assert await crud.get_active_build_job("rag-1", async_db) is None
+
+
+async def test_enqueue_replaces_stale_job(async_db, db, blocked_executor):
+    live = await set_job(async_db, "rag-1", "running", age=1)
+    assert (await build_jobs.enqueue_build("rag-1", async_db)).id == live
+
+    stale = await set_job(async_db, "rag-2", "running", age=settings.build_job_stale_after + 1)
+    job = await build_jobs.enqueue_build("rag-2", async_db)
+    assert job.id != stale and job.owner == build_jobs.WORKER_ID
+    assert _statuses(db)[stale] == "failed"
+
+
+async def test_heartbeat_refreshes_own_jobs(async_db, db, blocked_executor):
+    job = await build_jobs.enqueue_build("rag-1", async_db)
+    other = await set_job(async_db, "rag-2", "running", age=settings.build_job_stale_after + 1)
+    db.query(RagBuildJob).filter(RagBuildJob.id == job.id).update({"heartbeat_at": "2000-01-01T00:00:00"})
+    db.commit()
+
+    assert build_jobs.heartbeat() == 1
+    db.expire_all()
+    assert db.get(RagBuildJob, job.id).heartbeat_at > "2000-01-01T00:00:00"
+    assert build_jobs.recover_interrupted_jobs() == 1
+    assert _statuses(db) == {job.id: "queued", other: "failed"}
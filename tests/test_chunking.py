@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+from app.services.rags import chunking
+from app.services.rags.chunking import format_chunk_params, iter_chunks, token_offsets
+from app.services.rags.embeddings import count_tokens, get_encoding
+
+
+def test_local_provider_counts_utf8_bytes():
+    # 테스트는 로컬 제공자로 실행되므로 tiktoken 인코딩을 불러오지 않음
+    assert get_encoding() is False
+    assert count_tokens("가나 ab") == 9
+    assert token_offsets("가a", False).tolist() == [0, 0, 0, 1]
+
+
+def test_token_chunks_without_tiktoken():
+    pages = [(1, "선린인터넷고등학교 해킹 대회 우승. " * 20), (2, "ZX-9000 코드 이름. " * 20)]
+    chunks = list(iter_chunks(pages, "token", 64, 0))
+
+    assert "".join(chunk.text for chunk in chunks) == "".join(text for _, text in pages)
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    # 바이트 경계가 글자 중간이면 그 글자 앞에서 자르므로 한 글자(3바이트) 이내로만 어긋남
+    assert all(len(chunk.text.encode("utf-8")) <= 64 + 3 for chunk in chunks)
+    assert (chunks[0].page, chunks[-1].last_page) == (1, 2)
+
+
+def test_token_chunk_overlap():
+    text = "abcdefghij" * 10
+    chunks = list(iter_chunks([(1, text)], "token", 30, 10))
+    assert [chunk.start for chunk in chunks] == list(range(0, 100, 20))
+    assert chunks[1].text.startswith(chunks[0].text[-10:])
+
+
+def test_chunk_params_include_tokenizer(monkeypatch):
+    # 바이트로 나눈 청크와 tiktoken으로 나눈 청크는 설정 문자열이 달라야 제공자를 바꾼 뒤 다시 나뉨
+    assert format_chunk_params("token", 256, 32) == "token:256:32:bytes:v2"
+    assert format_chunk_params("char", 1000, 200) == "char:1000:200:v2"
+    monkeypatch.setattr(chunking, "get_encoding", lambda: SimpleNamespace(name="cl100k_base"))
+    assert format_chunk_params("token", 256, 32) == "token:256:32:cl100k_base:v2"
@@ -0,0 +1,147 @@
+import hashlib
+import os
+
+import pytest
+
+from app.api.datasets import datasets_crud, datasets_router
+from app.api.datasets.datasets_model import Dataset
+from app.core import multipart
+from app.core.config import settings
+
+pytestmark = pytest.mark.anyio
+
+BOUNDARY = "test-boundary"
+
+
+def multipart_parts(name: str, description: str, filename: str):
+    # (폼 앞부분, 파일 뒤 끝부분) — 파일 데이터는 그 사이에 스트리밍
+    head = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"name\"\r\n\r\n{name}\r\n"
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"description\"\r\n\r\n{description}\r\n"
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    return head, f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def dataset_files() -> set:
+    return set(os.listdir(settings.datasets_path))
+
+
+@pytest.fixture
+def new_files():
+    # 테스트가 데이터셋 디렉터리에 새로 남긴 파일 (임시 업로드 파일 포함)
+    os.makedirs(settings.datasets_path, exist_ok=True)
+    before = dataset_files()
+    yield lambda: sorted(dataset_files() - before)
+    for name in dataset_files() - before:
+        os.remove(os.path.join(settings.datasets_path, name))
+
+
+async def test_upload_stores_file_and_hash(client, user, new_files, db):
+    content = "안녕하세요 데이터셋입니다.\n".encode() * 1000
+    response = await client.post(
+        "/datasets/create",
+        data={"name": "dataset", "description": "설명"},
+        files={"file": ("notes.TXT", content)},
+        headers=user["headers"],
+    )
+    assert response.status_code == 200
+    dataset_id = response.json()["id"]
+
+    with open(os.path.join(settings.datasets_path, f"{dataset_id}.txt"), "rb") as file:
+        assert file.read() == content
+    dataset = db.get(Dataset, dataset_id)
+    assert (dataset.name, dataset.description, dataset.file_type) == ("dataset", "설명", "txt")
+    assert dataset.sha256 == hashlib.sha256(content).hexdigest()
+    assert new_files() == [f"{dataset_id}.txt"]
+
+
+async def test_oversized_upload_stops_while_streaming(client, user, new_files, db, monkeypatch):
+    monkeypatch.setattr(datasets_router, "MAX_FILE_SIZE", 10 * 1024)
+    head, tail = multipart_parts("big", "big", "big.txt")
+    sent = []
+
+    async def body():
+        yield head
+        for _ in range(100):
+            sent.append(1)
+            yield b"x" * 1024
+        yield tail
+
+    # Content-Length 없이 (chunked) 보내면 한도를 넘는 조각에서 중단해야 함
+    response = await client.post(
+        "/datasets/create",
+        content=body(),
+        headers={**user["headers"], "Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    assert response.status_code == 400
+    assert len(sent) < 20
+    assert new_files() == []
+    assert db.query(Dataset).count() == 0
+
+
+async def test_unbounded_form_fields_are_rejected(client, user, new_files, monkeypatch):
+    monkeypatch.setattr(multipart, "MAX_FORM_OVERHEAD", 16 * 1024)
+    sent = []
+
+    async def body():
+        # 한도보다 작은 필드를 끝없이 (Content-Length 없이) 보냄
+        for i in range(1000):
+            sent.append(1)
+            yield f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"field{i}\"\r\n\r\n{'x' * 1000}\r\n".encode()
+
+    response = await client.post(
+        "/datasets/create",
+        content=body(),
+        headers={**user["headers"], "Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    assert response.status_code == 413
+    assert len(sent) < 30
+    assert new_files() == []
+
+
+async def test_oversized_content_length_is_rejected_before_reading(client, user, new_files, monkeypatch):
+    monkeypatch.setattr(datasets_router, "MAX_FILE_SIZE", 10 * 1024)
+    response = await client.post(
+        "/datasets/create",
+        data={"name": "big", "description": "big"},
+        files={"file": ("big.txt", b"x" * (2 * 1024 * 1024))},
+        headers=user["headers"],
+    )
+    assert response.status_code == 400
+    assert new_files() == []
+
+
+async def test_unsupported_extension(client, user, new_files):
+    response = await client.post(
+        "/datasets/create",
+        data={"name": "image", "description": "image"},
+        files={"file": ("image.png", b"png")},
+        headers=user["headers"],
+    )
+    assert response.status_code == 400
+    assert new_files() == []
+
+
+async def test_missing_field(client, user, new_files):
+    response = await client.post(
+        "/datasets/create", data={"name": "dataset"}, files={"file": ("a.txt", b"text")}, headers=user["headers"]
+    )
+    assert response.status_code == 422
+    assert new_files() == []
+
+
+async def test_failed_insert_removes_file(client, user, new_files, monkeypatch):
+    async def create_dataset(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(datasets_crud, "create_dataset", create_dataset)
+    response = await client.post(
+        "/datasets/create",
+        data={"name": "dataset", "description": "dataset"},
+        files={"file": ("a.txt", b"text")},
+        headers=user["headers"],
+    )
+    assert response.status_code == 500
+    assert new_files() == []
@@ -0,0 +1,48 @@
+import pytest
+
+from app.services.rags.lexical_index import LexicalIndex, build_lexical_index, tokenize
+from app.services.rags.retrieval import reciprocal_rank_fusion
+
+DOCUMENTS = [
+    ("a_0", "서울특별시는 대한민국의 수도입니다.", {"dataset_id": "a", "page": 1, "last_page": 1}),
+    ("a_1", "부산광역시는 항구 도시입니다. 부산 부산 부산", {"dataset_id": "a", "page": 2, "last_page": 3}),
+    ("b_0", "Python BM25 ranking with NumPy", {"dataset_id": "b", "page": 1, "last_page": 1}),
+    ("b_1", "부산의 해운대는 여름에 붐빕니다.", {"dataset_id": "b", "page": 5, "last_page": 5}),
+]
+
+
+@pytest.fixture
+def index(tmp_path) -> LexicalIndex:
+    path = str(tmp_path / "index")
+    build_lexical_index(path, DOCUMENTS)
+    return LexicalIndex(path, k1=1.5, b=0.75)
+
+
+def test_tokenize_splits_korean_into_bigrams():
+    assert tokenize("부산에서 BM25를 ＡＢＣ") == ["부산", "산에", "에서", "bm25", "를", "abc"]
+
+
+def test_search_ranks_by_term_frequency(index):
+    assert [id for id, _ in index.search("부산", 10)] == ["a_1", "b_1"]
+    assert [id for id, _ in index.search("numpy", 10)] == ["b_0"]
+    assert index.search("없는단어", 10) == []
+
+
+def test_search_applies_filters(index):
+    assert [id for id, _ in index.search("부산", 10, dataset_ids=["b"])] == ["b_1"]
+    assert [id for id, _ in index.search("부산", 10, page_from=4)] == ["b_1"]
+    assert [id for id, _ in index.search("부산", 10, page_to=3)] == ["a_1"]
+
+
+def test_rebuild_replaces_index(tmp_path, index):
+    path = str(tmp_path / "index")
+    build_lexical_index(path, DOCUMENTS[:1])
+    assert len(LexicalIndex(path, k1=1.5, b=0.75)) == 1
+    # 이미 불러온 색인은 이전 파일로 계속 검색됨
+    assert [id for id, _ in index.search("부산", 10)] == ["a_1", "b_1"]
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+    assert [id for id, _ in fused] == ["a", "c", "b"]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
@@ -0,0 +1,104 @@
+import sqlite3
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+
+from app.db.sqlite import init_db as init_db_module
+from app.db.sqlite.base import Base
+import app.api.users.users_model  # noqa: F401
+import app.api.datasets.datasets_model  # noqa: F401
+import app.api.rags.rags_model  # noqa: F401
+
+# Alembic 도입 전 create_all로 만들어진 DB (북마크/생성 목록을 users의 JSON 문자열로 저장)
+LEGACY_SCHEMA = """
+CREATE TABLE users (
+    cuid VARCHAR NOT NULL PRIMARY KEY, username VARCHAR NOT NULL, email VARCHAR NOT NULL,
+    hashed_password VARCHAR NOT NULL, bookmarked_rag_ids VARCHAR, bookmarked_dataset_ids VARCHAR,
+    created_rag_ids VARCHAR, created_dataset_ids VARCHAR
+);
+CREATE TABLE datasets (
+    id VARCHAR NOT NULL PRIMARY KEY, name VARCHAR NOT NULL, made_by_user VARCHAR NOT NULL,
+    description VARCHAR, file_type VARCHAR NOT NULL, created_at VARCHAR NOT NULL
+);
+CREATE TABLE rags (
+    id VARCHAR NOT NULL PRIMARY KEY, name VARCHAR NOT NULL, description VARCHAR, made_by_user VARCHAR NOT NULL,
+    created_at VARCHAR NOT NULL, dataset_ids VARCHAR NOT NULL, llm_model VARCHAR NOT NULL, chunk_size INTEGER NOT NULL
+);
+CREATE INDEX ix_users_cuid ON users (cuid);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE INDEX ix_datasets_id ON datasets (id);
+CREATE INDEX ix_rags_id ON rags (id);
+INSERT INTO rags VALUES ('r1', 'rag', NULL, 'u', '2025-01-01', '["d1"]', 'gpt-4o-mini', 500);
+INSERT INTO rags VALUES ('r2', 'rag', NULL, 'u', '2025-01-02', '[]', 'gpt-4o-mini', 1000);
+INSERT INTO datasets VALUES ('d1', 'dataset', 'u', NULL, 'txt', '2025-01-01');
+INSERT INTO users VALUES ('u', 'user', 'u@example.com', 'hash', '["r2", "deleted", "r1", "r2"]', '["d1"]', '["r1", "r2"]', '["d1"]');
+INSERT INTO users VALUES ('v', 'user2', 'v@example.com', 'hash', 'not json', NULL, '[]', '[]');
+"""
+
+
+def migrate(monkeypatch, path) -> None:
+    # 앱과 같은 경로(init_db)로, 테스트용 DB 대신 path를 마이그레이션
+    engine = create_engine(f"sqlite:///{path}")
+    monkeypatch.setattr(init_db_module, "engine", engine)
+    init_db_module.init_db()
+    engine.dispose()
+
+
+def schema_diff(path) -> list:
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    engine.dispose()
+    return diff
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as connection:
+        connection.executescript(LEGACY_SCHEMA)
+    connection.close()
+    return path
+
+
+def test_new_database_matches_models(monkeypatch, tmp_path):
+    path = tmp_path / "new.db"
+    migrate(monkeypatch, path)
+    assert schema_diff(path) == []
+
+
+def test_pre_alembic_database_is_upgraded(monkeypatch, legacy_db):
+    migrate(monkeypatch, legacy_db)
+    assert schema_diff(legacy_db) == []
+
+    connection = sqlite3.connect(legacy_db)
+    try:
+        # 기존 RAG는 chunk_size의 20% 겹침, 문자 단위, Chroma 백엔드로 채워짐
+        assert connection.execute(
+            "SELECT id, chunk_overlap, chunk_unit, vector_backend FROM rags ORDER BY id"
+        ).fetchall() == [("r1", 100, "char", "chroma"), ("r2", 200, "char", "chroma")]
+        # 북마크는 순서를 유지한 채 연결 테이블로 옮기고, 중복과 지워진 대상은 버림
+        assert connection.execute(
+            "SELECT user_cuid, rag_id FROM rag_bookmarks ORDER BY created_at"
+        ).fetchall() == [("u", "r2"), ("u", "r1")]
+        assert connection.execute("SELECT user_cuid, dataset_id FROM dataset_bookmarks").fetchall() == [("u", "d1")]
+    finally:
+        connection.close()
+
+    engine = create_engine(f"sqlite:///{legacy_db}")
+    inspector = inspect(engine)
+    assert not {"bookmarked_rag_ids", "created_rag_ids"} & {c["name"] for c in inspector.get_columns("users")}
+    assert "ux_rag_build_jobs_active_rag_id" in {i["name"] for i in inspector.get_indexes("rag_build_jobs")}
+    engine.dispose()
+
+
+def test_migrated_database_is_left_alone(monkeypatch, legacy_db):
+    migrate(monkeypatch, legacy_db)
+    migrate(monkeypatch, legacy_db)
+    connection = sqlite3.connect(legacy_db)
+    try:
+        assert connection.execute("SELECT count(*) FROM rag_bookmarks").fetchone() == (2,)
+    finally:
+        connection.close()
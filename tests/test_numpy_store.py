@@ -0,0 +1,149 @@
+import numpy as np
+import pytest
+
+from app.db.numpy_store.client import NumpyVectorStore
+
+DIMENSIONS = 64
+
+
+@pytest.fixture(scope="module")
+def vectors() -> np.ndarray:
+    return np.random.default_rng(0).standard_normal((500, DIMENSIONS)).astype(np.float32)
+
+
+def make_store(path, vectors, quantization: str, rescore: int) -> NumpyVectorStore:
+    store = NumpyVectorStore(str(path), quantization=quantization, rescore=rescore)
+    ids = [f"doc_{i}" for i in range(len(vectors))]
+    store.upsert_documents(
+        "collection", [f"문서 {i}" for i in range(len(vectors))], vectors.tolist(), ids,
+        [{"dataset_id": "even" if i % 2 == 0 else "odd"} for i in range(len(vectors))]
+    )
+    store.flush("collection")
+    return store
+
+
+def search(store, queries, n_results=10, where=None) -> dict:
+    return store.search_by_embedding("collection", queries.tolist(), n_results=n_results, where=where)
+
+
+def recall(results, expected) -> float:
+    hits = sum(len(set(got) & set(want)) for got, want in zip(results["ids"], expected["ids"]))
+    return hits / sum(len(want) for want in expected["ids"])
+
+
+@pytest.mark.parametrize("quantization", ["float16", "int8"])
+def test_rescoring_matches_float32(tmp_path, vectors, quantization):
+    queries = vectors[:20] + 0.3 * np.random.default_rng(1).standard_normal((20, DIMENSIONS)).astype(np.float32)
+    expected = search(make_store(tmp_path / "none", vectors, "none", 0), queries)
+
+    results = search(make_store(tmp_path / quantization, vectors, quantization, 4), queries)
+    assert recall(results, expected) >= 0.99
+    # 다시 채점한 거리는 float32 사본으로 계산하므로 양자화 오차가 없음
+    for got, want, got_ids, want_ids in zip(results["distances"], expected["distances"], results["ids"], expected["ids"]):
+        if got_ids == want_ids:
+            assert got == pytest.approx(want, abs=1e-5)
+
+
+def test_int8_without_rescoring_keeps_recall(tmp_path, vectors):
+    queries = vectors[:20]
+    expected = search(make_store(tmp_path / "none", vectors, "none", 0), queries)
+    results = search(make_store(tmp_path / "int8", vectors, "int8", 0), queries)
+    assert recall(results, expected) >= 0.9
+    # 질의와 같은 벡터는 양자화해도 가장 가까움
+    assert [ids[0] for ids in results["ids"]] == [f"doc_{i}" for i in range(20)]
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8"])
+def test_where_filter(tmp_path, vectors, quantization):
+    store = make_store(tmp_path / quantization, vectors, quantization, 4)
+    results = search(store, vectors[:3], n_results=5, where={"dataset_id": "odd"})
+    assert all(int(id.split("_")[1]) % 2 == 1 for ids in results["ids"] for id in ids)
+    assert all(len(ids) == 5 for ids in results["ids"])
+
+
+def segment_dirs(path) -> list:
+    return sorted(entry.name for entry in (path / "collection").iterdir() if entry.name.startswith("seg-"))
+
+
+def test_changes_across_flushes(tmp_path, vectors):
+    store = make_store(tmp_path, vectors[:100], "none", 0)
+    # 다른 프로세스처럼 따로 연 저장소도 커밋을 봄
+    reader = NumpyVectorStore(str(tmp_path))
+    assert len(reader.get_ids("collection")) == 100
+
+    store.upsert_documents("collection", ["바뀐 문서"], [vectors[200].tolist()], ["doc_0"], [{"dataset_id": "new"}])
+    store.delete_documents("collection", ["doc_1", "doc_2"])
+    store.upsert_documents("collection", ["새 문서"], [vectors[300].tolist()], ["doc_new"], [{"dataset_id": "new"}])
+    # flush 전에는 이전 스냅샷
+    assert reader.get_documents("collection", ["doc_0"])["doc_0"][0] == "문서 0"
+    store.flush("collection")
+
+    ids = reader.get_ids("collection")
+    assert len(ids) == 99 and "doc_1" not in ids and "doc_new" in ids
+    assert sorted(reader.get_ids("collection", where={"dataset_id": "new"})) == ["doc_0", "doc_new"]
+    assert reader.get_documents("collection", ["doc_0"])["doc_0"] == ("바뀐 문서", {"dataset_id": "new"})
+    assert search(reader, vectors[[200, 300]], n_results=1)["ids"] == [["doc_0"], ["doc_new"]]
+    assert sorted(id for id, _, _ in reader.iter_documents("collection")) == sorted(ids)
+
+
+def test_staging_and_segments_stay_bounded(tmp_path, vectors, monkeypatch):
+    monkeypatch.setattr("app.db.numpy_store.client._BLOCK_ROWS", 16)
+    store = NumpyVectorStore(str(tmp_path))
+    for start in range(0, len(vectors), 50):
+        ids = [f"doc_{i}" for i in range(start, start + 50)]
+        store.upsert_documents("collection", ids, vectors[start:start + 50].tolist(), ids)
+        # 모아 둔 행은 블록 크기를 넘지 않고 나머지는 세그먼트로 써 둠
+        assert len(store._staging["collection"].records) < 16
+        store.flush("collection")
+        # 세그먼트 크기가 절반씩 줄어들므로 세그먼트 수는 로그 수준
+        assert len(segment_dirs(tmp_path)) <= np.log2(start + 50) + 1
+
+    assert len(store.get_ids("collection")) == len(vectors)
+    assert search(store, vectors[:5], n_results=1)["ids"] == [[f"doc_{i}"] for i in range(5)]
+
+
+def test_interrupted_write_keeps_last_commit(tmp_path, vectors, monkeypatch):
+    monkeypatch.setattr("app.db.numpy_store.client._BLOCK_ROWS", 16)
+    store = make_store(tmp_path, vectors[:100], "none", 0)
+    committed = segment_dirs(tmp_path)
+
+    # 세그먼트를 써 두던 중 프로세스가 죽음 (flush 전)
+    store.upsert_documents("collection", ["x"] * 40, vectors[100:140].tolist(), [f"new_{i}" for i in range(40)])
+    assert len(segment_dirs(tmp_path)) > len(committed)
+
+    restarted = NumpyVectorStore(str(tmp_path))
+    assert len(restarted.get_ids("collection")) == 100
+    # 다음 커밋에서 남은 세그먼트를 지움
+    restarted.delete_documents("collection", ["doc_0"])
+    restarted.flush("collection")
+    assert len(restarted.get_ids("collection")) == 99
+    assert set(segment_dirs(tmp_path)) <= set(committed) | set(
+        segment.name for segment, _ in restarted.create_or_get_collection("collection").parts
+    )
+    assert not any(name.startswith("new_") for name in restarted.get_ids("collection"))
+
+
+def test_legacy_layout_is_read_and_migrated(tmp_path, vectors):
+    store = make_store(tmp_path, vectors[:50], "none", 0)
+    # 세그먼트 도입 전처럼 컬렉션 디렉터리에 바로 쓴 파일로 되돌림
+    collection_path = tmp_path / "collection"
+    (segment,) = segment_dirs(tmp_path)
+    for file in (collection_path / segment).iterdir():
+        file.rename(collection_path / file.name)
+    (collection_path / segment).rmdir()
+    (collection_path / "manifest.json").unlink()
+
+    store = NumpyVectorStore(str(tmp_path))
+    assert search(store, vectors[:3], n_results=1)["ids"] == [["doc_0"], ["doc_1"], ["doc_2"]]
+
+    store.upsert_documents("collection", ["새 문서"], [vectors[60].tolist()], ["doc_new"])
+    store.flush("collection")
+    assert len(store.get_ids("collection")) == 51
+    assert search(store, vectors[[0, 60]], n_results=1)["ids"] == [["doc_0"], ["doc_new"]]
+
+    # 행이 절반 넘게 지워지면 예전 파일도 세그먼트로 다시 쓰고 지움
+    store.delete_documents("collection", [f"doc_{i}" for i in range(10, 40)])
+    store.flush("collection")
+    assert not (collection_path / "records.json").exists()
+    remaining = [f"doc_{i}" for i in list(range(10)) + list(range(40, 50))] + ["doc_new"]
+    assert sorted(store.get_ids("collection")) == sorted(remaining)
@@ -0,0 +1,104 @@
+import datetime
+import json
+
+import pytest
+
+from app.api.datasets.datasets_model import Dataset
+from app.api.rags.rags_model import RagModel
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+
+def add_rag(db, id: str, created_at: str, made_by_user: str = "user", name: str = "rag"):
+    db.add(RagModel(
+        id=id, name=name, made_by_user=made_by_user, created_at=created_at, dataset_ids=json.dumps([]),
+        llm_model="local", chunk_size=100, chunk_overlap=0, chunk_unit="char", vector_backend="chroma"
+    ))
+
+
+@pytest.fixture
+def rags(db) -> list:
+    # 같은 시각에 만든 RAG가 섞여 있도록 (created_at이 같으면 id로 순서가 정해짐)
+    base = datetime.datetime(2025, 1, 1)
+    rows = []
+    for i in range(25):
+        created_at = (base + datetime.timedelta(minutes=i // 3)).isoformat()
+        rows.append((created_at, f"rag-{i:02d}"))
+        add_rag(db, f"rag-{i:02d}", created_at, made_by_user="alice" if i % 2 else "bob", name=f"문서 {i}")
+    db.commit()
+    return sorted(rows)
+
+
+async def collect(client, path: str, **params) -> list:
+    # 커서를 따라가며 모든 페이지의 id를 모음
+    ids, cursor = [], None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = await client.get(path, params=query)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= params["limit"]
+        ids.extend(item["id"] for item in page)
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return ids
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("2025-01-01T00:00:00", "id/with+chars")) == ("2025-01-01T00:00:00", "id/with+chars")
+
+
+@pytest.mark.parametrize("order", ["desc", "asc"])
+async def test_pages_cover_every_row_once(client, rags, order):
+    ids = await collect(client, "/rags/list", limit=4, order=order)
+    expected = [id for _, id in rags]
+    assert ids == (expected[::-1] if order == "desc" else expected)
+
+
+async def test_exact_page_boundary_has_no_cursor(client, rags):
+    response = await client.get("/rags/list", params={"limit": 25})
+    assert len(response.json()) == 25
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+async def test_filters_apply_across_pages(client, rags):
+    ids = await collect(client, "/rags/list", limit=3, made_by_user="alice")
+    assert ids == [id for _, id in reversed(rags) if int(id[-2:]) % 2]
+
+    ids = await collect(client, "/rags/list", limit=3, q="문서 1")
+    assert sorted(ids) == sorted(f"rag-{i:02d}" for i in [1] + list(range(10, 20)))
+
+
+async def test_like_wildcards_are_literal(client, db):
+    add_rag(db, "percent", "2025-01-01T00:00:00", name="100% 완료")
+    add_rag(db, "plain", "2025-01-01T00:00:01", name="100 완료")
+    db.commit()
+    response = await client.get("/rags/list", params={"q": "0%"})
+    assert [item["id"] for item in response.json()] == ["percent"]
+
+
+async def test_rows_inserted_between_pages_do_not_shift_pages(client, db, rags):
+    first = await client.get("/rags/list", params={"limit": 5})
+    # 첫 페이지를 받은 뒤 더 최신 RAG가 생겨도 다음 페이지는 이어서 나옴
+    add_rag(db, "newest", "2030-01-01T00:00:00")
+    db.commit()
+    second = await client.get("/rags/list", params={"limit": 5, "cursor": first.headers[NEXT_CURSOR_HEADER]})
+    ids = [item["id"] for item in first.json() + second.json()]
+    assert ids == [id for _, id in reversed(rags)][:10]
+
+
+async def test_invalid_cursor(client):
+    for cursor in ("not-a-cursor", encode_cursor("2025", "x")[:-2] + "!!"):
+        assert (await client.get("/rags/list", params={"cursor": cursor})).status_code == 400
+
+
+async def test_dataset_list_filters_by_file_type(client, db):
+    for i, file_type in enumerate(["pdf", "txt", "pdf", "txt", "pdf"]):
+        db.add(Dataset(
+            id=f"dataset-{i}", name="dataset", made_by_user="user", file_type=file_type,
+            created_at=f"2025-01-01T00:00:0{i}"
+        ))
+    db.commit()
+    ids = await collect(client, "/datasets/list", limit=2, file_type="pdf")
+    assert ids == ["dataset-4", "dataset-2", "dataset-0"]